@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Measures how long it takes to find out whether the configuration of
+a device changed: "generate" hashes the archive returned by
+``generate()``, "checksum" hashes the tar archive while it's being
+written, "semantic" hashes the intermediate data and the files.
+Backends are instantiated for each device from the configuration
+(which is validated) and from a ``PreparedConfig`` (validated once).
+"""
+
+import hashlib
+import random
+import timeit
+
+from configs import device_config
+
+from netjsonconfig import OpenWisp, OpenWrt
+
+NUMBER = 20
+
+
+def main():
+    print(
+        '{0:<10} {1:>12} {2:>12} {3:>12}'.format(
+            'backend', 'generate', 'checksum', 'semantic'
+        )
+    )
+    rand = random.Random(15)
+    config = device_config(interfaces=50)
+    config['files'] = [
+        {
+            'path': '/etc/file{0}'.format(i),
+            'mode': '0644',
+            # eg: certificates
+            'contents': '{0:x}'.format(rand.getrandbits(4 * 200000)),
+        }
+        for i in range(5)
+    ]
+    for backend_class in [OpenWrt, OpenWisp]:
+        prepared = backend_class.prepare(config)
+        for name, factory in [
+            (backend_class.__name__, lambda: backend_class(config)),
+            ('prepared', prepared.instantiate),
+        ]:
+
+            def generate():
+                archive = factory().generate()
+                return hashlib.sha256(archive.getvalue()).hexdigest()
+
+            def checksum():
+                return factory().checksum()
+
+            def semantic():
+                return factory().semantic_checksum()
+
+            results = [
+                timeit.timeit(function, number=NUMBER) / NUMBER * 1000
+                for function in [generate, checksum, semantic]
+            ]
+            print(
+                '{0:<10} {1:>10.2f}ms {2:>10.2f}ms {3:>10.2f}ms'.format(name, *results)
+            )
+
+
+if __name__ == '__main__':
+    main()
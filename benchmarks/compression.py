@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Measures size and generation time of the archives of the OpenWrt and
+OpenWisp backends for each codec and compression level.
+"""
+
+import timeit
+
+from configs import device_config
+
+from netjsonconfig import OpenWisp, OpenWrt
+from netjsonconfig.backends.base.compression import codecs
+
+NUMBER = 20
+
+
+def config():
+    config = device_config(interfaces=50)
+    # eg: scripts and certificates
+    config['files'] = [
+        {
+            'path': '/etc/file{0}'.format(i),
+            'mode': '0644',
+            'contents': ''.join(
+                '{0} {1:08x}\n'.format(config['general']['hostname'], j * 7919 + i)
+                for j in range(2000)
+            ),
+        }
+        for i in range(5)
+    ]
+    return config
+
+
+def main():
+    print(
+        '{0:<10} {1:<6} {2:>6} {3:>10} {4:>10}'.format(
+            'backend', 'codec', 'level', 'size', 'time'
+        )
+    )
+    for backend_class in [OpenWrt, OpenWisp]:
+        backend = backend_class(config())
+        for name, codec in codecs.items():
+            levels = {codec.default_level}
+            if codec.levels:
+                levels.update([codec.levels[0], 1, codec.levels[-1]])
+            for level in sorted(levels, key=lambda level: level or 0):
+
+                def generate():
+                    return backend.generate(codec=name, compression_level=level)
+
+                size = len(generate().getvalue())
+                ms = timeit.timeit(generate, number=NUMBER) / NUMBER * 1000
+                print(
+                    '{0:<10} {1:<6} {2:>6} {3:>8.1f}KB {4:>8.2f}ms'.format(
+                        backend_class.__name__,
+                        name,
+                        '-' if level is None else level,
+                        size / 1024,
+                        ms,
+                    )
+                )
+
+
+if __name__ == '__main__':
+    main()
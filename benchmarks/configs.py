@@ -0,0 +1,167 @@
+"""
+NetJSON and UCI configurations shared by the benchmark scripts
+"""
+
+
+def device_config(interfaces=10, wifi=2):
+    """
+    Returns a NetJSON DeviceConfiguration with ``interfaces`` VLAN
+    interfaces bridged together and ``wifi`` access points
+    """
+    config = {
+        'general': {'hostname': 'bench-router', 'timezone': 'Europe/Rome'},
+        'radios': [
+            {
+                'name': 'radio0',
+                'phy': 'phy0',
+                'driver': 'mac80211',
+                'protocol': '802.11n',
+                'channel': 11,
+                'channel_width': 20,
+                'tx_power': 10,
+                'country': 'IT',
+            }
+        ],
+        'interfaces': [
+            {
+                'name': 'eth0',
+                'type': 'ethernet',
+                'addresses': [{'proto': 'dhcp', 'family': 'ipv4'}],
+            }
+        ],
+        'dns_servers': ['10.0.0.1', '10.0.0.2'],
+        'routes': [
+            {
+                'device': 'eth0',
+                'destination': '10.{0}.0.0/16'.format(i),
+                'next': '192.168.0.1',
+                'cost': 0,
+            }
+            for i in range(10)
+        ],
+        'files': [
+            {
+                'path': '/etc/bench-{0}.conf'.format(i),
+                'mode': '0644',
+                'contents': 'option {0}\n'.format(i) * 20,
+            }
+            for i in range(5)
+        ],
+    }
+    for i in range(interfaces):
+        config['interfaces'].append(
+            {
+                'name': 'eth0.{0}'.format(i + 1),
+                'type': 'ethernet',
+                'mtu': 1500,
+                'addresses': [
+                    {
+                        'proto': 'static',
+                        'family': 'ipv4',
+                        'address': '10.{0}.{1}.1'.format(i // 250, i % 250),
+                        'mask': 24,
+                    }
+                ],
+            }
+        )
+    for i in range(wifi):
+        config['interfaces'].append(
+            {
+                'name': 'wlan{0}'.format(i),
+                'type': 'wireless',
+                'wireless': {
+                    'radio': 'radio0',
+                    'mode': 'access_point',
+                    'ssid': 'bench-{0}'.format(i),
+                    'encryption': {
+                        'protocol': 'wpa2_personal',
+                        'key': 'benchmark-key-{0}'.format(i),
+                        'cipher': 'auto',
+                    },
+                },
+            }
+        )
+    return config
+
+
+def template_stack(templates=5, interfaces=20):
+    """
+    Returns a list of ``templates`` NetJSON templates which override
+    each other's interfaces, files and nested options, followed by
+    a device configuration
+    """
+    stack = []
+    for t in range(templates):
+        stack.append(
+            {
+                'general': {'timezone': 'Europe/Rome', 'description': str(t)},
+                'interfaces': [
+                    {
+                        'name': 'eth0.{0}'.format(i + 1),
+                        'type': 'ethernet',
+                        'mtu': 1500 - t,
+                        'addresses': [
+                            {
+                                'proto': 'static',
+                                'family': 'ipv4',
+                                'address': '10.{0}.{1}.1'.format(t, i),
+                                'mask': 24,
+                            }
+                        ],
+                    }
+                    for i in range(interfaces)
+                ],
+                'files': [
+                    {
+                        'path': '/etc/template-{0}-{1}.conf'.format(t, i),
+                        'mode': '0644',
+                        'contents': 'option {0}\n'.format(i) * 20,
+                    }
+                    for i in range(5)
+                ],
+                'openwisp': [
+                    {
+                        'config_name': 'controller',
+                        'config_value': 'http',
+                        'options': {'level{0}'.format(t): {'value': t}},
+                    }
+                ],
+            }
+        )
+    stack.append(device_config(interfaces=interfaces))
+    return stack
+
+
+def uci_dump(sections):
+    """
+    returns the output of ``uci export`` of a configuration
+    with ``sections`` sections in each package
+    """
+    network = ['package network\n']
+    firewall = ['package firewall\n']
+    dhcp = ['package dhcp\n']
+    for i in range(sections):
+        network.append(
+            "\nconfig interface 'vlan{0}'\n"
+            "\toption proto 'static'\n"
+            "\toption device 'br-lan.{0}'\n"
+            "\toption ipaddr '10.{1}.{2}.1'\n"
+            "\toption netmask '255.255.255.0'\n"
+            "\tlist dns '10.0.0.1'\n"
+            "\tlist dns '10.0.0.2'\n".format(i, i // 256, i % 256)
+        )
+        firewall.append(
+            "\nconfig rule\n"
+            "\toption name 'Allow-VLAN-{0}'\n"
+            "\toption src 'vlan{0}'\n"
+            "\toption dest_port '{1}'\n"
+            "\toption proto 'tcp udp'\n"
+            "\toption target 'ACCEPT'\n".format(i, 1024 + i)
+        )
+        dhcp.append(
+            "\nconfig host\n"
+            "\toption name 'host-{0}'\n"
+            "\toption mac '02:00:00:00:{1:02x}:{2:02x}'\n"
+            "\toption ip '10.{1}.{2}.100'\n".format(i, i // 256, i % 256)
+        )
+    return '\n'.join(''.join(package) for package in (network, firewall, dhcp))
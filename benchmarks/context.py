@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""
+Measures ``evaluate_vars`` on a configuration which contains a few
+variables and large files (eg: certificates): "before" is the
+previous implementation, which compiled a pattern for each variable
+and scanned every string with a regular expression.
+"""
+
+import timeit
+from copy import deepcopy
+
+import legacy
+from configs import device_config
+
+from netjsonconfig.utils import evaluate_vars
+
+NUMBER = 50
+
+
+def main():
+    config = device_config(interfaces=50)
+    config['general']['hostname'] = '{{ name }}'
+    config['interfaces'][1]['addresses'][0]['address'] = '{{ ip }}'
+    config['interfaces'][1]['mtu'] = 1500
+    config['files'].extend(
+        {
+            'path': '/etc/x509/cert-{0}.pem'.format(i),
+            'mode': '0600',
+            'contents': '-----BEGIN CERTIFICATE-----\n'
+            + 'MIIDXTCCAkWgAwIBAgIJAKJ\n' * 200
+            + '-----END CERTIFICATE-----\n',
+        }
+        for i in range(10)
+    )
+    config['files'][0]['contents'] = 'name={{ name }} ip={{ ip }} {{ unknown }}'
+    context = {'name': 'router', 'ip': '10.0.0.1'}
+    assert evaluate_vars(deepcopy(config), context) == legacy.evaluate_vars(
+        deepcopy(config), context
+    )
+    copies = [deepcopy(config) for _ in range(NUMBER * 2)]
+    before = timeit.timeit(
+        lambda: legacy.evaluate_vars(copies.pop(), context), number=NUMBER
+    )
+    after = timeit.timeit(lambda: evaluate_vars(copies.pop(), context), number=NUMBER)
+    print('before: {0:.2f}ms'.format(before / NUMBER * 1000))
+    print('after:  {0:.2f}ms'.format(after / NUMBER * 1000))
+
+
+if __name__ == '__main__':
+    main()
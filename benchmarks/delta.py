@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Measures size and generation time of a full archive and of a delta
+archive (``generate(previous=manifest)``) after changing the channel
+of a radio, which affects only the ``wireless`` package.
+"""
+
+import random
+import timeit
+
+from configs import device_config
+
+from netjsonconfig import OpenWisp, OpenWrt
+from netjsonconfig.backends.base.manifest import Manifest
+
+NUMBER = 20
+
+
+def main():
+    rand = random.Random(17)
+    config = device_config(interfaces=50)
+    config['files'] = [
+        {
+            'path': '/etc/file{0}'.format(i),
+            'mode': '0644',
+            # eg: certificates
+            'contents': '{0:x}'.format(rand.getrandbits(4 * 20000)),
+        }
+        for i in range(5)
+    ]
+    print(
+        '{0:<10} {1:>10} {2:>10} {3:>10} {4:>10}'.format(
+            'backend', 'full', 'delta', 'full', 'delta'
+        )
+    )
+    for backend_class in [OpenWrt, OpenWisp]:
+        archive = backend_class(config).generate(manifest=True)
+        # eg: stored by the controller
+        previous = Manifest.from_archive(archive, backend_class.manifest_name)
+        config['radios'][0]['channel'] = 6
+        backend = backend_class(config)
+        config['radios'][0]['channel'] = 11
+        full = backend.generate(manifest=True).getvalue()
+        delta = backend.generate(previous=previous).getvalue()
+        full_ms = timeit.timeit(backend.generate, number=NUMBER)
+        delta_ms = timeit.timeit(
+            lambda: backend.generate(previous=previous), number=NUMBER
+        )
+        print(
+            '{0:<10} {1:>8.1f}KB {2:>8.1f}KB {3:>8.2f}ms {4:>8.2f}ms'.format(
+                backend_class.__name__,
+                len(full) / 1024,
+                len(delta) / 1024,
+                full_ms / NUMBER * 1000,
+                delta_ms / NUMBER * 1000,
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Measures the effect of the ``oneOf`` dispatch on validation:
+"draft4" is ``jsonschema.Draft4Validator``, "dispatch" is
+``DispatchValidator`` (the default ``validator_class``).
+"""
+
+import timeit
+
+from configs import device_config
+from jsonschema import Draft4Validator, draft4_format_checker
+
+from netjsonconfig import OpenWisp, OpenWrt
+from netjsonconfig.backends.base.validator import DispatchValidator
+
+NUMBER = 20
+
+
+def main():
+    print(
+        '{0:<10} {1:>11} {2:>12} {3:>12}'.format(
+            'backend', 'interfaces', 'draft4', 'dispatch'
+        )
+    )
+    for backend_class in [OpenWrt, OpenWisp]:
+        draft4 = Draft4Validator(
+            backend_class.schema, format_checker=draft4_format_checker
+        )
+        dispatch = DispatchValidator(
+            backend_class.schema, format_checker=draft4_format_checker
+        )
+        for interfaces in [10, 50, 100]:
+            config = device_config(interfaces=interfaces)
+            draft4_ms = (
+                timeit.timeit(lambda: draft4.validate(config), number=NUMBER)
+                / NUMBER
+                * 1000
+            )
+            dispatch_ms = (
+                timeit.timeit(lambda: dispatch.validate(config), number=NUMBER)
+                / NUMBER
+                * 1000
+            )
+            print(
+                '{0:<10} {1:>11} {2:>10.2f}ms {3:>10.2f}ms'.format(
+                    backend_class.__name__, interfaces, draft4_ms, dispatch_ms
+                )
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Measures ``generate()`` on a configuration with large files: "before"
+writes the tar archive in memory and then compresses a copy of it,
+"after" compresses the tar archive while it's being written.
+Reports the time and the peak of memory allocated during generation.
+"""
+
+import timeit
+import tracemalloc
+
+import legacy
+from configs import device_config
+
+from netjsonconfig import OpenWrt
+
+NUMBER = 5
+
+
+def peak(function):
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main():
+    print(
+        '{0:<10} {1:>10} {2:>10} {3:>12} {4:>12}'.format(
+            'files', 'before', 'after', 'before peak', 'after peak'
+        )
+    )
+    for size in [1, 8, 32]:
+        config = device_config(interfaces=10)
+        config['files'] = [
+            {
+                'path': '/etc/file{0}'.format(i),
+                'mode': '0644',
+                'contents': '{0:08x}\n'.format(i * 7919) * (1024 * 1024 // 9),
+            }
+            for i in range(size)
+        ]
+        backend = OpenWrt(config)
+        assert legacy.generate(backend).getvalue() == backend.generate().getvalue()
+        before_ms = timeit.timeit(lambda: legacy.generate(backend), number=NUMBER)
+        after_ms = timeit.timeit(backend.generate, number=NUMBER)
+        print(
+            '{0:<10} {1:>8.0f}ms {2:>8.0f}ms {3:>10.1f}MB {4:>10.1f}MB'.format(
+                '{0}MB'.format(size),
+                before_ms / NUMBER * 1000,
+                after_ms / NUMBER * 1000,
+                peak(lambda: legacy.generate(backend)),
+                peak(backend.generate),
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Measures the forward conversion (``to_intermediate``) of configurations
+with hundreds of interfaces and wifi interfaces: "before" deep-copies the
+section of each converter and copies the intermediate data structure
+each time the output of a converter is merged, "in place" copies each
+section once with a copier for JSON data and merges the outputs in place,
+"indexed" merges them through an index of the UCI sections by name instead
+of indexing each package again at each merge (current implementation).
+Reports the best time and the peak of memory allocated during the conversion.
+"""
+
+import timeit
+import tracemalloc
+
+import legacy
+from configs import device_config
+
+from netjsonconfig import OpenWrt
+
+NUMBER = 5
+REPEAT = 3
+
+
+def peak(backend, function):
+    # the previous intermediate data structure is not counted
+    backend.intermediate_data = None
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def best(function):
+    return min(timeit.repeat(function, number=NUMBER, repeat=REPEAT)) / NUMBER
+
+
+def main():
+    print(
+        '{0:<14} {1:>10} {2:>10} {3:>10} {4:>12} {5:>12}'.format(
+            'interfaces', 'before', 'in place', 'indexed', 'before peak', 'after peak'
+        )
+    )
+    for interfaces, wifi in [(100, 50), (300, 200), (1000, 500)]:
+        backend = OpenWrt(device_config(interfaces=interfaces, wifi=wifi))
+        # validation is not part of the conversion
+        backend.validate()
+        backend._schema_valid = True
+        backend.to_intermediate()
+        expected = repr(backend.intermediate_data)
+        for function in [legacy.to_intermediate, legacy.to_intermediate_in_place]:
+            function(backend)
+            assert repr(backend.intermediate_data) == expected
+        print(
+            '{0:<14} {1:>8.1f}ms {2:>8.1f}ms {3:>8.1f}ms {4:>10.1f}MB {5:>10.1f}MB'.format(
+                '{0}+{1} wifi'.format(interfaces, wifi),
+                best(lambda: legacy.to_intermediate(backend)) * 1000,
+                best(lambda: legacy.to_intermediate_in_place(backend)) * 1000,
+                best(backend.to_intermediate) * 1000,
+                peak(backend, lambda: legacy.to_intermediate(backend)),
+                peak(backend, backend.to_intermediate),
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+Previous implementations, used as baseline by the benchmark scripts
+"""
+
+import gzip
+import re
+import tarfile
+from collections import OrderedDict
+from copy import deepcopy
+from io import BytesIO
+from unittest.mock import patch
+
+from netjsonconfig import utils
+from netjsonconfig.backends.base import converter
+from netjsonconfig.backends.openwrt.parser import OpenWrtParser
+from netjsonconfig.backends.openwrt.uci import UciSection
+
+
+def merge_config(template, config, list_identifiers=None):
+    result = deepcopy(template)
+    for key, value in config.items():
+        if isinstance(value, dict):
+            node = result.get(key, OrderedDict())
+            result[key] = merge_config(node, value)
+        elif isinstance(value, list) and isinstance(result.get(key), list):
+            result[key] = merge_list(result[key], value, list_identifiers)
+        else:
+            result[key] = value
+    return result
+
+
+def merge_list(list1, list2, identifiers=None):
+    identifiers = identifiers or []
+    dict_map = {'list1': OrderedDict(), 'list2': OrderedDict()}
+    counter = 1
+    for list_ in [list1, list2]:
+        container = dict_map['list{0}'.format(counter)]
+        for el in list_:
+            key = id(el)
+            if counter == 2 and el in dict_map['list1'].values():
+                continue
+            if isinstance(el, dict):
+                for id_key in identifiers:
+                    if id_key in el:
+                        key = el[id_key]
+                        break
+            if isinstance(key, list):
+                key = tuple(key)
+            container[key] = deepcopy(el)
+        counter += 1
+    merged = merge_config(dict_map['list1'], dict_map['list2'])
+    return list(merged.values())
+
+
+def merge_templates(configs, list_identifiers=None):
+    """
+    previous ``BaseBackend._merge_config``
+    """
+    result = {}
+    for config in configs:
+        result = merge_config(result, config, list_identifiers)
+    return result
+
+
+var_pattern = re.compile(r'\{\{\s*(\w*)\s*\}\}')
+
+
+def evaluate_vars(data, context=None):
+    context = context or {}
+    if isinstance(data, (dict, list)):
+        if isinstance(data, dict):
+            loop_items = data.items()
+        elif isinstance(data, list):
+            loop_items = enumerate(data)
+        for key, value in loop_items:
+            data[key] = evaluate_vars(value, context)
+    elif isinstance(data, str):
+        vars_found = var_pattern.findall(data)
+        for var in vars_found:
+            var = var.strip()
+            if len(vars_found) > 1:
+                pattern = r'\{\{(\s*%s\s*)\}\}' % var
+            else:
+                pattern = var_pattern
+            if var in context:
+                data = re.sub(pattern, str(context[var]), data)
+    return data
+
+
+def generate(backend):
+    tar_bytes = BytesIO()
+    tar = tarfile.open(fileobj=tar_bytes, mode='w')
+    backend._generate_contents(tar)
+    backend._process_files(tar)
+    tar.close()
+    tar_bytes.seek(0)
+    gzip_bytes = BytesIO()
+    gz = gzip.GzipFile(fileobj=gzip_bytes, mode='wb', mtime=0)
+    gz.write(tar_bytes.getvalue())
+    gz.close()
+    gzip_bytes.seek(0)
+    return gzip_bytes
+
+
+def _get_copy(dict_, key, default=None):
+    value = dict_.get(key, default)
+    if value:
+        return deepcopy(value)
+    return value
+
+
+def to_intermediate(backend):
+    with patch.object(converter, 'get_copy', _get_copy):
+        _to_intermediate(backend, in_place=False)
+
+
+def to_intermediate_in_place(backend):
+    """
+    merges the output of converters in place
+    without indexing the sections by name
+    """
+    _to_intermediate(backend, in_place=True)
+
+
+def _to_intermediate(backend, in_place):
+    backend.intermediate_data = OrderedDict()
+    for converter_class in backend.converters:
+        if not converter_class.should_run_forward(backend.config):
+            continue
+        value = converter_class(backend).to_intermediate()
+        if value:
+            backend.intermediate_data = utils.merge_config(
+                backend.intermediate_data,
+                value,
+                list_identifiers=['.name'],
+                in_place=in_place,
+            )
+
+
+def dict_sections():
+    """
+    the converters and the parser of OpenWrt create sorted
+    ``OrderedDict`` instead of ``UciSection`` (context manager)
+    """
+    return patch.object(UciSection, 'from_dict', staticmethod(utils.sorted_dict))
+
+
+def type_cast(self, item, schema=None):
+    if schema is None:
+        schema = self._schema
+    properties = schema['properties']
+    for key, value in item.items():
+        if key not in properties:
+            continue
+        try:
+            json_type = properties[key]['type']
+        except KeyError:
+            json_type = None
+        if isinstance(json_type, list) and json_type:
+            json_type = json_type[0]
+        if json_type == 'integer' and not isinstance(value, int):
+            value = int(value)
+        elif json_type == 'boolean' and not isinstance(value, bool):
+            value = value == '1'
+        item[key] = value
+    return item
+
+
+def regex_parser():
+    """
+    the OpenWrt parser splits packages and sections
+    with regular expressions (context manager)
+    """
+    return patch.object(
+        OpenWrtParser, '_get_uci_packages', OpenWrtParser._split_uci_packages
+    )
+
+
+def parse_tar(self, tar):
+    fileobj = tar.buffer if hasattr(tar, 'buffer') else tar
+    tar = tarfile.open(fileobj=fileobj)
+    text = ''
+    for member in tar.getmembers():
+        if not member.name.startswith('etc/config/'):
+            continue
+        text += 'package {name}\n\n{contents}'.format(
+            **{
+                'name': member.name.replace('etc/config/', ''),
+                'contents': tar.extractfile(member).read().decode(),
+            }
+        )
+    return self._get_uci_packages(text)
+
+
+def concatenated_tar():
+    """
+    the OpenWrt parser concatenates the members of archives
+    and parses the resulting text (context manager)
+    """
+    return patch.object(OpenWrtParser, 'parse_tar', parse_tar)
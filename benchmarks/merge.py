@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""
+Measures the merge of stacks of templates: "before" is the
+previous ``merge_config`` (which copies the whole result once per
+template), "after" is the copy-on-write ``merge_configs``.
+"""
+
+import timeit
+
+import legacy
+from configs import template_stack
+
+from netjsonconfig.utils import merge_configs
+
+NUMBER = 20
+LIST_IDENTIFIERS = ['name', 'config_value']
+
+
+def main():
+    print('{0:<10} {1:>12} {2:>12}'.format('templates', 'before', 'after'))
+    for templates in [1, 5, 10, 20]:
+        stack = template_stack(templates=templates)
+        assert merge_configs(stack, LIST_IDENTIFIERS) == legacy.merge_templates(
+            stack, LIST_IDENTIFIERS
+        )
+        before_ms = (
+            timeit.timeit(
+                lambda: legacy.merge_templates(stack, LIST_IDENTIFIERS), number=NUMBER
+            )
+            / NUMBER
+            * 1000
+        )
+        after_ms = (
+            timeit.timeit(lambda: merge_configs(stack, LIST_IDENTIFIERS), number=NUMBER)
+            / NUMBER
+            * 1000
+        )
+        print(
+            '{0:<10} {1:>10.2f}ms {2:>10.2f}ms'.format(templates, before_ms, after_ms)
+        )
+
+
+if __name__ == '__main__':
+    main()
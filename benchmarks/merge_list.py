@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""
+Measures ``merge_list`` on two templates which contribute the same
+``files`` (half of them identical): "before" is the previous
+implementation, which compares each element of the second list with
+all the elements of the first one.
+"""
+
+import timeit
+
+import legacy
+
+from netjsonconfig.utils import merge_list
+
+NUMBER = 5
+
+
+def files(count, prefix):
+    return [
+        {
+            'path': '/etc/{0}-{1}.conf'.format(prefix, i),
+            'mode': '0644',
+            'contents': 'option {0}\n'.format(i) * 20,
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    print('{0:<10} {1:>12} {2:>12}'.format('files', 'before', 'after'))
+    for count in [100, 500, 1000, 2000]:
+        list1 = files(count, 'a')
+        list2 = files(count // 2, 'a') + files(count // 2, 'b')
+        assert merge_list(list1, list2) == legacy.merge_list(list1, list2)
+        before_ms = (
+            timeit.timeit(lambda: legacy.merge_list(list1, list2), number=NUMBER)
+            / NUMBER
+            * 1000
+        )
+        after_ms = (
+            timeit.timeit(lambda: merge_list(list1, list2), number=NUMBER)
+            / NUMBER
+            * 1000
+        )
+        print('{0:<10} {1:>10.2f}ms {2:>10.2f}ms'.format(count, before_ms, after_ms))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Measures the OpenWrt backend after a change which affects only the
+``wireless`` package: "full" renders all the packages, "cached" too
+but the output of the packages which didn't change is cached by the
+``UciWriter``, "wireless" renders only ``packages=['wireless']``
+(which depends on the bridges of the ``network`` package) and "system"
+only ``packages=['system']``.
+Validation is excluded, it doesn't depend on the packages.
+"""
+
+import timeit
+from unittest.mock import patch
+
+from configs import device_config
+
+from netjsonconfig import OpenWrt
+from netjsonconfig.backends.openwrt.writer import UciWriter
+from netjsonconfig.utils import LRUCache
+
+NUMBER = 10
+
+
+def main():
+    print(
+        '{0:<12} {1:>10} {2:>10} {3:>10} {4:>10}'.format(
+            'interfaces', 'full', 'cached', 'wireless', 'system'
+        )
+    )
+    # the configuration changes each time, hence it can't be prepared
+    patch.object(OpenWrt, 'validate', lambda self: None).start()
+    for interfaces in [10, 100, 500]:
+        config = device_config(interfaces=interfaces)
+        channels = iter(range(1, 1000000))
+
+        def render(**kwargs):
+            # the channel changes each time
+            config['radios'][0]['channel'] = next(channels) % 11 + 1
+            return OpenWrt(config).render(files=False, **kwargs)
+
+        with patch.object(OpenWrt, 'uci_writer', UciWriter()):
+            full_ms = timeit.timeit(render, number=NUMBER)
+        with patch.object(OpenWrt, 'uci_writer', UciWriter(cache=LRUCache())):
+            render()
+            cached_ms = timeit.timeit(render, number=NUMBER)
+        wireless_ms = timeit.timeit(
+            lambda: render(packages=['wireless']), number=NUMBER
+        )
+        system_ms = timeit.timeit(lambda: render(packages=['system']), number=NUMBER)
+        print(
+            '{0:<12} {1:>8.2f}ms {2:>8.2f}ms {3:>8.2f}ms {4:>8.2f}ms'.format(
+                interfaces,
+                full_ms / NUMBER * 1000,
+                cached_ms / NUMBER * 1000,
+                wireless_ms / NUMBER * 1000,
+                system_ms / NUMBER * 1000,
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Measures the import of OpenWrt backups (``tar.gz`` archives of
+``/etc/config``): "before" concatenates the members of the archive and
+parses the resulting text, "after" reads the archive as a stream and
+parses each member as it's extracted. Reports the time and the peak
+memory of parsing a batch of small backups and a single backup of a few
+MB (parsing dominates the time, the peak memory depends on the size of
+the text which is parsed at once).
+"""
+
+import gzip
+import tarfile
+import timeit
+import tracemalloc
+from io import BytesIO
+
+import legacy
+from configs import uci_dump
+
+from netjsonconfig.backends.openwrt.parser import OpenWrtParser
+
+NUMBER = 3
+REPEAT = 3
+
+
+def best(function):
+    return min(timeit.repeat(function, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+
+
+def backup(sections):
+    """
+    returns a backup with the packages of ``uci_dump(sections)``
+    """
+    tar_bytes = BytesIO()
+    with tarfile.open(fileobj=tar_bytes, mode='w') as tar:
+        for package in uci_dump(sections).split('package ')[1:]:
+            name, contents = package.split('\n', 1)
+            data = contents.encode()
+            info = tarfile.TarInfo(name='etc/config/{0}'.format(name))
+            info.size = len(data)
+            tar.addfile(info, BytesIO(data))
+    return gzip.compress(tar_bytes.getvalue())
+
+
+def parse(backups):
+    return [OpenWrtParser(BytesIO(data)).intermediate_data for data in backups]
+
+
+def peak(backups):
+    """
+    returns the peak of the memory allocated while parsing (MB)
+    """
+    tracemalloc.start()
+    parse(backups)
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size / 1024 / 1024
+
+
+def measure(backups):
+    return best(lambda: parse(backups)), peak(backups), parse(backups)
+
+
+def main():
+    print('{0:<24} {1:>21} {2:>21}'.format('', 'time', 'peak'))
+    print('{0:<24} {1:>10} {2:>10} {1:>10} {2:>10}'.format('', 'before', 'after'))
+    for label, backups in [
+        ('300 backups of 20KB', [backup(50)] * 300),
+        ('1 backup of 4MB', [backup(10000)]),
+    ]:
+        with legacy.concatenated_tar():
+            before = measure(backups)
+        after = measure(backups)
+        assert before[-1] == after[-1]
+        print(
+            '{0:<24} {1:>8.1f}ms {2:>8.1f}ms {3:>8.1f}MB {4:>8.1f}MB'.format(
+                label, before[0], after[0], before[1], after[1]
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
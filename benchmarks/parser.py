@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+Measures the OpenWrt parser on ``uci export`` dumps of a few MB: "before"
+splits packages and sections with regular expressions, "after" scans
+the text once. The dumps contain the packages of a router with
+thousands of interfaces, firewall rules and DHCP leases.
+"""
+
+import timeit
+
+import legacy
+from configs import uci_dump
+
+from netjsonconfig.backends.openwrt.parser import OpenWrtParser
+
+NUMBER = 3
+REPEAT = 3
+
+
+def best(function):
+    return min(timeit.repeat(function, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+
+
+def main():
+    print(
+        '{0:>10} {1:>10} {2:>10} {3:>10}'.format('size', 'sections', 'before', 'after')
+    )
+    for sections in [2000, 10000, 20000]:
+        dump = uci_dump(sections)
+        with legacy.regex_parser():
+            before_ms = best(lambda: OpenWrtParser(dump))
+            before = OpenWrtParser(dump).intermediate_data
+        after_ms = best(lambda: OpenWrtParser(dump))
+        assert before == OpenWrtParser(dump).intermediate_data
+        print(
+            '{0:>8.1f}MB {1:>10} {2:>8.1f}ms {3:>8.1f}ms'.format(
+                len(dump) / 1024 / 1024, sections * 3, before_ms, after_ms
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
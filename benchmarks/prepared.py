@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""
+Measures the creation and rendering of the configuration of many
+devices which share the same templates and differ only in their
+context: "before" initializes a backend for each device, "after"
+instantiates a ``PreparedConfig``.
+"""
+
+import timeit
+
+from configs import template_stack
+
+from netjsonconfig import OpenWrt
+
+NUMBER = 20
+
+
+def main():
+    stack = template_stack(templates=5, interfaces=50)
+    templates, config = stack[:-1], stack[-1]
+    config['general']['hostname'] = 'router'
+    config['general']['description'] = '{{ name }} ({{ location }})'
+    config['files'][0]['contents'] = 'name={{ name }}\nlocation={{ location }}\n'
+    contexts = [
+        {'name': 'device-{0}'.format(i), 'location': 'site {0}'.format(i)}
+        for i in range(NUMBER)
+    ]
+    prepared = OpenWrt.prepare(config, templates=templates)
+
+    def before():
+        for context in contexts:
+            OpenWrt(config, templates=templates, context=context).render()
+
+    def after():
+        for context in contexts:
+            prepared.instantiate(context).render()
+
+    before_ms = timeit.timeit(before, number=1) / NUMBER * 1000
+    after_ms = timeit.timeit(after, number=1) / NUMBER * 1000
+    print('before: {0:.2f}ms per device'.format(before_ms))
+    print('after:  {0:.2f}ms per device'.format(after_ms))
+
+
+if __name__ == '__main__':
+    main()
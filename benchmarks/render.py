@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Measures ``render()``: "before" builds a new jinja2 environment (and
+therefore compiles the template again) on each render, like previous
+versions did, "after" uses the environments cached per package.
+"""
+
+import timeit
+
+from configs import device_config
+from jinja2 import Environment, PackageLoader
+
+from netjsonconfig import OpenWrt
+
+NUMBER = 20
+
+
+class UncachedRenderer(OpenWrt.renderer):
+    @classmethod
+    def get_name(cls):
+        return 'openwrt'
+
+    @property
+    def env_path(self):
+        return OpenWrt.renderer.__module__
+
+    @property
+    def template_env(self):
+        return Environment(
+            loader=PackageLoader(self.env_path, 'templates'), trim_blocks=True
+        )
+
+
+class UncachedOpenWrt(OpenWrt):
+    renderer = UncachedRenderer
+
+
+def main():
+    print('{0:<12} {1:>12} {2:>12}'.format('interfaces', 'before', 'after'))
+    for interfaces in [1, 10, 100]:
+        config = device_config(interfaces=interfaces)
+        before_backend = UncachedOpenWrt(config)
+        after_backend = OpenWrt(config)
+        assert before_backend.render() == after_backend.render()
+        before_ms = timeit.timeit(before_backend.render, number=NUMBER) / NUMBER * 1000
+        after_ms = timeit.timeit(after_backend.render, number=NUMBER) / NUMBER * 1000
+        print(
+            '{0:<12} {1:>10.2f}ms {2:>10.2f}ms'.format(interfaces, before_ms, after_ms)
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Measures the OpenWrt backend with configurations of thousands of UCI
+sections: "before" represents sections as sorted ``OrderedDict``, "after"
+as ``UciSection``. Reports the time of the conversion to the intermediate
+data structure followed by its rendering, the memory held by the
+intermediate data structure and the time of parsing the output.
+Validation is excluded, it doesn't depend on the representation.
+"""
+
+import timeit
+import tracemalloc
+from unittest.mock import patch
+
+import legacy
+from configs import device_config
+
+from netjsonconfig import OpenWrt
+
+NUMBER = 5
+REPEAT = 3
+
+
+def best(function):
+    return min(timeit.repeat(function, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+
+
+def held(config):
+    """
+    returns the memory held by the intermediate data structure (MB)
+    """
+    tracemalloc.start()
+    backend = OpenWrt(config)
+    backend.to_intermediate()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / 1024 / 1024
+
+
+def measure(config):
+    output = OpenWrt(config).render()
+    return (
+        best(lambda: OpenWrt(config).render()),
+        held(config),
+        best(lambda: OpenWrt(native=output)),
+        output,
+    )
+
+
+def main():
+    print('{0:<10} {1:>21} {2:>21} {3:>21}'.format('', 'render', 'held', 'parse'))
+    print(
+        '{0:<10} {1:>10} {2:>10} {1:>10} {2:>10} {1:>10} {2:>10}'.format(
+            'sections', 'before', 'after'
+        )
+    )
+    patch.object(OpenWrt, 'validate', lambda self: None).start()
+    for interfaces, wifi in [(100, 50), (800, 400), (2000, 1000)]:
+        config = device_config(interfaces=interfaces, wifi=wifi)
+        backend = OpenWrt(config)
+        backend.to_intermediate()
+        sections = sum(len(blocks) for blocks in backend.intermediate_data.values())
+        with legacy.dict_sections():
+            before = measure(config)
+        after = measure(config)
+        assert before[-1] == after[-1]
+        print(
+            '{0:<10} {1:>8.1f}ms {2:>8.1f}ms {3:>8.2f}MB {4:>8.2f}MB '
+            '{5:>8.1f}ms {6:>8.1f}ms'.format(
+                sections,
+                before[0],
+                after[0],
+                before[1],
+                after[1],
+                before[2],
+                after[2],
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
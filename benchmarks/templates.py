@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""
+Measures the initialization of backends of devices which share the
+same templates: "before" disables ``template_cache``, therefore
+each device merges the whole stack of templates.
+"""
+
+import timeit
+
+from configs import template_stack
+
+from netjsonconfig import OpenWrt
+
+NUMBER = 50
+
+
+class UncachedOpenWrt(OpenWrt):
+    template_cache = None
+
+
+def main():
+    print('{0:<10} {1:>12} {2:>12}'.format('templates', 'before', 'after'))
+    for templates in [1, 5, 10, 20]:
+        stack = template_stack(templates=templates)
+        templates, config = stack[:-1], stack[-1]
+        assert (
+            OpenWrt(config, templates=templates).config
+            == UncachedOpenWrt(config, templates=templates).config
+        )
+        before_ms = (
+            timeit.timeit(
+                lambda: UncachedOpenWrt(config, templates=templates), number=NUMBER
+            )
+            / NUMBER
+            * 1000
+        )
+        after_ms = (
+            timeit.timeit(lambda: OpenWrt(config, templates=templates), number=NUMBER)
+            / NUMBER
+            * 1000
+        )
+        print(
+            '{0:<10} {1:>10.2f}ms {2:>10.2f}ms'.format(
+                len(templates), before_ms, after_ms
+            )
+        )
+    print(OpenWrt.template_cache.cache_info())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Measures the type casting of parsed blocks (``BaseConverter.type_cast``):
+"before" looks up the type of each property in the schema fragment for
+each block, "after" uses the casting plan of the fragment, built once.
+Reports the time of casting thousands of parsed OpenWrt routes and
+OpenVPN instances and the time of parsing (excluding validation) the
+OpenWrt configuration.
+"""
+
+import timeit
+from unittest.mock import patch
+
+import legacy
+
+from netjsonconfig import OpenVpn, OpenWrt
+from netjsonconfig.backends.base.converter import BaseConverter
+from netjsonconfig.backends.openvpn.converters import OpenVpn as OpenVpnConverter
+from netjsonconfig.backends.openwrt.converters import Routes
+
+NUMBER = 5
+REPEAT = 3
+BLOCKS = 5000
+
+
+def best(function):
+    return min(timeit.repeat(function, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+
+
+def routes_config(routes):
+    return {
+        'routes': [
+            {
+                'device': 'eth0',
+                'destination': '10.{0}.{1}.0/24'.format(i // 250, i % 250),
+                'next': '192.168.0.1',
+                'cost': i,
+                'mtu': 1500,
+                'onlink': True,
+            }
+            for i in range(routes)
+        ],
+        'ip_rules': [
+            {'in': 'lan', 'src': '10.0.{0}.0/24'.format(i % 250), 'invert': True}
+            for i in range(routes)
+        ],
+    }
+
+
+def openvpn_block():
+    """
+    returns an OpenVPN server instance as parsed
+    """
+    server = {
+        'ca': 'ca.pem',
+        'cert': 'cert.pem',
+        'dev': 'tap0',
+        'dev_type': 'tap',
+        'dh': 'dh.pem',
+        'key': 'key.pem',
+        'mode': 'server',
+        'name': 'bench',
+        'proto': 'udp',
+        'tls_server': True,
+        'port': 1194,
+        'keepalive': '10 120',
+        'persist_key': True,
+        'persist_tun': True,
+        'comp_lzo': 'yes',
+        'mute': 10,
+        'verb': 3,
+    }
+    native = OpenVpn({'openvpn': [server]}).render()
+    return OpenVpn(native=native).intermediate_data['openvpn'][0]
+
+
+def cast(converter, blocks, schema=None):
+    for block in blocks:
+        converter.type_cast(dict(block), schema)
+
+
+def main():
+    patch.object(OpenWrt, 'validate', lambda self: None).start()
+    native = OpenWrt(routes_config(BLOCKS)).render()
+    routes = OpenWrt(native=native).config['routes']
+    routes = [{key: str(value) for key, value in r.items()} for r in routes]
+    vpns = [openvpn_block()] * BLOCKS
+    routes_converter = Routes(OpenWrt({}))
+    openvpn_converter = OpenVpnConverter(OpenVpn({'openvpn': []}))
+    openvpn_schema = openvpn_converter._schema
+    results = []
+    for function in (legacy.type_cast, BaseConverter.type_cast):
+        with patch.object(BaseConverter, 'type_cast', function):
+            results.append(
+                (
+                    best(lambda: cast(routes_converter, routes)),
+                    best(lambda: cast(openvpn_converter, vpns, openvpn_schema)),
+                    best(lambda: OpenWrt(native=native)),
+                )
+            )
+    print('{0:<24} {1:>10} {2:>10}'.format('', 'before', 'after'))
+    for index, name in enumerate(
+        [
+            'type_cast routes',
+            'type_cast openvpn',
+            'parse routes and rules',
+        ]
+    ):
+        print(
+            '{0:<24} {1:>8.1f}ms {2:>8.1f}ms'.format(
+                name, results[0][index], results[1][index]
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""
+Measures the OpenWrt renderer: "before" renders the jinja2 template and
+cleans up its output, "after" uses the native ``UciWriter``.
+"""
+
+import timeit
+from unittest.mock import patch
+
+from configs import device_config
+
+from netjsonconfig import OpenWrt
+
+NUMBER = 20
+
+
+def render(backend):
+    return backend.renderer(backend).render()
+
+
+def main():
+    print('{0:<12} {1:>12} {2:>12}'.format('interfaces', 'before', 'after'))
+    for interfaces in [10, 100, 1000]:
+        backend = OpenWrt(device_config(interfaces=interfaces))
+        backend.to_intermediate()
+        with patch.object(OpenWrt, 'uci_writer', None):
+            before = render(backend)
+            before_ms = timeit.timeit(lambda: render(backend), number=NUMBER)
+        assert before == render(backend)
+        after_ms = timeit.timeit(lambda: render(backend), number=NUMBER)
+        print(
+            '{0:<12} {1:>10.2f}ms {2:>10.2f}ms'.format(
+                interfaces,
+                before_ms / NUMBER * 1000,
+                after_ms / NUMBER * 1000,
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Measures the JSON-Schema validation cost of a single ``render()``
+
+"before" simulates the previous behaviour: a new validator was built
+on every ``validate()`` call and ``render()`` validated twice;
+"compiled" uses ``CompiledValidator`` as ``validator_class``.
+"""
+
+import timeit
+
+from configs import device_config
+from jsonschema import Draft4Validator, draft4_format_checker
+
+from netjsonconfig import OpenWisp, OpenWrt
+from netjsonconfig.backends.base.validator import CompiledValidator
+
+NUMBER = 20
+
+
+def main():
+    print(
+        '{0:<10} {1:>11} {2:>12} {3:>12} {4:>12}'.format(
+            'backend', 'interfaces', 'before', 'after', 'compiled'
+        )
+    )
+    for backend_class in [OpenWrt, OpenWisp]:
+        for interfaces in [10, 100]:
+            backend = backend_class(device_config(interfaces=interfaces))
+            backend.validate()
+
+            def before():
+                for _ in range(2):
+                    Draft4Validator(
+                        backend.schema, format_checker=draft4_format_checker
+                    ).validate(backend.config)
+
+            def after():
+                # the validator is cached and render() validates once
+                backend.validate()
+
+            compiled = CompiledValidator(
+                backend.schema, format_checker=draft4_format_checker
+            )
+
+            def after_compiled():
+                compiled.validate(backend.config)
+
+            before_ms = timeit.timeit(before, number=NUMBER) / NUMBER * 1000
+            after_ms = timeit.timeit(after, number=NUMBER) / NUMBER * 1000
+            compiled_ms = timeit.timeit(after_compiled, number=NUMBER) / NUMBER * 1000
+            print(
+                '{0:<10} {1:>11} {2:>10.2f}ms {3:>10.2f}ms {4:>10.2f}ms'.format(
+                    backend_class.__name__,
+                    interfaces,
+                    before_ms,
+                    after_ms,
+                    compiled_ms,
+                )
+            )
+
+
+if __name__ == '__main__':
+    main()
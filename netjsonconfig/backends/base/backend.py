@@ -1,18 +1,26 @@
-import gzip
+import hashlib
 import ipaddress
 import json
+import os
 import re
+import secrets
 import tarfile
 from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager
 from copy import deepcopy
 from io import BytesIO
 
-from jsonschema import Draft4Validator, draft4_format_checker
+from jsonschema import draft4_format_checker
 from jsonschema.exceptions import ValidationError as JsonSchemaError
 
 from ...exceptions import ValidationError
 from ...schema import DEFAULT_FILE_MODE
-from ...utils import evaluate_vars, merge_config
+from ...utils import IndexedConfig, LRUCache, evaluate_vars, merge_config, merge_configs
+from .compression import get_codec
+from .manifest import Manifest
+from .prepared import PreparedConfig
+from .validator import CachedFormatChecker, DispatchValidator
 
 _host_name_re = re.compile(r"^[A-Za-z0-9][A-Za-z0-9\.\-]{1,255}$")
 
@@ -23,6 +31,14 @@ class BaseBackend(object):
     """
 
     schema = None
+    validator_class = DispatchValidator
+    format_checker = CachedFormatChecker(draft4_format_checker)
+    # merged templates, shared by all the backends (``None`` disables it)
+    template_cache = LRUCache(maxsize=128)
+    # codec of the archives generated by ``generate`` and ``write``
+    codec = 'gzip'
+    # name of the manifest member of generated archives
+    manifest_name = 'netjsonconfig-manifest'
     FILE_SECTION_DELIMITER = '# ---------- files ---------- #'
     list_identifiers = []
 
@@ -40,10 +56,17 @@ class BaseBackend(object):
         # initialize empty instance attributes
         self.config = None
         self.intermediate_data = None
+        self._validated = False
+        # set by PreparedConfig when the schema doesn't need to be checked
+        # by the first validation (the configuration may change afterwards)
+        self._schema_valid = False
+        # manifest of the archive being generated, if requested,
+        # and manifest of the previous version of delta archives
+        self._manifest = None
+        self._previous_manifest = None
         # forward conversion (NetJSON > native configuration)
         if config is not None:
-            # perform deepcopy to avoid modifying the original config argument
-            config = deepcopy(self._load(config))
+            config = self._load(config)
             self.config = self._merge_config(config, templates)
             self.config = self._evaluate_vars(self.config, context)
         # backward conversion (native configuration > NetJSON)
@@ -72,19 +95,66 @@ class BaseBackend(object):
 
     def _merge_config(self, config, templates):
         """
-        Merges config with templates
+        Merges config with templates, the result
+        doesn't share any object with the arguments
         """
         if not templates:
-            return config
+            # perform deepcopy to avoid modifying the original config argument
+            return deepcopy(config)
         # type check
         if not isinstance(templates, list):
             raise TypeError('templates argument must be an instance of list')
         # merge templates with main configuration
-        result = {}
-        config_list = templates + [config]
-        for merging in config_list:
-            result = merge_config(result, self._load(merging), self.list_identifiers)
-        return result
+        return merge_config(
+            self._merge_templates(templates), config, self.list_identifiers
+        )
+
+    def _merge_templates(self, templates):
+        """
+        Merges templates; the result of each prefix of ``templates``
+        is cached in ``template_cache`` (by content), therefore
+        devices which share the same templates merge them only once.
+
+        The returned ``dict`` may be cached, hence it must not be modified.
+        """
+        keys = self._template_keys(templates)
+        if keys is None:
+            return merge_configs(
+                [self._load(template) for template in templates],
+                self.list_identifiers,
+            )
+        # looks for the longest prefix which has already been merged
+        merged, length = {}, 0
+        for index in range(len(keys), 0, -1):
+            cached = self.template_cache.get(keys[index - 1])
+            if cached is not None:
+                merged, length = cached, index
+                break
+        for template, key in zip(templates[length:], keys[length:]):
+            merged = merge_config(merged, self._load(template), self.list_identifiers)
+            self.template_cache.set(key, merged)
+        return merged
+
+    def _template_keys(self, templates):
+        """
+        Returns the cache keys of each prefix of ``templates``,
+        or ``None`` if the templates can't be cached
+        """
+        if self.template_cache is None:
+            return None
+        digest = hashlib.sha256(repr(self.list_identifiers).encode())
+        keys = []
+        for template in templates:
+            if isinstance(template, str):
+                data = 's' + template
+            elif type(template) in (dict, OrderedDict):
+                # unlike JSON, repr differentiates types (eg: 1, 1.0 and True)
+                data = 'd' + repr(template)
+            else:
+                return None
+            digest.update('{0}:{1}'.format(len(data), data).encode())
+            keys.append(digest.hexdigest())
+        return keys
 
     def _evaluate_vars(self, config, context):
         """
@@ -100,22 +170,25 @@ class BaseBackend(object):
         """
         Renders additional files specified in ``self.config['files']``
         """
-        output = ''
+        return ''.join(self._iter_files())
+
+    def _iter_files(self):
+        """
+        Yields the delimiter of the additional files and then each file
+        """
         # render files
         files = self.config.get('files', [])
         # add delimiter
         if files:
-            output += '\n{0}\n\n'.format(self.FILE_SECTION_DELIMITER)
+            yield '\n{0}\n\n'.format(self.FILE_SECTION_DELIMITER)
         for f in files:
             mode = f.get('mode', DEFAULT_FILE_MODE)
             # add file to output
-            file_output = (
+            yield (
                 '# path: {0}\n'
                 '# mode: {1}\n\n'
                 '{2}\n\n'.format(f['path'], mode, f['contents'])
             )
-            output += file_output
-        return output
 
     def _deduplicate_files(self):
         files = self.config.get('files', [])
@@ -152,46 +225,155 @@ class BaseBackend(object):
                 return False
         return True
 
+    def _get_validator(self):
+        """
+        Returns the JSON-Schema validator of the backend class.
+
+        Building a validator is expensive, therefore it's built only
+        once and cached on the backend class; the cached validator is
+        discarded if a subclass (or instance) swaps ``schema``,
+        ``validator_class`` or ``format_checker``.
+        """
+        cls = type(self)
+        cached = cls.__dict__.get('_validator_cache')
+        key = (self.schema, self.validator_class, self.format_checker)
+        if cached is None or any(a is not b for a, b in zip(cached[0], key)):
+            validator = self.validator_class(
+                self.schema, format_checker=self.format_checker
+            )
+            cached = (key, validator)
+            cls._validator_cache = cached
+        return cached[1]
+
+    @classmethod
+    def prepare(cls, config, templates=None, **kwargs):
+        """
+        Returns a ``PreparedConfig``: ``config`` merged with ``templates``
+        and validated once, which can be instantiated with different contexts
+
+        :param config: ``dict`` containing a **NetJSON** configuration dictionary
+        :param templates: ``list`` containing **NetJSON** configuration dictionaries
+        :param kwargs: additional arguments of the backend
+        """
+        return PreparedConfig(cls, config, templates=templates, **kwargs)
+
     def validate(self):
+        if self._schema_valid:
+            self._schema_valid = False
+            return
         try:
-            Draft4Validator(self.schema, format_checker=draft4_format_checker).validate(
-                self.config
-            )
+            self._get_validator().validate(self.config)
         except JsonSchemaError as e:
             raise ValidationError(e)
 
-    def render(self, files=True):
+    @contextmanager
+    def _validated_config(self):
+        """
+        Validates the configuration once for the duration of the block,
+        nested steps of the pipeline (eg: ``to_intermediate`` called by
+        ``render``) won't validate the configuration again
+        """
+        if self._validated:
+            yield
+            return
+        self.validate()
+        self._validated = True
+        try:
+            yield
+        finally:
+            self._validated = False
+
+    def render(self, files=True, packages=None):
         """
         Converts the configuration dictionary into the corresponding configuration format
 
         :param files: whether to include "additional files" in the output or not;
                       defaults to ``True``
+        :param packages: ``list`` of keys of the intermediate data structure
+                         (eg: UCI packages) to render, only the converters
+                         which feed them are run; defaults to all
         :returns: string with output
         """
-        self.validate()
-        # convert NetJSON config to intermediate data structure
-        if self.intermediate_data is None:
-            self.to_intermediate()
+        with self._validated_config():
+            return ''.join(self._iter_render(files, packages))
+
+    def iter_render(self, files=True, packages=None):
+        """
+        Like ``render`` but yields the output in chunks (eg: one for each
+        UCI package and one for each additional file) instead of building
+        the whole output in memory; the configuration is validated when
+        the first chunk is requested
+
+        :param files: whether to include "additional files" in the output or not;
+                      defaults to ``True``
+        :param packages: packages to render, see ``render``
+        :returns: generator of strings
+        """
+        with self._validated_config():
+            data = self._section_data(packages)
+        # the configuration is not flagged as validated while the generator
+        # is suspended, other calls on this instance validate it again
+        yield from self._iter_render(files, data=data)
+
+    def render_to(self, stream, files=True, packages=None):
+        """
+        Like ``render`` but writes the output to ``stream``, chunk by chunk
+
+        :param stream: file-like object open in text mode
+        :param files: whether to include "additional files" in the output or not;
+                      defaults to ``True``
+        :param packages: packages to render, see ``render``
+        :returns: None
+        """
+        for chunk in self.iter_render(files, packages):
+            stream.write(chunk)
+
+    def _iter_render(self, files, packages=None, data=None):
+        for name, output in self._iter_sections(packages, data):
+            yield output
+        # are we required to include
+        # additional files?
+        if files:
+            # render additional files, each chunk starts with a delimiter
+            # or with a comment, hence sequences of new lines never span
+            # across chunks
+            for chunk in self._iter_files():
+                # max 2 new lines
+                yield chunk.replace('\n\n\n', '\n\n')
+
+    def _section_data(self, packages=None):
+        """
+        Returns the intermediate data structure of ``packages``
+        (defaults to all) which is rendered by ``_iter_sections``;
+        must be called while the configuration is validated
+        """
+        if packages is not None:
+            data = self._package_data(packages)
+        else:
+            # convert NetJSON config to intermediate data structure
+            if self.intermediate_data is None:
+                self.to_intermediate()
+            data = self.intermediate_data
         self._deduplicate_files()
+        return data
+
+    def _iter_sections(self, packages=None, data=None):
+        """
+        Yields the name and the output of each section of the configuration
+        (eg: UCI package, VPN instance), see ``BaseRenderer.iter_sections``;
+        must be called while the configuration is validated, unless ``data``
+        (see ``_section_data``) is given
+        """
+        if data is None:
+            data = self._section_data(packages)
         # support multiple renderers
         renderers = getattr(self, 'renderers', None) or [self.renderer]
         # convert intermediate data structure to native configuration
-        output = ''
         for renderer_class in renderers:
-            renderer = renderer_class(self)
-            output += renderer.render()
+            renderer = renderer_class(self, data)
+            yield from renderer.iter_sections()
             # remove reference to renderer instance (not needed anymore)
             del renderer
-        # are we required to include
-        # additional files?
-        if files:
-            # render additional files
-            files_output = self._render_files()
-            if files_output:
-                # max 2 new lines
-                output += files_output.replace('\n\n\n', '\n\n')
-        # return the configuration
-        return output
 
     def json(self, validate=True, *args, **kwargs):
         """
@@ -209,48 +391,197 @@ class BaseBackend(object):
         config.update({'type': 'DeviceConfiguration'})
         return json.dumps(config, *args, **kwargs)
 
-    def generate(self):
+    def generate(
+        self,
+        fileobj=None,
+        compression_level=None,
+        codec=None,
+        manifest=False,
+        previous=None,
+    ):
         """
         Returns a ``BytesIO`` instance representing an in-memory tar.gz archive
         containing the native router configuration.
 
-        :returns: in-memory tar.gz archive, instance of ``BytesIO``
-        """
-        tar_bytes = BytesIO()
-        tar = tarfile.open(fileobj=tar_bytes, mode='w')
-        self._generate_contents(tar)
-        self._process_files(tar)
+        :param fileobj: optional binary file object (eg: an open file, a pipe
+                        or a socket) to which the archive is written, instead
+                        of building it in memory; it is not closed
+        :param compression_level: compression level of the codec (eg: ``0-9``
+                                  for gzip), defaults to the highest level
+                                  for gzip and bz2 and to ``6`` for xz
+        :param codec: ``gzip`` (default), ``bz2``, ``xz``, ``none`` (tar archive)
+                      or an instance of ``Codec``; defaults to ``codec``
+                      attribute of the backend
+        :param manifest: whether to add a manifest (see ``Manifest``) of the
+                         files of the archive as last member, named after
+                         the ``manifest_name`` attribute of the backend;
+                         defaults to ``False``
+        :param previous: manifest of the previous version of the archive
+                         (``Manifest`` instance or JSON string) or the previous
+                         archive (binary file object); if specified, generates
+                         a delta archive which contains only the files which
+                         changed and a manifest which lists the removed paths
+        :returns: in-memory tar.gz archive, instance of ``BytesIO``,
+                  or ``fileobj`` if specified
+        :raises ValueError: raised if ``codec`` or ``compression_level`` are not valid
+        """
+        if previous is not None:
+            previous = self._load_manifest(previous)
+            manifest = True
+        codec = get_codec(codec or self.codec)
+        if fileobj is None:
+            destination = BytesIO()
+        else:
+            destination = fileobj
+        # the tar archive is compressed while it's being written,
+        # codecs don't store the time of generation, otherwise any
+        # checksum operation would return a different digest even
+        # when content is the same
+        stream = codec.open(destination, compression_level)
+        tar = tarfile.open(fileobj=stream, mode='w')
+        # files are added to the manifest by _add_file, which
+        # skips the files listed in the previous manifest
+        self._manifest = Manifest() if manifest else None
+        self._previous_manifest = previous
+        try:
+            self._generate_contents(tar)
+            self._process_files(tar)
+        finally:
+            manifest, self._manifest = self._manifest, None
+            self._previous_manifest = None
+        if previous is not None:
+            manifest.removed = [
+                path for path in previous.files if path not in manifest.files
+            ]
+        if manifest is not None:
+            self._add_file(tar=tar, name=self.manifest_name, contents=manifest.dumps())
         tar.close()
-        tar_bytes.seek(0)  # set pointer to beginning of stream
-        # `mtime` parameter of gzip file must be 0, otherwise any checksum operation
-        # would return a different digest even when content is the same.
-        # to achieve this we must use the python `gzip` library because the `tarfile`
-        # library does not seem to offer the possibility to modify the gzip `mtime`.
-        gzip_bytes = BytesIO()
-        gz = gzip.GzipFile(fileobj=gzip_bytes, mode='wb', mtime=0)
-        gz.write(tar_bytes.getvalue())
-        gz.close()
-        gzip_bytes.seek(0)  # set pointer to beginning of stream
-        return gzip_bytes
+        stream.close()
+        if fileobj is None:
+            destination.seek(0)  # set pointer to beginning of stream
+        return destination
 
     def _generate_contents(self, tar):
         raise NotImplementedError()
 
-    def write(self, name, path='./'):
+    def _load_manifest(self, manifest):
+        """
+        Returns ``manifest`` (``Manifest``, JSON string or archive)
+        as ``Manifest`` instance
+        """
+        if isinstance(manifest, Manifest):
+            return manifest
+        if isinstance(manifest, str):
+            return Manifest.loads(manifest)
+        if hasattr(manifest, 'read'):
+            return Manifest.from_archive(manifest, self.manifest_name)
+        raise TypeError(
+            'previous must be a Manifest, a JSON string or a file object, '
+            'got {0}'.format(type(manifest).__name__)
+        )
+
+    def checksum(self, algorithm='sha256'):
+        """
+        Returns the checksum of the tar archive generated by ``generate``
+        before compression, which is computed while the archive is being
+        written, without compressing it or keeping it in memory;
+        therefore it doesn't depend on the codec.
+
+        :param algorithm: name of a ``hashlib`` algorithm, defaults to ``sha256``
+        :returns: string with hexadecimal digest
+        """
+        digest = hashlib.new(algorithm)
+        self.generate(fileobj=_DigestWriter(digest), codec='none')
+        return digest.hexdigest()
+
+    def semantic_checksum(self, algorithm='sha256'):
+        """
+        Returns the checksum of the intermediate data structure and of the
+        additional files, which is cheaper than ``checksum`` because the
+        configuration is not rendered; it doesn't depend on the order of
+        the options and of the files. Configurations with the same checksum
+        have the same output, while configurations with different checksums
+        may have the same output (eg: ``True`` and ``'1'`` in UCI options)
+
+        :param algorithm: name of a ``hashlib`` algorithm, defaults to ``sha256``
+        :returns: string with hexadecimal digest
+        """
+        with self._validated_config():
+            data, files = self._semantic_data()
+        digest = hashlib.new(algorithm)
+        # the contents of files are hashed as they are, their length
+        # is part of the canonical JSON representation of the metadata
+        metadata = [
+            data,
+            [[path, mode, len(contents)] for path, mode, contents in files],
+        ]
+        canonical = json.dumps(
+            metadata, sort_keys=True, separators=(',', ':'), default=_json_default
+        )
+        digest.update(canonical.encode())
+        for path, mode, contents in files:
+            digest.update(contents.encode())
+        return digest.hexdigest()
+
+    def _semantic_data(self):
+        """
+        Returns the data hashed by ``semantic_checksum``
+        and the files sorted by path
+        """
+        if self.intermediate_data is None:
+            self.to_intermediate()
+        self._deduplicate_files()
+        files = [
+            (f['path'], f.get('mode', DEFAULT_FILE_MODE), f['contents'])
+            for f in self.config.get('files', [])
+        ]
+        return [self.__class__.__name__, self.intermediate_data], sorted(files)
+
+    def write(
+        self,
+        name,
+        path='./',
+        compression_level=None,
+        codec=None,
+        manifest=False,
+        previous=None,
+    ):
         """
         Like ``generate`` but writes to disk.
 
-        :param name: file name, the tar.gz extension will be added automatically
+        :param name: file name, the extension of the codec (eg: ``tar.gz``)
+                     will be added automatically
         :param path: directory where the file will be written to, defaults to ``./``
+        :param compression_level: compression level, see ``generate``
+        :param codec: codec of the archive, see ``generate``
+        :param manifest: whether to add a manifest, see ``generate``
+        :param previous: previous manifest or archive, see ``generate``
         :returns: None
         """
-        byte_object = self.generate()
-        file_name = '{0}.tar.gz'.format(name)
+        codec = get_codec(codec or self.codec)
+        file_name = '{0}.{1}'.format(name, codec.extension)
         if not path.endswith('/'):
             path += '/'
-        f = open('{0}{1}'.format(path, file_name), 'wb')
-        f.write(byte_object.getvalue())
-        f.close()
+        destination = '{0}{1}'.format(path, file_name)
+        # the archive is written to a temporary file which replaces the
+        # destination only when complete, therefore errors (eg: validation)
+        # don't leave truncated archives nor destroy the existing one;
+        # the kernel applies the umask to its mode like to any new file
+        temporary = '{0}.{1}.{2}.tmp'.format(path, file_name, secrets.token_hex(8))
+        fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with open(fd, 'wb') as f:
+                self.generate(
+                    fileobj=f,
+                    compression_level=compression_level,
+                    codec=codec,
+                    manifest=manifest,
+                    previous=previous,
+                )
+            os.replace(temporary, destination)
+        except BaseException:
+            os.remove(temporary)
+            raise
 
     def _process_files(self, tar):
         """
@@ -282,7 +613,7 @@ class BaseBackend(object):
         :param mode: string representing file mode, defaults to 644
         :returns: None
         """
-        byte_contents = BytesIO(contents.encode('utf8'))
+        data = contents.encode('utf8')
         info = tarfile.TarInfo(name=name)
         info.size = len(contents)
         # mtime must be 0 or any checksum operation
@@ -290,7 +621,13 @@ class BaseBackend(object):
         info.mtime = 0
         info.type = tarfile.REGTYPE
         info.mode = int(mode, 8)  # permissions converted to decimal notation
-        tar.addfile(tarinfo=info, fileobj=byte_contents)
+        if self._manifest is not None:
+            # the archive contains the first info.size bytes
+            entry = self._manifest.add(info, data[: info.size])
+            previous = self._previous_manifest
+            if previous is not None and previous.unchanged(entry):
+                return
+        tar.addfile(tarinfo=info, fileobj=BytesIO(data))
 
     def to_intermediate(self):
         """
@@ -298,12 +635,13 @@ class BaseBackend(object):
         to the intermediate data structure (self.intermediate_data) that will
         be then used by the renderer class to generate the router configuration
         """
-        self.validate()
-        self.intermediate_data = OrderedDict()
-        for converter_class in self.converters:
-            # skip unnecessary loop cycles
-            if not converter_class.should_run_forward(self.config):
-                continue
+        with self._validated_config():
+            self._to_intermediate()
+
+    def _to_intermediate(self, packages=None):
+        intermediate = IndexedConfig(identifiers=['.name'])
+        self.intermediate_data = intermediate.data
+        for converter_class in self._forward_converters(packages):
             converter = converter_class(self)
             value = converter.to_intermediate()
             # maintain backward compatibility with backends
@@ -312,9 +650,49 @@ class BaseBackend(object):
             if value and isinstance(value, (tuple, list)):  # pragma: nocover
                 value = OrderedDict(value)
             if value:
-                self.intermediate_data = merge_config(
-                    self.intermediate_data, value, list_identifiers=['.name']
-                )
+                # the output of converters is not shared (it's built from
+                # copies of the configuration), hence it's merged in place
+                intermediate.merge(value)
+
+    def _forward_converters(self, packages=None):
+        """
+        Returns the converters which run during the forward conversion;
+        if ``packages`` is specified, only the ones which feed ``packages``
+        and the packages they depend on
+        """
+        # skip unnecessary loop cycles
+        converters = [
+            converter_class
+            for converter_class in self.converters
+            if converter_class.should_run_forward(self.config)
+        ]
+        if packages is None:
+            return converters
+        packages = set(packages)
+        selected = []
+        # converters depend on the output of the previous ones
+        for converter_class in reversed(converters):
+            if packages.intersection(converter_class.forward_packages(self.config)):
+                selected.insert(0, converter_class)
+                packages.update(converter_class.forward_dependencies)
+        return selected
+
+    def _package_data(self, packages):
+        """
+        Returns the intermediate data structure of ``packages`` only;
+        if the configuration hasn't been converted yet, only the converters
+        which feed ``packages`` are run and the result is not stored
+        """
+        data = self.intermediate_data
+        if data is None:
+            try:
+                self._to_intermediate(packages)
+                data = self.intermediate_data
+            finally:
+                self.intermediate_data = None
+        return OrderedDict(
+            (package, blocks) for package, blocks in data.items() if package in packages
+        )
 
     def parse(self, native):
         """
@@ -361,8 +739,11 @@ class BaseVpnBackend(BaseBackend):
     Shared logic between VPN backends
     Requires setting the following attributes:
 
-    - vpn_pattern
     - config_suffix
+
+    The files of the archive are the sections of the renderer
+    (a ``BaseVpnRenderer``), which are split by its ``vpn_key``
+    and ``name_key`` attributes
     """
 
     def _generate_contents(self, tar):
@@ -372,23 +753,40 @@ class BaseVpnBackend(BaseBackend):
         :param tar: tarfile instance
         :returns: None
         """
-        text = self.render(files=False)
-        # create a list with all the packages (and remove empty entries)
-        vpn_instances = self.vpn_pattern.split(text)
-        if '' in vpn_instances:
-            vpn_instances.remove('')
-        # create a file for each VPN
-        for vpn in vpn_instances:
-            lines = vpn.split('\n')
-            # It's better to split lines[0] using
-            # `config_suffix` to extract the correct vpn_name
-            vpn_name = lines[0].split(self.config_suffix)[0]
-            text_contents = '\n'.join(lines[2:])
-            # do not end with double new line
-            if text_contents.endswith('\n\n'):
-                text_contents = text_contents[0:-1]
-            self._add_file(
-                tar=tar,
-                name='{0}{1}'.format(vpn_name, self.config_suffix),
-                contents=text_contents,
-            )
+        with self._validated_config():
+            # create a file for each VPN
+            for vpn_name, output in self._iter_sections():
+                # skip the comment line and the following empty line
+                text_contents = '\n'.join(output.split('\n')[2:])
+                # do not end with double new line
+                if text_contents.endswith('\n\n'):
+                    text_contents = text_contents[0:-1]
+                self._add_file(
+                    tar=tar,
+                    name='{0}{1}'.format(vpn_name, self.config_suffix),
+                    contents=text_contents,
+                )
+
+
+class _DigestWriter(object):
+    """
+    Write only file object which updates a ``hashlib`` digest
+    """
+
+    def __init__(self, digest):
+        self.digest = digest
+
+    def write(self, data):
+        self.digest.update(data)
+        return len(data)
+
+
+def _json_default(value):
+    """
+    JSON representation of the values of the intermediate data structure
+    which aren't JSON types: mappings (eg: UCI sections) as objects,
+    anything else as string
+    """
+    if isinstance(value, Mapping):
+        return dict(value.items())
+    return str(value)
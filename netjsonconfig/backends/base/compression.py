@@ -0,0 +1,144 @@
+"""
+Codecs which compress the archives generated by the backends.
+
+Codecs must be deterministic (eg: the gzip header doesn't contain
+the time of generation), otherwise the checksum of archives with
+the same contents would change each time they are generated.
+"""
+
+import bz2
+import gzip
+import lzma
+
+
+class Codec(object):
+    """
+    Base class of codecs, subclasses implement ``open``
+    """
+
+    #: name of the codec, eg: ``gzip``
+    name = None
+    #: extension of the archives written by ``BaseBackend.write``
+    extension = None
+    #: valid compression levels
+    levels = range(0)
+    #: compression level used when none is specified
+    default_level = None
+
+    def open(self, fileobj, level=None):
+        """
+        Returns a binary file object which compresses the data written
+        to it into ``fileobj``; closing it must not close ``fileobj``
+
+        :param fileobj: binary file object
+        :param level: compression level, ``None`` for ``default_level``
+        :raises ValueError: raised if ``level`` is not valid
+        """
+        if level is None:
+            return self._open(fileobj, self.default_level)
+        # booleans and floats equal to integers are not levels
+        if (
+            not isinstance(level, int)
+            or isinstance(level, bool)
+            or level not in self.levels
+        ):
+            raise ValueError(
+                'invalid compression level for {0}: {1!r}, expected {2}-{3}'.format(
+                    self.name, level, self.levels[0], self.levels[-1]
+                )
+            )
+        return self._open(fileobj, level)
+
+    def _open(self, fileobj, level):
+        raise NotImplementedError()
+
+
+class GzipCodec(Codec):
+    name = 'gzip'
+    extension = 'tar.gz'
+    levels = range(0, 10)
+    default_level = 9
+
+    def _open(self, fileobj, level):
+        # `mtime` must be 0 and `filename` must be empty, otherwise
+        # the gzip header would change each time or for each destination
+        return gzip.GzipFile(
+            filename='', fileobj=fileobj, mode='wb', mtime=0, compresslevel=level
+        )
+
+
+class Bz2Codec(Codec):
+    name = 'bz2'
+    extension = 'tar.bz2'
+    levels = range(1, 10)
+    default_level = 9
+
+    def _open(self, fileobj, level):
+        return bz2.BZ2File(fileobj, mode='wb', compresslevel=level)
+
+
+class XzCodec(Codec):
+    name = 'xz'
+    extension = 'tar.xz'
+    levels = range(0, 10)
+    default_level = 6
+
+    def _open(self, fileobj, level):
+        return lzma.LZMAFile(fileobj, mode='wb', preset=level)
+
+
+class NoCompressionCodec(Codec):
+    """
+    Writes uncompressed tar archives
+    """
+
+    name = 'none'
+    extension = 'tar'
+
+    def open(self, fileobj, level=None):
+        return _Uncompressed(fileobj)
+
+
+class _Uncompressed(object):
+    """
+    Passes the data to ``fileobj`` without closing it,
+    tracks the position for non seekable files (eg: pipes)
+    """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.position = 0
+
+    def write(self, data):
+        self.fileobj.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def close(self):
+        pass
+
+
+codecs = {
+    codec.name: codec
+    for codec in [GzipCodec(), Bz2Codec(), XzCodec(), NoCompressionCodec()]
+}
+
+
+def get_codec(codec):
+    """
+    Returns the codec named ``codec`` (eg: ``gzip``, ``bz2``, ``xz``, ``none``)
+    or ``codec`` itself if it's an instance of ``Codec``
+
+    :raises ValueError: raised if there's no codec named ``codec``
+    """
+    if isinstance(codec, Codec):
+        return codec
+    try:
+        return codecs[codec]
+    except (KeyError, TypeError):
+        raise ValueError(
+            'unknown codec {0!r}, expected one of: {1}'.format(codec, ', '.join(codecs))
+        )
@@ -14,6 +14,9 @@ class BaseConverter(object):
 
     netjson_key = None
     intermediate_key = None
+    # keys of the intermediate data structure which are read
+    # during the forward conversion (eg: blocks of other converters)
+    forward_dependencies = []
 
     def __init__(self, backend):
         self.backend = backend
@@ -28,6 +31,14 @@ class BaseConverter(object):
         """
         return cls.netjson_key in config
 
+    @classmethod
+    def forward_packages(cls, config):
+        """
+        Returns the keys of the intermediate data structure (eg: UCI
+        packages) to which the forward conversion may add blocks
+        """
+        return [cls.intermediate_key]
+
     @classmethod
     def should_run_backward(cls, intermediate_data):
         """
@@ -41,26 +52,26 @@ class BaseConverter(object):
         Loops over item and performs type casting
         according to supplied schema fragment
         """
-        if schema is None:
-            schema = self._schema
-        properties = schema['properties']
-        for key, value in item.items():
-            if key not in properties:
-                continue
-            try:
-                json_type = properties[key]['type']
-            except KeyError:
-                json_type = None
-            # if multiple types are supported, the first
-            # one takes precedence when parsing
-            if isinstance(json_type, list) and json_type:
-                json_type = json_type[0]
-            if json_type == 'integer' and not isinstance(value, int):
-                value = int(value)
-            elif json_type == 'boolean' and not isinstance(value, bool):
-                value = value == '1'
-            item[key] = value
-        return item
+        plan = self._casting_plan(self._schema if schema is None else schema)
+        return _cast(item, plan)
+
+    @classmethod
+    def _casting_plan(cls, schema):
+        """
+        Returns the casting plan of the schema fragment ``schema``:
+        a ``dict`` which maps the properties that need to be cast to
+        their caster; plans are built once and cached on the class
+        """
+        plans = cls.__dict__.get('_casting_plans')
+        if plans is None:
+            plans = cls._casting_plans = {}
+        try:
+            return plans[id(schema)][1]
+        except KeyError:
+            plan = _compile_casting_plan(schema)
+            # the fragment is kept in the cache, hence its id is not reused
+            plans[id(schema)] = (schema, plan)
+            return plan
 
     def get_copy(self, dict_, key, default=None):
         return get_copy(dict_, key, default)
@@ -133,3 +144,38 @@ class BaseConverter(object):
 
     def should_skip_block(self, block):
         return not block
+
+
+def _cast_integer(value):
+    return value if isinstance(value, int) else int(value)
+
+
+def _cast_boolean(value):
+    return value if isinstance(value, bool) else value == '1'
+
+
+_casters = {'integer': _cast_integer, 'boolean': _cast_boolean}
+
+
+def _cast(item, plan):
+    for key, value in item.items():
+        caster = plan.get(key)
+        if caster is not None:
+            item[key] = caster(value)
+    return item
+
+
+def _compile_casting_plan(schema):
+    plan = {}
+    for key, definition in schema['properties'].items():
+        try:
+            json_type = definition['type']
+        except KeyError:
+            continue
+        # if multiple types are supported, the first
+        # one takes precedence when parsing
+        if isinstance(json_type, list) and json_type:
+            json_type = json_type[0]
+        if isinstance(json_type, str) and json_type in _casters:
+            plan[key] = _casters[json_type]
+    return plan
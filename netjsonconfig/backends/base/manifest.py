@@ -0,0 +1,104 @@
+import hashlib
+import json
+import tarfile
+from collections import OrderedDict
+
+
+class Manifest(object):
+    """
+    Lists path, mode, size and SHA-256 hash of the files of an archive,
+    which allows to find out which files changed without extracting
+    the archive; it's stored in JSON format, eg::
+
+        {
+            "files": [
+                {
+                    "path": "etc/config/system",
+                    "mode": "0644",
+                    "size": 91,
+                    "sha256": "8f7d..."
+                }
+            ]
+        }
+
+    The manifest of delta archives lists all the files of the
+    configuration (including the ones which are not in the archive
+    because they didn't change) and the removed paths, eg::
+
+        {"files": [...], "removed": ["etc/config/wireless"]}
+    """
+
+    def __init__(self, files=None, removed=None):
+        """
+        :param files: ``list`` of ``dict`` with ``path``, ``mode``,
+                      ``size`` and ``sha256`` keys
+        :param removed: ``list`` of paths removed since the previous
+                        version (delta archives only)
+        """
+        self.files = OrderedDict()
+        for entry in files or []:
+            self.files[entry['path']] = entry
+        self.removed = removed
+
+    def add(self, info, data):
+        """
+        Adds a file to the manifest and returns its entry
+
+        :param info: ``tarfile.TarInfo`` instance of the file
+        :param data: ``bytes`` contents of the file
+        """
+        entry = OrderedDict(
+            (
+                ('path', info.name),
+                ('mode', '{0:04o}'.format(info.mode)),
+                ('size', info.size),
+                ('sha256', hashlib.sha256(data).hexdigest()),
+            )
+        )
+        self.files[info.name] = entry
+        return entry
+
+    def unchanged(self, entry):
+        """
+        Returns whether ``entry`` is listed in the manifest
+        with the same mode, size and hash
+        """
+        return self.files.get(entry['path']) == entry
+
+    def dumps(self):
+        """
+        Returns the manifest in JSON format
+        """
+        data = OrderedDict(files=list(self.files.values()))
+        if self.removed is not None:
+            data['removed'] = self.removed
+        return json.dumps(data, indent=4) + '\n'
+
+    @classmethod
+    def loads(cls, text):
+        """
+        Returns the ``Manifest`` of ``text`` (JSON format)
+        """
+        data = json.loads(text)
+        return cls(data['files'], data.get('removed'))
+
+    @classmethod
+    def from_archive(cls, fileobj, name):
+        """
+        Returns the manifest of the archive ``fileobj``: its member
+        ``name`` if present, otherwise the files are hashed
+
+        :param fileobj: binary file object of the archive (any codec),
+                        which is read from its current position
+        :param name: name of the manifest member
+        """
+        manifest = cls()
+        with tarfile.open(fileobj=fileobj, mode='r:*') as tar:
+            for info in tar:
+                if not info.isfile():
+                    continue
+                data = tar.extractfile(info).read()
+                if info.name == name:
+                    return cls.loads(data.decode())
+                manifest.add(info, data)
+        return manifest
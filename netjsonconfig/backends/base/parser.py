@@ -1,3 +1,5 @@
+import tarfile
+
 from netjsonconfig.exceptions import ParseError
 
 
@@ -24,3 +26,20 @@ class BaseParser(object):
 
     def parse_tar(self, config):
         raise NotImplementedError()
+
+    def _iter_tar(self, tar, match):
+        """
+        Yields the name and the contents (``str``) of each file of the
+        archive ``tar`` (``tar.gz``, or any other format supported by
+        ``tarfile``) whose name satisfies ``match``; the archive is read
+        as a stream: members are extracted one at a time, in the order
+        of the archive, hence ``tar`` doesn't need to be seekable
+        (eg: uploads, pipes); the other members (eg: keys, certificates)
+        are neither extracted nor decoded
+        """
+        fileobj = tar.buffer if hasattr(tar, 'buffer') else tar
+        with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+            for member in archive:
+                if not member.isfile() or not match(member.name):
+                    continue
+                yield member.name, archive.extractfile(member).read().decode()
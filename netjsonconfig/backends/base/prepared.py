@@ -0,0 +1,145 @@
+from copy import copy, deepcopy
+
+from ...exceptions import ValidationError
+from ...utils import evaluate_vars
+from .validator import _unique, string_affects_validity
+
+
+class PreparedConfig(object):
+    """
+    Configuration merged with its templates and validated once,
+    which can be instantiated for many devices with different
+    contexts (configuration variables), eg::
+
+        prepared = OpenWrt.prepare(config, templates=templates)
+        for context in contexts:
+            prepared.instantiate(context).generate()
+
+    Only the strings which contain variables are evaluated for each
+    device; validation is skipped when the values of these strings
+    can't affect the verdict of the schema (eg: descriptions).
+
+    The configuration of the instances is not a deep copy: the sections
+    (eg: ``general``, each interface) and the containers which hold
+    evaluated strings are copied, the other containers (eg: the addresses
+    of interfaces) are shared with the prepared configuration, hence they
+    must not be modified in place.
+    """
+
+    def __init__(self, backend_class, config, templates=None, **kwargs):
+        """
+        :param backend_class: backend class, eg: ``OpenWrt``
+        :param config: ``dict`` containing a **NetJSON** configuration dictionary
+        :param templates: ``list`` containing **NetJSON** configuration dictionaries
+        :param kwargs: additional arguments of the backend (eg: ``dsa``)
+        """
+        self.backend_class = backend_class
+        self.kwargs = kwargs
+        backend = backend_class(config, templates=templates, **kwargs)
+        # the validation of some backends modifies the configuration
+        self.config = deepcopy(backend.config)
+        self.slots = list(self._find_slots(self.config, ()))
+        try:
+            backend.validate()
+        except ValidationError:
+            # the error will be raised by the instances
+            self.valid = False
+        else:
+            self.valid = True
+        # slots which may affect the validity and, for the others,
+        # the arrays whose items must be unique
+        self.dependent_slots = set()
+        self.unique_arrays = {}
+        for path in self.slots:
+            unique_arrays = set()
+            if string_affects_validity(
+                backend_class.schema,
+                path,
+                backend_class.format_checker,
+                unique_arrays,
+            ):
+                self.dependent_slots.add(path)
+            else:
+                self.unique_arrays[path] = unique_arrays
+
+    def _find_slots(self, data, path):
+        """
+        yields the paths of the strings which contain variables
+        """
+        items = data.items() if isinstance(data, dict) else enumerate(data)
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                yield from self._find_slots(value, path + (key,))
+            elif isinstance(value, str) and '{' in value and '{{' in value:
+                yield path + (key,)
+
+    def instantiate(self, context=None):
+        """
+        Returns a backend instance for ``context``, equivalent to
+        ``backend_class(config, templates=templates, context=context)``
+
+        :param context: ``dict`` containing configuration variables
+        """
+        copied = set()
+        config = _copy_sections(self.config, copied)
+        revalidate = not self.valid
+        unique_arrays = set()
+        for path in self.slots if context else []:
+            node = self.config
+            for key in path:
+                node = node[key]
+            value = evaluate_vars(node, context)
+            if value == node:
+                continue
+            revalidate = revalidate or path in self.dependent_slots
+            unique_arrays.update(self.unique_arrays.get(path, []))
+            # copies only the containers of the path of the modified string
+            node = config
+            for key in path[:-1]:
+                child = node[key]
+                if id(child) not in copied:
+                    child = copy(child)
+                    copied.add(id(child))
+                    node[key] = child
+                node = child
+            node[path[-1]] = value
+        for path in unique_arrays if not revalidate else []:
+            array = config
+            for key in path:
+                array = array[key]
+            if not _unique(array):
+                revalidate = True
+                break
+        # the backend would copy the whole configuration,
+        # which is set after initializing it with an empty one
+        backend = self.backend_class({}, **self.kwargs)
+        backend.config = config
+        backend._schema_valid = not revalidate
+        return backend
+
+
+def _copy_sections(config, copied):
+    """
+    Returns a copy of ``config`` in which the sections and the items of
+    the lists of sections are copied too (the backends add items and
+    keys to them, eg: ``files``), nested containers are shared;
+    the ids of the copies are added to ``copied``
+    """
+    config = copy(config)
+    copied.add(id(config))
+    for key, section in config.items():
+        if isinstance(section, dict):
+            section = copy(section)
+        elif isinstance(section, list):
+            section = [
+                copy(item) if isinstance(item, (dict, list)) else item
+                for item in section
+            ]
+            copied.update(
+                id(item) for item in section if isinstance(item, (dict, list))
+            )
+        else:
+            continue
+        copied.add(id(section))
+        config[key] = section
+    return config
@@ -1,5 +1,35 @@
+from collections import OrderedDict
+
 from jinja2 import Environment, PackageLoader
 
+# jinja2 environments (and their compiled templates) by package
+_environments = {}
+
+
+def get_template_env(package, bytecode_cache=None):
+    """
+    Returns the jinja2 ``Environment`` which loads the templates of
+    ``package``; environments are built once and keep the compiled
+    templates, therefore each template is compiled once per process.
+
+    :param package: python package which contains the ``templates`` directory
+    :param bytecode_cache: optional ``jinja2.BytecodeCache``, eg:
+                           ``jinja2.FileSystemBytecodeCache`` to store
+                           compiled templates on disk for other processes
+    """
+    key = (package, bytecode_cache)
+    env = _environments.get(key)
+    if env is None:
+        env = Environment(
+            loader=PackageLoader(package, 'templates'),
+            trim_blocks=True,
+            # templates are not expected to change at runtime
+            auto_reload=False,
+            bytecode_cache=bytecode_cache,
+        )
+        env = _environments.setdefault(key, env)
+    return env
+
 
 class BaseRenderer(object):
     """
@@ -8,9 +38,20 @@ class BaseRenderer(object):
     which represents the router configuration
     """
 
-    def __init__(self, backend):
+    # optional jinja2.BytecodeCache shared by all the renderers
+    bytecode_cache = None
+
+    def __init__(self, backend, intermediate_data=None):
+        """
+        :param backend: backend instance
+        :param intermediate_data: intermediate data structure to render,
+                                  defaults to the one of ``backend``
+        """
         self.config = backend.config
         self.backend = backend
+        if intermediate_data is None:
+            intermediate_data = getattr(backend, 'intermediate_data', {})
+        self.intermediate_data = intermediate_data
 
     @property
     def env_path(self):
@@ -18,9 +59,7 @@ class BaseRenderer(object):
 
     @property
     def template_env(self):
-        return Environment(
-            loader=PackageLoader(self.env_path, 'templates'), trim_blocks=True
-        )
+        return get_template_env(self.env_path, self.bytecode_cache)
 
     @classmethod
     def get_name(cls):
@@ -41,10 +80,77 @@ class BaseRenderer(object):
         """
         Renders configuration by using the jinja2 templating engine
         """
+        return self._render_template(self.intermediate_data)
+
+    def _render_template(self, data):
+        """
+        Renders ``data`` (intermediate data structure) with the template
+        """
         # get jinja2 template
         template_name = '{0}.jinja2'.format(self.get_name())
         template = self.template_env.get_template(template_name)
         # render template and cleanup
-        context = getattr(self.backend, 'intermediate_data', {})
-        output = template.render(data=context)
+        output = template.render(data=data)
         return self.cleanup(output)
+
+    def iter_render(self):
+        """
+        Yields the rendered configuration in chunks,
+        by default the output of each section (see ``iter_sections``)
+        """
+        for name, output in self.iter_sections():
+            yield output
+
+    def iter_sections(self):
+        """
+        Yields ``(name, output)`` for each section of the configuration
+        (eg: UCI package, VPN instance), which are the files of the archives
+        generated by the backends; the concatenation of the outputs is
+        the output of ``render``. By default the whole output is a section
+        named ``None``
+        """
+        yield None, self.render()
+
+    def render_sections(self):
+        """
+        Returns an ``OrderedDict`` which maps the name of each section
+        to its output, see ``iter_sections``
+        """
+        return OrderedDict(self.iter_sections())
+
+    @staticmethod
+    def _separate(sections, separator='\n'):
+        """
+        Appends ``separator`` to the output of each section but the last
+        """
+        previous = None
+        for section in sections:
+            if previous is not None:
+                yield previous[0], previous[1] + separator
+            previous = section
+        if previous is not None:
+            yield previous
+
+
+class BaseVpnRenderer(BaseRenderer):
+    """
+    Shared logic between the renderers of VPN backends,
+    each VPN instance is a section of the output
+
+    Requires setting the following attributes:
+
+    - vpn_key: key of the VPN instances in the intermediate data structure
+    - name_key: key of the name of each VPN instance
+    """
+
+    vpn_key = None
+    name_key = 'name'
+
+    def iter_sections(self):
+        vpn_instances = (self.intermediate_data or {}).get(self.vpn_key, [])
+        # each instance is rendered on its own, like in the whole output
+        # the instances are separated by an empty line
+        return self._separate(
+            (vpn[self.name_key], self._render_template({self.vpn_key: [vpn]}))
+            for vpn in vpn_instances
+        )
@@ -0,0 +1,794 @@
+"""
+JSON-Schema (draft 4) validation engines
+
+``DispatchValidator`` is the ``jsonschema.Draft4Validator`` with
+a fast path for ``oneOf``: when an enumerated property (eg: the
+``type`` of interfaces) identifies the branch, only that branch
+is validated.
+
+``CompiledValidator`` translates a backend schema into specialized
+python functions (one per schema fragment) the first time it is
+instantiated, in a similar fashion to ``fastjsonschema``.
+
+The generated functions only compute the verdict (valid or not),
+when a configuration is not valid the error is built by
+``DispatchValidator``, which guarantees the same ``ValidationError``
+semantics of the interpreting validator.
+
+``CachedFormatChecker`` memoizes the results of format checks.
+
+``string_affects_validity`` tells whether changing a string of
+a valid instance can change the verdict of a schema.
+"""
+
+import re
+from fractions import Fraction
+from numbers import Number
+from urllib.parse import unquote
+
+from jsonschema import Draft4Validator, FormatChecker, validators
+from jsonschema._utils import equal, uniq
+from jsonschema.exceptions import FormatError
+
+from ...utils import LRUCache
+
+_TYPE_CHECKS = {
+    'array': 'isinstance(data, list)',
+    'boolean': 'isinstance(data, bool)',
+    'integer': '(isinstance(data, int) and not isinstance(data, bool))',
+    'null': 'data is None',
+    'number': '(isinstance(data, Number) and not isinstance(data, bool))',
+    'object': 'isinstance(data, dict)',
+    'string': 'isinstance(data, str)',
+}
+_NUMBER_CHECK = _TYPE_CHECKS['number']
+# keywords which affect validation
+_VALIDATION_KEYWORDS = set(Draft4Validator.VALIDATORS.keys())
+_draft4_one_of = Draft4Validator.VALIDATORS['oneOf']
+
+
+def _resolve(root, ref):
+    """
+    resolves a local JSON reference (eg: ``#/definitions/interface``)
+    """
+    if not ref.startswith('#'):
+        raise NotImplementedError(
+            'Only local references are supported, got "{0}"'.format(ref)
+        )
+    document = root
+    for part in unquote(ref[1:]).split('/')[1:]:
+        part = part.replace('~1', '/').replace('~0', '~')
+        if isinstance(document, list):
+            part = int(part)
+        document = document[part]
+    return document
+
+
+class _OneOfDispatcher(object):
+    """
+    Finds the enumerated properties of ``oneOf`` branches (eg: the
+    ``type`` of interfaces); if the value of one of these properties
+    is not allowed in a branch, that branch will surely fail and
+    therefore doesn't need to be validated.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.cache = {}
+
+    def constraints(self, one_of):
+        """
+        returns a tuple which contains, for each branch,
+        a tuple of ``(property, allowed_values)`` pairs
+        """
+        key = id(one_of)
+        if key not in self.cache:
+            constraints = tuple(
+                tuple(self._properties(branch, set()).items()) for branch in one_of
+            )
+            # keeps a reference to ``one_of`` to ensure its id stays unique
+            self.cache[key] = (one_of, constraints)
+        return self.cache[key][1]
+
+    def candidates(self, one_of, instance):
+        """
+        returns the indexes of the branches which may validate ``instance``
+        """
+        candidates = []
+        for index, branch in enumerate(self.constraints(one_of)):
+            for name, allowed in branch:
+                if name not in instance:
+                    continue
+                value = instance[name]
+                if not isinstance(value, str) or value not in allowed:
+                    break
+            else:
+                candidates.append(index)
+        return candidates
+
+    def keyword(self, validator, one_of, instance, schema):
+        """
+        implementation of the ``oneOf`` keyword, falls back to
+        the one of jsonschema when the branch can't be identified
+        or when the instance is not valid (to produce the same errors)
+        """
+        if isinstance(instance, dict):
+            candidates = self.candidates(one_of, instance)
+            if len(candidates) == 1:
+                index = candidates[0]
+                errors = validator.descend(instance, one_of[index], schema_path=index)
+                if next(errors, None) is None:
+                    return
+        yield from _draft4_one_of(validator, one_of, instance, schema)
+
+    def _dereference(self, schema, seen):
+        while isinstance(schema, dict) and '$ref' in schema:
+            if id(schema) in seen:
+                return None
+            seen.add(id(schema))
+            try:
+                schema = _resolve(self.root, schema['$ref'])
+            except (NotImplementedError, LookupError, ValueError):
+                return None
+        return schema
+
+    def _properties(self, schema, seen):
+        schema = self._dereference(schema, seen)
+        if not isinstance(schema, dict):
+            return {}
+        result = {}
+        for name, subschema in schema.get('properties', {}).items():
+            self._restrict(result, name, self._enum(subschema, set(seen)))
+        for subschema in schema.get('allOf', []):
+            for name, values in self._properties(subschema, set(seen)).items():
+                self._restrict(result, name, values)
+        return result
+
+    def _enum(self, schema, seen):
+        """
+        returns the values allowed by the ``enum`` of ``schema``
+        or ``None`` if ``schema`` doesn't enumerate strings only
+        """
+        schema = self._dereference(schema, seen)
+        if not isinstance(schema, dict):
+            return None
+        values = None
+        enum = schema.get('enum')
+        if isinstance(enum, list) and all(isinstance(value, str) for value in enum):
+            values = frozenset(enum)
+        for subschema in schema.get('allOf', []):
+            values = self._intersect(values, self._enum(subschema, seen))
+        return values
+
+    def _restrict(self, result, name, values):
+        if values is not None:
+            result[name] = self._intersect(result.get(name), values)
+
+    def _intersect(self, values, other):
+        if values is None:
+            return other
+        if other is None:
+            return values
+        return values & other
+
+
+def _dispatch_one_of(data, functions, dispatcher, one_of):
+    """
+    like ``_one_of`` but skips the branches which surely fail
+    """
+    if isinstance(data, dict):
+        functions = [functions[index] for index in dispatcher.candidates(one_of, data)]
+    return _one_of(data, functions)
+
+
+def _one_of(data, functions):
+    """
+    returns ``True`` if ``data`` is valid under exactly one of ``functions``
+    """
+    valid = False
+    for function in functions:
+        if function(data):
+            if valid:
+                return False
+            valid = True
+    return valid
+
+
+def _freeze(value):
+    """
+    returns a hashable representation of ``value``, two values are
+    considered equal by jsonschema if and only if their frozen
+    representations are equal (``True`` is not equal to ``1``)
+    """
+    if isinstance(value, str):
+        return ('s', value)
+    if isinstance(value, bool):
+        return ('b', value)
+    if isinstance(value, dict):
+        return ('m', frozenset((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return ('l', tuple(_freeze(item) for item in value))
+    return ('v', value)
+
+
+def _unique(data):
+    """
+    faster equivalent of ``jsonschema._utils.uniq``, which falls back
+    to comparing each element with every other element of the list
+    when they are not sortable (eg: list of objects)
+    """
+    try:
+        return len(set(_freeze(item) for item in data)) == len(data)
+    except TypeError:
+        return uniq(data)
+
+
+def _not_multiple_of(data, divisor):
+    """
+    same logic of the ``multipleOf`` keyword of jsonschema
+    """
+    if isinstance(divisor, float):
+        quotient = data / divisor
+        try:
+            return int(quotient) != quotient
+        except OverflowError:
+            return (Fraction(data) / Fraction(divisor)).denominator != 1
+    return data % divisor
+
+
+def _valid(data):
+    return True
+
+
+def _invalid(data):
+    return False
+
+
+class _SchemaCompiler(object):
+    """
+    Generates the source code of the validation functions of a schema
+    """
+
+    def __init__(self, schema, format_checker=None):
+        self.root = schema
+        self.format_checker = format_checker
+        self.dispatcher = _OneOfDispatcher(schema)
+        self.names = {}
+        self.pending = []
+        self.resolving = set()
+        self.lines = []
+        self.namespace = {
+            'Number': Number,
+            # the exact equality semantics of jsonschema (eg: ``True`` is
+            # not equal to ``1``) ensure the compiled validator gives the
+            # same verdicts (``_unique`` falls back to ``uniq`` likewise)
+            'equal': equal,
+            '_unique': _unique,
+            '_one_of': _one_of,
+            '_dispatch_one_of': _dispatch_one_of,
+            'dispatcher': self.dispatcher,
+            '_not_multiple_of': _not_multiple_of,
+            '_valid': _valid,
+            '_invalid': _invalid,
+            'format_checker': format_checker,
+            # keep references to schema fragments, their ``id``
+            # is used as key in ``self.names``
+            '_schemas': [],
+        }
+
+    def compile(self):
+        """
+        returns the validation function of the root schema
+        """
+        name = self.function(self.root)
+        while self.pending:
+            self.emit(*self.pending.pop())
+        exec(compile('\n'.join(self.lines), '<schema>', 'exec'), self.namespace)
+        return self.namespace[name]
+
+    def constant(self, value):
+        name = '_c{0}'.format(len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def resolve(self, ref):
+        return _resolve(self.root, ref)
+
+    def function(self, schema):
+        """
+        returns the name of the function which validates ``schema``
+        """
+        if schema is True or schema == {}:
+            return '_valid'
+        if schema is False:
+            return '_invalid'
+        key = id(schema)
+        if key in self.names:
+            return self.names[key]
+        self.namespace['_schemas'].append(schema)
+        # in draft 4 "$ref" overrides any sibling keyword
+        if '$ref' in schema:
+            if key in self.resolving:
+                raise NotImplementedError('Circular reference: {0}'.format(schema))
+            self.resolving.add(key)
+            name = self.function(self.resolve(schema['$ref']))
+            self.resolving.discard(key)
+        elif not _VALIDATION_KEYWORDS.intersection(schema):
+            name = '_valid'
+        else:
+            name = '_v{0}'.format(len(self.names))
+            self.pending.append((name, schema))
+        self.names[key] = name
+        return name
+
+    def emit(self, name, schema):
+        body = []
+        self.emit_type(schema, body)
+        self.emit_format(schema, body)
+        self.emit_enum(schema, body)
+        self.emit_string(schema, body)
+        self.emit_number(schema, body)
+        self.emit_array(schema, body)
+        self.emit_object(schema, body)
+        self.emit_combinators(schema, body)
+        self.lines.append('def {0}(data):'.format(name))
+        self.lines.extend('    ' + line for line in body)
+        self.lines.append('    return True')
+        self.lines.append('')
+
+    def check(self, body, condition, indent=0):
+        """
+        adds a check which makes the validation fail if ``condition`` is true
+        """
+        prefix = '    ' * indent
+        body.append('{0}if {1}:'.format(prefix, condition))
+        body.append('{0}    return False'.format(prefix))
+
+    def call(self, schema, value):
+        """
+        returns an expression which is true when ``value`` is NOT valid
+        or ``None`` if ``schema`` does not validate anything
+        """
+        name = self.function(schema)
+        if name == '_valid':
+            return None
+        if name == '_invalid':
+            return 'True'
+        return 'not {0}({1})'.format(name, value)
+
+    def emit_type(self, schema, body):
+        if 'type' not in schema:
+            return
+        types = schema['type']
+        if not isinstance(types, list):
+            types = [types]
+        try:
+            conditions = [_TYPE_CHECKS[type_] for type_ in types]
+        except (KeyError, TypeError):
+            raise NotImplementedError('Unsupported type: {0}'.format(types))
+        self.check(body, 'not ({0})'.format(' or '.join(conditions) or 'False'))
+
+    def emit_format(self, schema, body):
+        if 'format' not in schema or self.format_checker is None:
+            return
+        self.check(
+            body, 'not format_checker.conforms(data, {0!r})'.format(schema['format'])
+        )
+
+    def emit_enum(self, schema, body):
+        if 'enum' not in schema:
+            return
+        enum = schema['enum']
+        strings = frozenset(value for value in enum if isinstance(value, str))
+        others = [value for value in enum if not isinstance(value, str)]
+        body.append('if isinstance(data, str):')
+        self.check(body, 'data not in {0}'.format(self.constant(strings)), indent=1)
+        body.append('else:')
+        if others:
+            self.check(
+                body,
+                'not any(equal(value, data) for value in {0})'.format(
+                    self.constant(others)
+                ),
+                indent=1,
+            )
+        else:
+            body.append('    return False')
+
+    def emit_string(self, schema, body):
+        checks = []
+        if 'minLength' in schema:
+            checks.append('len(data) < {0!r}'.format(schema['minLength']))
+        if 'maxLength' in schema:
+            checks.append('len(data) > {0!r}'.format(schema['maxLength']))
+        if 'pattern' in schema:
+            pattern = self.constant(re.compile(schema['pattern']))
+            checks.append('{0}.search(data) is None'.format(pattern))
+        if not checks:
+            return
+        body.append('if isinstance(data, str):')
+        for check in checks:
+            self.check(body, check, indent=1)
+
+    def emit_number(self, schema, body):
+        checks = []
+        if 'minimum' in schema:
+            operator = '<=' if schema.get('exclusiveMinimum', False) else '<'
+            checks.append('data {0} {1!r}'.format(operator, schema['minimum']))
+        if 'maximum' in schema:
+            operator = '>=' if schema.get('exclusiveMaximum', False) else '>'
+            checks.append('data {0} {1!r}'.format(operator, schema['maximum']))
+        if 'multipleOf' in schema:
+            checks.append(
+                '_not_multiple_of(data, {0})'.format(
+                    self.constant(schema['multipleOf'])
+                )
+            )
+        if not checks:
+            return
+        body.append('if {0}:'.format(_NUMBER_CHECK))
+        for check in checks:
+            self.check(body, check, indent=1)
+
+    def emit_array(self, schema, body):
+        checks = []
+        if 'minItems' in schema:
+            checks.append('len(data) < {0!r}'.format(schema['minItems']))
+        if 'maxItems' in schema:
+            checks.append('len(data) > {0!r}'.format(schema['maxItems']))
+        if schema.get('uniqueItems'):
+            checks.append('not _unique(data)')
+        loops = self.items_checks(schema, checks)
+        if not checks and not loops:
+            return
+        body.append('if isinstance(data, list):')
+        for check in checks:
+            self.check(body, check, indent=1)
+        for iterable, condition in loops:
+            body.append('    for item in {0}:'.format(iterable))
+            self.check(body, condition, indent=2)
+
+    def items_checks(self, schema, checks):
+        """
+        handles ``items`` and ``additionalItems``, adds the checks
+        of the single items to ``checks`` and returns the loops
+        """
+        loops = []
+        items = schema.get('items', {})
+        if isinstance(items, dict):
+            condition = self.call(items, 'item') if 'items' in schema else None
+            if condition:
+                loops.append(('data', condition))
+            return loops
+        for index, item_schema in enumerate(items):
+            condition = self.call(item_schema, 'data[{0}]'.format(index))
+            if condition:
+                checks.append('len(data) > {0} and {1}'.format(index, condition))
+        additional = schema.get('additionalItems', True)
+        if isinstance(additional, dict):
+            condition = self.call(additional, 'item')
+            if condition:
+                loops.append(('data[{0}:]'.format(len(items)), condition))
+        elif not additional:
+            checks.append('len(data) > {0}'.format(len(items)))
+        return loops
+
+    def emit_object(self, schema, body):  # noqa: C901
+        checks = []
+        loops = []
+        for key in schema.get('required', []):
+            checks.append('{0!r} not in data'.format(key))
+        if 'minProperties' in schema:
+            checks.append('len(data) < {0!r}'.format(schema['minProperties']))
+        if 'maxProperties' in schema:
+            checks.append('len(data) > {0!r}'.format(schema['maxProperties']))
+        properties = schema.get('properties', {})
+        for key, subschema in properties.items():
+            condition = self.call(subschema, 'data[{0!r}]'.format(key))
+            if condition:
+                checks.append('{0!r} in data and {1}'.format(key, condition))
+        pattern_properties = schema.get('patternProperties', {})
+        for pattern, subschema in pattern_properties.items():
+            condition = self.call(subschema, 'value')
+            if condition:
+                pattern = self.constant(re.compile(pattern))
+                loops.append(
+                    '{0}.search(key) is not None and {1}'.format(pattern, condition)
+                )
+        additional = schema.get('additionalProperties', True)
+        if additional is not True and additional != {}:
+            condition = 'key not in {0}'.format(self.constant(frozenset(properties)))
+            if pattern_properties:
+                patterns = re.compile('|'.join(pattern_properties))
+                condition += ' and {0}.search(key) is None'.format(
+                    self.constant(patterns)
+                )
+            if isinstance(additional, dict):
+                extra = self.call(additional, 'value')
+                if extra:
+                    loops.append('{0} and {1}'.format(condition, extra))
+            elif not additional:
+                loops.append(condition)
+        for key, dependency in schema.get('dependencies', {}).items():
+            if isinstance(dependency, list):
+                for required in dependency:
+                    checks.append(
+                        '{0!r} in data and {1!r} not in data'.format(key, required)
+                    )
+            else:
+                condition = self.call(dependency, 'data')
+                if condition:
+                    checks.append('{0!r} in data and {1}'.format(key, condition))
+        if not checks and not loops:
+            return
+        body.append('if isinstance(data, dict):')
+        for check in checks:
+            self.check(body, check, indent=1)
+        if loops:
+            body.append('    for key, value in data.items():')
+            for condition in loops:
+                self.check(body, condition, indent=2)
+
+    def emit_combinators(self, schema, body):
+        for subschema in schema.get('allOf', []):
+            condition = self.call(subschema, 'data')
+            if condition:
+                self.check(body, condition)
+        if 'anyOf' in schema:
+            names = [self.function(subschema) for subschema in schema['anyOf']]
+            if '_valid' not in names:
+                self.check(
+                    body,
+                    'not ({0})'.format(
+                        ' or '.join('{0}(data)'.format(name) for name in names)
+                        or 'False'
+                    ),
+                )
+        if 'oneOf' in schema:
+            names = [self.function(subschema) for subschema in schema['oneOf']]
+            functions = '({0},)'.format(', '.join(names)) if names else '()'
+            if any(self.dispatcher.constraints(schema['oneOf'])):
+                self.check(
+                    body,
+                    'not _dispatch_one_of(data, {0}, dispatcher, {1})'.format(
+                        functions, self.constant(schema['oneOf'])
+                    ),
+                )
+            else:
+                self.check(body, 'not _one_of(data, {0})'.format(functions))
+        if 'not' in schema:
+            self.check(body, '{0}(data)'.format(self.function(schema['not'])))
+
+
+class DispatchValidator(object):
+    """
+    ``jsonschema.Draft4Validator`` which validates only the
+    branch of ``oneOf`` identified by enumerated properties,
+    eg: the ``type`` of an interface
+    """
+
+    def __init__(self, schema, format_checker=None):
+        self.schema = schema
+        self.format_checker = format_checker
+        dispatcher = _OneOfDispatcher(schema)
+        validator_class = validators.extend(
+            Draft4Validator, {'oneOf': dispatcher.keyword}
+        )
+        self._validator = validator_class(schema, format_checker=format_checker)
+
+    def is_valid(self, instance):
+        return self._validator.is_valid(instance)
+
+    def iter_errors(self, instance):
+        return self._validator.iter_errors(instance)
+
+    def validate(self, instance):
+        """
+        :raises jsonschema.exceptions.ValidationError: if ``instance`` is not valid
+        """
+        self._validator.validate(instance)
+
+
+class CompiledValidator(object):
+    """
+    JSON-Schema (draft 4) validator which compiles the schema
+    to python code, it can be used as ``validator_class`` of backends:
+
+    .. code-block:: python
+
+        from netjsonconfig import OpenWrt
+        from netjsonconfig.backends.base.validator import CompiledValidator
+
+
+        class FastOpenWrt(OpenWrt):
+            validator_class = CompiledValidator
+    """
+
+    def __init__(self, schema, format_checker=None):
+        self.schema = schema
+        self.format_checker = format_checker
+        self._is_valid = _SchemaCompiler(schema, format_checker).compile()
+        # produces the errors of invalid configurations
+        self._validator = DispatchValidator(schema, format_checker=format_checker)
+
+    def is_valid(self, instance):
+        return self._is_valid(instance)
+
+    def iter_errors(self, instance):
+        if self._is_valid(instance):
+            return
+        yield from self._validator.iter_errors(instance)
+
+    def validate(self, instance):
+        """
+        :raises jsonschema.exceptions.ValidationError: if ``instance`` is not valid
+        """
+        if not self._is_valid(instance):
+            self._validator.validate(instance)
+
+
+class CachedFormatChecker(FormatChecker):
+    """
+    ``jsonschema.FormatChecker`` which shares the checkers of
+    ``format_checker`` and remembers the results of the last
+    ``maxsize`` checks: configurations derived from the same
+    templates repeat the same subnets and hostnames many times.
+
+    ``cache_info()`` returns hits and misses of the cache.
+    """
+
+    def __init__(self, format_checker, maxsize=4096):
+        # shared: checkers registered later are used as well
+        self.checkers = format_checker.checkers
+        self.cache = LRUCache(maxsize)
+
+    def check(self, instance, format):
+        """
+        :raises jsonschema.exceptions.FormatError: if ``instance``
+                                                   doesn't conform to ``format``
+        """
+        if format not in self.checkers:
+            return
+        # the type is part of the key because eg: ``1 == True``
+        key = (format, type(instance), instance)
+        try:
+            result = self.cache.get(key)
+        except TypeError:
+            # unhashable instance
+            return super().check(instance, format)
+        if result is None:
+            try:
+                super().check(instance, format)
+                result = (True, None)
+            except FormatError as e:
+                cause = e.cause
+                if cause is not None:
+                    cause = cause.with_traceback(None)
+                result = (False, cause)
+            self.cache.set(key, result)
+        if not result[0]:
+            raise FormatError(
+                '{0!r} is not a {1!r}'.format(instance, format), cause=result[1]
+            )
+
+    def cache_info(self):
+        return self.cache.cache_info()
+
+    def cache_clear(self):
+        self.cache.cache_clear()
+
+
+# keywords which constrain the value of strings
+_STRING_KEYWORDS = ('enum', 'maxLength', 'minLength', 'pattern')
+
+
+def string_affects_validity(schema, path, format_checker=None, unique_arrays=None):
+    """
+    Returns ``False`` if replacing the string found at ``path`` (a
+    sequence of keys and indexes) of an instance with another string
+    can't change the verdict of ``schema`` (eg: the string is a
+    description), otherwise returns ``True``.
+
+    If ``format_checker`` is passed, only its formats are taken
+    into account, otherwise any ``format`` constrains strings.
+
+    If the ``unique_arrays`` set is passed, the paths of the arrays
+    which contain the string and whose items must be unique are added
+    to it, instead of considering the string as affecting the verdict;
+    the uniqueness of these arrays must be checked by the caller.
+    """
+    unique = set()
+    free = _string_is_free(schema, schema, tuple(path), (), format_checker, unique)
+    if unique_arrays is None:
+        return not free or bool(unique)
+    unique_arrays.update(unique)
+    return not free
+
+
+def _string_is_free(root, schema, path, prefix, format_checker, unique):
+    schemas = _applicable_schemas(root, schema)
+    if schemas is None:
+        return False
+    for subschema in schemas:
+        if not path:
+            if not _accepts_any_string(subschema, format_checker):
+                return False
+            continue
+        # the whole container is compared
+        if 'enum' in subschema:
+            return False
+        if subschema.get('uniqueItems'):
+            unique.add(prefix)
+        key = path[0]
+        for child in _child_schemas(subschema, key):
+            if not _string_is_free(
+                root, child, path[1:], prefix + (key,), format_checker, unique
+            ):
+                return False
+    return True
+
+
+def _accepts_any_string(schema, format_checker):
+    if any(keyword in schema for keyword in _STRING_KEYWORDS):
+        return False
+    if 'format' in schema and (
+        format_checker is None or schema['format'] in format_checker.checkers
+    ):
+        return False
+    types = schema.get('type', 'string')
+    return 'string' in (types if isinstance(types, list) else [types])
+
+
+def _applicable_schemas(root, schema):
+    """
+    returns the schemas which apply to the same instance of
+    ``schema`` (following references and combinators) or
+    ``None`` if a reference can't be resolved
+    """
+    result = []
+    seen = set()
+    stack = [schema]
+    while stack:
+        schema = stack.pop()
+        if not isinstance(schema, dict):
+            continue
+        if '$ref' in schema:
+            if id(schema) in seen:
+                continue
+            seen.add(id(schema))
+            try:
+                stack.append(_resolve(root, schema['$ref']))
+            except (NotImplementedError, LookupError, ValueError):
+                return None
+            continue
+        result.append(schema)
+        for keyword in ['allOf', 'anyOf', 'oneOf']:
+            stack.extend(schema.get(keyword, []))
+        stack.append(schema.get('not'))
+        stack.extend(schema.get('dependencies', {}).values())
+    return result
+
+
+def _child_schemas(schema, key):
+    """
+    returns the schemas which apply to the item ``key``
+    of the instance of ``schema``
+    """
+    if isinstance(key, int):
+        items = schema.get('items')
+        if not isinstance(items, list):
+            return [items]
+        if key < len(items):
+            return [items[key]]
+        return [schema.get('additionalItems')]
+    children = [
+        subschema
+        for pattern, subschema in schema.get('patternProperties', {}).items()
+        if re.search(pattern, key)
+    ]
+    properties = schema.get('properties', {})
+    if key in properties:
+        children.append(properties[key])
+    elif not children:
+        children.append(schema.get('additionalProperties'))
+    return children
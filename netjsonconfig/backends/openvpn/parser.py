@@ -1,5 +1,4 @@
 import re
-import tarfile
 
 from ...utils import sorted_dict
 from ..base.parser import BaseParser
@@ -14,19 +13,13 @@ class OpenVpnParser(BaseParser):
         return self._get_vpns(config)
 
     def parse_tar(self, tar):
-        fileobj = tar.buffer if hasattr(tar, 'buffer') else tar
-        tar = tarfile.open(fileobj=fileobj)
-        text = ''
-        for member in tar.getmembers():
-            if not member.name.endswith(config_suffix):
-                continue
-            text += '# openvpn config: {name}\n\n{contents}\n'.format(
-                **{
-                    'name': member.name.replace(config_suffix, ''),
-                    'contents': tar.extractfile(member).read().decode(),
-                }
-            )
-        return self.parse_text(text)
+        vpns = []
+        for name, contents in self._iter_tar(tar, self._is_config):
+            vpns.append(self._get_config(name.replace(config_suffix, ''), contents))
+        return {'openvpn': vpns}
+
+    def _is_config(self, name):
+        return name.endswith(config_suffix)
 
     def _get_vpns(self, text):
         results = re.split(vpn_pattern, text)
@@ -35,14 +28,13 @@ class OpenVpnParser(BaseParser):
             result = result.strip()
             if not result:
                 continue
-            vpns.append(self._get_config(result))
+            name, _, contents = result.partition('\n')
+            vpns.append(self._get_config(name, contents))
         return {'openvpn': vpns}
 
-    def _get_config(self, contents):
-        lines = contents.split('\n')
-        name = lines[0]
+    def _get_config(self, name, contents):
         config = {'name': name}
-        for line in lines[1:]:
+        for line in contents.split('\n'):
             line = line.strip()
             if not line:
                 continue
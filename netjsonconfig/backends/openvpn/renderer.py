@@ -1,11 +1,13 @@
-from ..base.renderer import BaseRenderer
+from ..base.renderer import BaseVpnRenderer
 
 
-class OpenVpnRenderer(BaseRenderer):
+class OpenVpnRenderer(BaseVpnRenderer):
     """
     OpenVPN Renderer
     """
 
+    vpn_key = 'openvpn'
+
     def cleanup(self, output):
         # remove indentations
         output = output.replace('    ', '')
@@ -1,8 +1,7 @@
-import re
-
-from jinja2 import Environment, PackageLoader
-
+from ...utils import LRUCache
+from ..base.renderer import get_template_env
 from ..openwrt.openwrt import OpenWrt
+from ..openwrt.writer import UciWriter
 from .renderer import OpenWrtRenderer
 from .schema import schema
 
@@ -14,6 +13,10 @@ class OpenWisp(OpenWrt):
 
     schema = schema
     renderer = OpenWrtRenderer
+    uci_writer = UciWriter(quote_identifiers=True, cache=LRUCache(maxsize=256))
+    # archives are extracted in a directory and installed by install.sh,
+    # which is at the root of the archive like the manifest
+    manifest_name = 'netjsonconfig-manifest.json'
 
     def __init__(
         self, config=None, native=None, templates=None, context=None, dsa=False
@@ -34,9 +37,7 @@ class OpenWisp(OpenWrt):
             radio.setdefault('disabled', False)
 
     def _render_template(self, template, context=None):
-        openwisp_env = Environment(
-            loader=PackageLoader(self.__module__, 'templates'), trim_blocks=True
-        )
+        openwisp_env = get_template_env(self.__module__, self.renderer.bytecode_cache)
         template = openwisp_env.get_template(template)
         context = context or {}
         return template.render(**context)
@@ -159,22 +160,20 @@ class OpenWisp(OpenWrt):
         :param tar: tarfile instance
         :returns: None
         """
-        uci = self.render(files=False)
-        # create a list with all the packages (and remove empty entries)
-        packages = re.split('package ', uci)
-        if '' in packages:
-            packages.remove('')
         # create a file for each configuration package used
-        for package in packages:
-            lines = package.split('\n')
-            package_name = lines[0]
-            text_contents = '\n'.join(lines[2:])
-            text_contents = 'package {0}\n\n{1}'.format(package_name, text_contents)
+        for package, contents in self._iter_package_files():
             self._add_file(
                 tar=tar,
-                name='uci/{0}.conf'.format(package_name),
-                contents=text_contents,
+                name='uci/{0}.conf'.format(package),
+                contents='package {0}\n\n{1}'.format(package, contents),
             )
+        self._add_generated_files()
+
+    def _add_generated_files(self):
+        """
+        adds the install, uninstall, VPN and tc scripts
+        to the included files (unless already present)
+        """
         # prepare template context for install and uninstall scripts
         template_context = self._get_install_context()
         # add install.sh to included files
@@ -185,3 +184,17 @@ class OpenWisp(OpenWrt):
         self._add_openvpn_scripts()
         # add tc_script
         self._add_tc_script()
+
+    def _semantic_data(self):
+        if self.intermediate_data is None:
+            self.to_intermediate()
+        # the scripts are generated from the configuration and included
+        # in the files when the archive is generated, here they're added
+        # to a copy of the file list which leaves self.config untouched
+        config = self.config
+        self.config = dict(config, files=list(config.get('files', [])))
+        try:
+            self._add_generated_files()
+            return super()._semantic_data()
+        finally:
+            self.config = config
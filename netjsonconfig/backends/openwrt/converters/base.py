@@ -1,4 +1,5 @@
 from ...base.converter import BaseConverter
+from ..uci import UciSection
 
 
 class OpenWrtConverter(BaseConverter):
@@ -8,6 +9,27 @@ class OpenWrtConverter(BaseConverter):
         super().__init__(backend)
         self.dsa = getattr(backend, 'dsa', True)
 
+    def uci_section(self, block):
+        """
+        Returns the ``UciSection`` of ``block`` (a ``dict``
+        with ``.type`` and ``.name`` keys)
+        """
+        return UciSection.from_dict(block)
+
+    def to_netjson_clean(self, intermediate_data):
+        # blocks are modified while being converted to NetJSON and become
+        # part of it, hence sections are replaced with dicts (in place,
+        # processed blocks are removed from the intermediate data)
+        for index, block in enumerate(intermediate_data):
+            intermediate_data[index] = self._block_dict(block)
+        return super().to_netjson_clean(intermediate_data)
+
+    @staticmethod
+    def _block_dict(block):
+        if isinstance(block, UciSection):
+            return block.to_dict()
+        return block
+
     def should_skip_block(self, block):
         _type = block.get('.type')
         return not block or (self._uci_types and _type not in self._uci_types)
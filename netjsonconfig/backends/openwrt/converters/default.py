@@ -1,7 +1,6 @@
 import json
 from collections import OrderedDict
 
-from ....utils import sorted_dict
 from .base import OpenWrtConverter
 
 
@@ -11,6 +10,11 @@ class Default(OpenWrtConverter):
         """Always runs"""
         return True
 
+    @classmethod
+    def forward_packages(cls, config):
+        """Each block of the configuration may be an extra package"""
+        return list(config)
+
     @classmethod
     def should_run_backward(cls, intermediate_data):
         """Always runs"""
@@ -29,7 +33,8 @@ class Default(OpenWrtConverter):
             block_list = []
             # sort each config block
             i = 1
-            for block in list(value):
+            # blocks are modified, the configuration must not be
+            for block in self.get_copy(self.netjson, key):
                 # config block must be a dict
                 # with a key named "config_name"
                 # otherwise it's skipped with a warning
@@ -49,7 +54,7 @@ class Default(OpenWrtConverter):
                 )
                 # ensure UCI name is valid
                 block['.name'] = self._get_uci_name(block['.name'])
-                block_list.append(sorted_dict(block))
+                block_list.append(self.uci_section(block))
                 i += 1
             if block_list:
                 extra_packages[key] = block_list
@@ -64,6 +69,7 @@ class Default(OpenWrtConverter):
                 continue
             result.setdefault(package, [])
             for index, block in enumerate(contents):
+                block = self._block_dict(block)
                 _name = block.pop('.name')
                 _type = block.pop('.type')
                 # set `config_value` only if it hasn't
@@ -7,6 +7,11 @@ class General(OpenWrtConverter):
     intermediate_key = 'system'
     _uci_types = ['system']
 
+    @classmethod
+    def forward_packages(cls, config):
+        # the ULA prefix is added to the network package
+        return ['system', 'network']
+
     def to_intermediate_loop(self, block, result, index=None):
         network = self.__intermediate_ula(block)
         system = self.__intermediate_system(block)
@@ -29,7 +34,7 @@ class General(OpenWrtConverter):
         if 'timezone' in general:
             general['zonename'] = general['timezone']
             general['timezone'] = timezones[general['timezone']]
-        return [self.sorted_dict(general)]
+        return [self.uci_section(general)]
 
     def __intermediate_ula(self, general):
         if 'ula_prefix' in general:
@@ -38,7 +43,7 @@ class General(OpenWrtConverter):
                 '.name': general.pop('globals_id', 'globals'),
                 'ula_prefix': general.pop('ula_prefix'),
             }
-            return [self.sorted_dict(ula)]
+            return [self.uci_section(ula)]
         return None
 
     def to_netjson_loop(self, block, result, index):
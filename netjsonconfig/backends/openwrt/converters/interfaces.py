@@ -70,20 +70,24 @@ class Interfaces(OpenWrtConverter):
             uci_device = self.__intermediate_device(interface, address_list)
             if uci_device:
                 result.setdefault('network', [])
-                result['network'].append(self.sorted_dict(uci_device))
+                result['network'].append(self.uci_section(uci_device))
             uci_vlan_interfaces = []
             for vlan in vlan_list:
                 uci_vlan, uci_vlan_interface = self.__intermediate_vlan(
                     uci_name, interface, vlan
                 )
-                result['network'].append(self.sorted_dict(uci_vlan))
+                result['network'].append(self.uci_section(uci_vlan))
                 uci_vlan_interfaces.append(uci_vlan_interface)
             for uci_interface in uci_vlan_interfaces:
-                result['network'].append(self.sorted_dict(uci_interface))
+                result['network'].append(self.uci_section(uci_interface))
         # create one or more "config interface" UCI blocks
         i = 1
         for address in address_list:
-            uci_interface = deepcopy(interface)
+            # the last address takes the interface, the others a copy of it
+            if i < len(address_list):
+                uci_interface = deepcopy(interface)
+            else:
+                uci_interface = interface
             # add suffix to logical name when
             # there is more than one interface
             if i > 1:
@@ -101,7 +105,7 @@ class Interfaces(OpenWrtConverter):
             if address:
                 uci_interface.update(address)
             result.setdefault('network', [])
-            result['network'].append(self.sorted_dict(uci_interface))
+            result['network'].append(self.uci_section(uci_interface))
             i += 1
         return result
 
@@ -113,7 +117,8 @@ class Interfaces(OpenWrtConverter):
         # wireguard interfaces need a different format
         if interface.get('type') == 'wireguard':
             return self.__intermediate_wireguard_addresses(interface)
-        address_list = self.get_copy(interface, 'addresses')
+        # the interface is already a copy of the configuration
+        address_list = interface.get('addresses')
         # ignore wireless interfaces without addresses
         if not address_list and interface['type'] == 'wireless':
             return []
@@ -364,7 +369,7 @@ class Interfaces(OpenWrtConverter):
         if device['ports'] == []:
             device['bridge_empty'] = True
             del device['ports']
-        return self.sorted_dict(device)
+        return self.uci_section(device)
 
     @staticmethod
     def _add_options(property_name, property_options, device, interface):
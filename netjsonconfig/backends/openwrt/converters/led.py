@@ -16,7 +16,7 @@ class Led(OpenWrtConverter):
             }
         )
         result.setdefault('system', [])
-        result['system'].append(self.sorted_dict(block))
+        result['system'].append(self.uci_section(block))
         return result
 
     def __get_auto_name(self, led):
@@ -12,7 +12,7 @@ class Ntp(OpenWrtConverter):
         if block:
             block.update({'.type': 'timeserver', '.name': block.pop('id', 'ntp')})
             result.setdefault('system', [])
-            result['system'] = [self.sorted_dict(block)]
+            result['system'] = [self.uci_section(block)]
         return result
 
     def to_netjson_loop(self, block, result, index):
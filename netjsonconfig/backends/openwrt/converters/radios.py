@@ -33,7 +33,7 @@ class Radios(OpenWrtConverter):
         # ensure country is uppercase
         if 'country' in radio:
             radio['country'] = radio['country'].upper()
-        return self.sorted_dict(radio)
+        return self.uci_section(radio)
 
     def __set_intermediate_band(self, radio):
         if self.dsa:
@@ -30,7 +30,7 @@ class Routes(OpenWrtConverter):
         )
         if network.version == 4:
             route['netmask'] = str(network.netmask)
-        return self.sorted_dict(route)
+        return self.uci_section(route)
 
     def __get_auto_name(self, i):
         return 'route{0}'.format(i)
@@ -32,7 +32,7 @@ class Rules(OpenWrtConverter):
                 '.name': rule.pop('name', None) or self.__get_auto_name(index),
             }
         )
-        return self.sorted_dict(rule)
+        return self.uci_section(rule)
 
     def __get_auto_name(self, i):
         return 'rule{0}'.format(i)
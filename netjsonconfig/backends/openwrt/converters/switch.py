@@ -49,10 +49,10 @@ class Switch(OpenWrtConverter):
             )
             if 'vid' not in vlan:
                 vlan['vid'] = vlan['vlan']
-            vlans.append(self.sorted_dict(vlan))
+            vlans.append(self.uci_section(vlan))
             i += 1
         del switch['vlan']
-        return [self.sorted_dict(switch)] + vlans
+        return [self.uci_section(switch)] + vlans
 
     def __get_auto_name(self, name, i):
         return '{0}_vlan{1}'.format(name, i)
@@ -23,7 +23,7 @@ class WireguardPeers(OpenWrtConverter):
         peer.update({'.type': f'wireguard_{interface}', '.name': uci_name})
         if not peer.get('endpoint_host') and 'endpoint_port' in peer:
             del peer['endpoint_port']
-        return self.sorted_dict(peer)
+        return self.uci_section(peer)
 
     def to_netjson_loop(self, block, result, index):
         result.setdefault('wireguard_peers', [])
@@ -5,6 +5,8 @@ class Wireless(OpenWrtConverter):
     netjson_key = 'interfaces'
     intermediate_key = 'wireless'
     _uci_types = ['wifi-iface']
+    # bridges are looked up to determine the network of wifi interfaces
+    forward_dependencies = ['network']
 
     def to_intermediate(self):
         self._track_bridged_wifi()
@@ -67,7 +69,7 @@ class Wireless(OpenWrtConverter):
         wireless['network'] = (
             ' '.join(wireless['network']).replace('.', '_').replace('-', '_')
         )
-        return self.sorted_dict(wireless)
+        return self.uci_section(wireless)
 
     def __intermediate_auto_network(self, wireless, interface):
         # attached networks (openwrt specific)
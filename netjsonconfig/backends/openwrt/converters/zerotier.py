@@ -45,7 +45,7 @@ class ZeroTier(OpenWrtConverter, BaseZeroTier):
                 '.type': 'network',
             }
         )
-        return self.sorted_dict(network)
+        return self.uci_section(network)
 
     def to_netjson_loop(self, block, result, index=None):
         if block.get('.type') == 'zerotier':
@@ -1,14 +1,16 @@
 from jsonschema import ValidationError as JsonSchemaError
 
 from ...exceptions import ValidationError
+from ...utils import LRUCache
 from ..base.backend import BaseBackend
 from ..vxlan.vxlan_wireguard import VxlanWireguard
 from ..wireguard.wireguard import Wireguard
 from ..zerotier.zerotier import ZeroTier
 from . import converters
-from .parser import OpenWrtParser, config_path, packages_pattern
+from .parser import OpenWrtParser, config_path
 from .renderer import OpenWrtRenderer
 from .schema import schema
+from .writer import UciWriter
 
 
 class OpenWrt(BaseBackend):
@@ -34,6 +36,12 @@ class OpenWrt(BaseBackend):
     ]
     parser = OpenWrtParser
     renderer = OpenWrtRenderer
+    # writes the UCI output without rendering the template of the
+    # renderer (the output is the same); ``None`` uses the template;
+    # the output of packages is cached, shared by all the backends
+    uci_writer = UciWriter(cache=LRUCache(maxsize=256))
+    # archives are restored in the root directory of the device
+    manifest_name = 'etc/netjsonconfig/manifest'
     list_identifiers = ['name', 'config_value', 'id']
 
     def __init__(
@@ -83,22 +91,23 @@ class OpenWrt(BaseBackend):
         :param tar: tarfile instance
         :returns: None
         """
-        uci = self.render(files=False)
-        # create a list with all the packages (and remove empty entries)
-        packages = packages_pattern.split(uci)
-        if '' in packages:
-            packages.remove('')
         # create an UCI file for each configuration package used
-        for package in packages:
-            lines = package.split('\n')
-            package_name = lines[0]
-            text_contents = '\n'.join(lines[2:])
+        for package, contents in self._iter_package_files():
             self._add_file(
                 tar=tar,
-                name='{0}{1}'.format(config_path, package_name),
-                contents=text_contents,
+                name='{0}{1}'.format(config_path, package),
+                contents=contents,
             )
 
+    def _iter_package_files(self):
+        """
+        Yields the name and the file contents of each UCI package
+        """
+        with self._validated_config():
+            for package, output in self._iter_sections():
+                # skip the "package" line and the following empty line
+                yield package, '\n'.join(output.split('\n')[2:])
+
     @classmethod
     def wireguard_auto_client(cls, **kwargs):
         data = Wireguard.auto_client(**kwargs)
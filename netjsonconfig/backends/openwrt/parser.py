@@ -1,14 +1,42 @@
 import re
-import tarfile
 from collections import OrderedDict
 
-from ...utils import sorted_dict
 from ..base.parser import BaseParser
+from .uci import UciSection
 
 packages_pattern = re.compile('^package\s', flags=re.MULTILINE)
 block_pattern = re.compile('^config\s', flags=re.MULTILINE)
 config_pattern = re.compile('^(option|list)\s*([^\s]*)\s*(.*)')
 config_path = 'etc/config/'
+# statements of the UCI format: up to 4 words (made of unquoted, quoted
+# and escaped parts, quoted parts may span multiple lines) followed by an
+# optional comment and a new line; anything else is a syntax error
+# (eg: unterminated quotes), which is matched until the end of the line
+# (unrolled, which keeps the matching linear when it fails)
+_word = r"""(?=[^\s\#])[^\s'"\\]*(?:(?:'[^']*'|"[^"\\]*(?:\\.[^"\\]*)*"|\\.)[^\s'"\\]*)*"""
+statement_pattern = re.compile(
+    r"""
+    [^\S\n]*
+    (?:({0})(?:[^\S\n]+({0}))?(?:[^\S\n]+({0}))?(?:[^\S\n]+({0}))?[^\S\n]*)?
+    (?:\#[^\n]*)?\n
+    |([^\n]+)
+    """.format(_word),
+    flags=re.VERBOSE | re.DOTALL,
+)
+word_part_pattern = re.compile(
+    r"""([^'"\\]+)|'([^']*)'|"((?:[^"\\]|\\.)*)"|\\(.)""", flags=re.DOTALL
+)
+escape_pattern = re.compile(r'\\(.)', flags=re.DOTALL)
+
+
+class UciSyntaxError(ValueError):
+    """
+    Raised when the text is not in the format of ``uci export``
+    (eg: options outside of sections, unterminated quotes);
+    the parser falls back to its regular expressions in these cases
+    """
+
+    pass
 
 
 class OpenWrtParser(BaseParser):
@@ -16,24 +44,86 @@ class OpenWrtParser(BaseParser):
         return self._get_uci_packages(config)
 
     def parse_tar(self, tar):
-        fileobj = tar.buffer if hasattr(tar, 'buffer') else tar
-        tar = tarfile.open(fileobj=fileobj)
-        text = ''
-        for member in tar.getmembers():
-            if not member.name.startswith(config_path):
-                continue
-            text += 'package {name}\n\n{contents}'.format(
-                **{
-                    'name': member.name.replace(config_path, ''),
-                    'contents': tar.extractfile(member).read().decode(),
-                }
-            )
-        return self._get_uci_packages(text)
+        packages = OrderedDict()
+        for name, contents in self._iter_tar(tar, self._is_package):
+            package = name.replace(config_path, '')
+            packages.update(self._get_uci_packages(contents, package=package))
+        return packages
+
+    def _is_package(self, name):
+        return name.startswith(config_path)
 
     def _strip_quotes(self, value):
         return value.replace('\'', '').replace('\"', '')
 
-    def _get_uci_packages(self, text):
+    def _get_uci_packages(self, text, package=None):
+        """
+        :param package: name of the package of the sections at the
+                        beginning of ``text`` (eg: file of ``/etc/config``)
+        """
+        try:
+            return self._scan_uci_packages(text, package)
+        except UciSyntaxError:
+            if package is not None:
+                text = 'package {0}\n\n{1}'.format(package, text)
+            return self._split_uci_packages(text)
+
+    def _scan_uci_packages(self, text, package=None):
+        """
+        Parses ``text`` in a single pass, building the packages
+        and their sections while scanning the statements
+
+        :raises UciSyntaxError: see ``UciSyntaxError``
+        """
+        packages = OrderedDict()
+        blocks = block = None
+        if package is not None:
+            blocks = packages[package] = []
+        # the same words (eg: option names) are unquoted once
+        words = _Words()
+        for statement in statement_pattern.findall(text + '\n'):
+            keyword, first, second, third, error = statement
+            if error or third:
+                raise UciSyntaxError(error or ' '.join(statement))
+            if not keyword:
+                continue
+            if keyword in ('option', 'list') and block is not None:
+                key = words[first]
+                if keyword == 'option':
+                    block[key] = words[second]
+                elif type(block.get(key)) is list:
+                    block[key].append(words[second])
+                else:
+                    block[key] = block.get(key, []) + [words[second]]
+            elif keyword == 'config' and blocks is not None and first:
+                self._add_uci_block(blocks, block)
+                block = {'.type': words[first]}
+                block['.name'] = (
+                    words[second]
+                    if second
+                    else '{0}_{1}'.format(block['.type'], len(blocks) + 1)
+                )
+            elif keyword == 'package' and first and not second:
+                self._add_uci_block(blocks, block)
+                blocks = packages[words[first]] = []
+                block = None
+            else:
+                raise UciSyntaxError(' '.join(statement))
+        self._add_uci_block(blocks, block)
+        return packages
+
+    def _add_uci_block(self, blocks, block):
+        if block is not None:
+            self._set_uci_block_type(block)
+            # the block isn't used anymore, it becomes the options
+            type_, name = block.pop('.type'), block.pop('.name')
+            blocks.append(UciSection(type_, name, block))
+
+    def _split_uci_packages(self, text):
+        """
+        Parses ``text`` with regular expressions, which skip
+        what they don't recognize (used for invalid syntax)
+        """
         results = re.split(packages_pattern, text)
         packages = OrderedDict()
         for result in results:
@@ -82,7 +172,7 @@ class OpenWrtParser(BaseParser):
                 else:
                     block[key] = block.get(key, []) + [value]
             self._set_uci_block_type(block)
-            blocks.append(sorted_dict(block))
+            blocks.append(UciSection.from_dict(block))
         return blocks
 
     def _set_uci_block_type(self, block):
@@ -98,3 +188,40 @@ class OpenWrtParser(BaseParser):
             elif not block.get('type', None):
                 block['type'] = 'device'
             block['.type'] = 'interface'
+
+
+def _unquote(word):
+    """
+    Returns the value of a word: the concatenation of its unquoted,
+    quoted and escaped parts without quotes and escapes, eg:
+    ``'it'\\''s'`` (the format of ``uci export``) becomes ``it's``
+    """
+    if "'" not in word and '"' not in word and '\\' not in word:
+        return word
+    if word[0] == word[-1] == "'" and word.count("'") == 2:
+        return word[1:-1]
+    value = []
+    for unquoted, single, double, escaped in word_part_pattern.findall(word):
+        if double:
+            value.append(escape_pattern.sub(_unescape, double))
+        elif escaped:
+            # escaped new lines join lines
+            value.append('' if escaped == '\n' else escaped)
+        else:
+            value.append(unquoted or single)
+    return ''.join(value)
+
+
+class _Words(dict):
+    """
+    Values of the words of the UCI format by word
+    """
+
+    def __missing__(self, word):
+        value = self[word] = _unquote(word)
+        return value
+
+
+def _unescape(match):
+    char = match.group(1)
+    return '' if char == '\n' else char
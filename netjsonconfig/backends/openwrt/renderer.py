@@ -1,4 +1,7 @@
+from collections import OrderedDict
+
 from ..base.renderer import BaseRenderer
+from .writer import UnsupportedValue
 
 
 class OpenWrtRenderer(BaseRenderer):
@@ -6,6 +9,36 @@ class OpenWrtRenderer(BaseRenderer):
     OpenWRT Renderer
     """
 
+    def render(self):
+        """
+        Renders configuration with the ``uci_writer`` of the backend,
+        which falls back to the jinja2 template for the values it
+        doesn't support; the template is used if ``uci_writer`` is ``None``
+        """
+        return ''.join(self.iter_render())
+
+    def iter_sections(self):
+        """
+        Yields the name and the output of each UCI package; the
+        template is used for the packages which contain values
+        that ``uci_writer`` doesn't support
+        """
+        return self._separate(
+            (package, self._render_package(package, config_blocks))
+            for package, config_blocks in (self.intermediate_data or {}).items()
+        )
+
+    def _render_package(self, package, config_blocks):
+        writer = getattr(self.backend, 'uci_writer', None)
+        if writer is not None:
+            try:
+                return writer.format_package(package, config_blocks)
+            except UnsupportedValue:
+                pass
+        # the output of the template is the same of the
+        # corresponding section of the whole output
+        return self._render_template(OrderedDict([(package, config_blocks)]))
+
     def cleanup(self, output):
         """
         Generates consistent OpenWRT/LEDE UCI output
@@ -0,0 +1,160 @@
+"""
+Compact representation of the UCI sections of the intermediate data
+structure of the ``OpenWrt`` and ``OpenWisp`` backends
+"""
+
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from copy import deepcopy
+
+
+class UciSection(MutableMapping):
+    """
+    UCI section (``config <type> '<name>'``) which stores its type and its
+    name in slots and its options in a ``dict`` in insertion order.
+
+    The options are sorted by name (the order of the output) only when
+    they're needed: the ``UciWriter`` iterates them in sorted order
+    without sorting the section, while iterating the section, or adding
+    an option to it, sorts its options once.
+
+    Existing code can keep handling sections as dicts: ``UciSection`` is a
+    mapping in which ``.name`` and ``.type`` come first and are followed by
+    the options, eg::
+
+        >>> section = UciSection.from_dict({'.type': 'system', '.name': 'system',
+        ...                                 'timezone': 'UTC', 'hostname': 'test'})
+        >>> list(section.items())
+        [('.name', 'system'), ('.type', 'system'), ('hostname', 'test'), ('timezone', 'UTC')]
+
+    Sections are not ``dict`` instances and are not JSON serializable,
+    ``to_dict()`` (or ``dict(section)``) returns a copy which is.
+    """
+
+    __slots__ = ('type', 'name', 'options', 'ordered')
+
+    def __init__(self, type=None, name=None, options=None, ordered=False):
+        """
+        :param type: UCI type, ``None`` if missing
+        :param name: UCI name, ``None`` if missing
+        :param options: ``dict`` of options, which is not copied
+        :param ordered: whether ``options`` are already
+                        in the order of the output
+        """
+        self.type = type
+        self.name = name
+        self.options = {} if options is None else options
+        self.ordered = ordered
+
+    @classmethod
+    def from_dict(cls, block):
+        """
+        Returns the ``UciSection`` of ``block``, a mapping with ``.type``
+        and ``.name`` keys; ``block`` is not modified (the section has
+        the contents of ``sorted_dict(block)``)
+        """
+        options = dict(block.items())
+        return cls(options.pop('.type', None), options.pop('.name', None), options)
+
+    def iter_options(self):
+        """
+        Yields the name and the value of each option in the order
+        of the output, without sorting the section
+        """
+        if self.ordered:
+            return iter(self.options.items())
+        return iter(sorted(self.options.items(), key=_option_name))
+
+    def to_dict(self):
+        """
+        Returns the section as ``OrderedDict``
+        (the output of ``sorted_dict`` for converters)
+        """
+        return OrderedDict(self._iter_items())
+
+    def _sort(self):
+        if not self.ordered:
+            self.options = dict(sorted(self.options.items(), key=_option_name))
+            self.ordered = True
+
+    def __getitem__(self, key):
+        if key == '.name' and self.name is not None:
+            return self.name
+        if key == '.type' and self.type is not None:
+            return self.type
+        return self.options[key]
+
+    def __setitem__(self, key, value):
+        if key == '.name':
+            self.name = value
+        elif key == '.type':
+            self.type = value
+        else:
+            # new options are added after the existing ones,
+            # which are sorted first (same order of sorted_dict)
+            if key not in self.options:
+                self._sort()
+            self.options[key] = value
+
+    def __delitem__(self, key):
+        if key == '.name' and self.name is not None:
+            self.name = None
+        elif key == '.type' and self.type is not None:
+            self.type = None
+        else:
+            del self.options[key]
+
+    def __iter__(self):
+        if self.name is not None:
+            yield '.name'
+        if self.type is not None:
+            yield '.type'
+        self._sort()
+        yield from self.options
+
+    def __len__(self):
+        return (self.name is not None) + (self.type is not None) + len(self.options)
+
+    def __contains__(self, key):
+        if key == '.name':
+            return self.name is not None
+        if key == '.type':
+            return self.type is not None
+        return key in self.options
+
+    def __eq__(self, other):
+        if isinstance(other, UciSection):
+            return (
+                self.type == other.type
+                and self.name == other.name
+                and self.options == other.options
+            )
+        if isinstance(other, Mapping):
+            return dict(self._iter_items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        # lists the options in the order of the output, the writer
+        # identifies the packages it has already written by their repr
+        return '{0}({1!r})'.format(self.__class__.__name__, dict(self._iter_items()))
+
+    def _iter_items(self):
+        if self.name is not None:
+            yield '.name', self.name
+        if self.type is not None:
+            yield '.type', self.type
+        yield from self.iter_options()
+
+    def copy(self):
+        return self.__class__(self.type, self.name, dict(self.options), self.ordered)
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return self.__class__(
+            self.type, self.name, deepcopy(self.options, memo), self.ordered
+        )
+
+
+def _option_name(item):
+    return item[0]
@@ -0,0 +1,146 @@
+"""
+Native UCI writer, which generates the same output of the
+``openwrt.jinja2`` template followed by ``OpenWrtRenderer.cleanup``
+without rendering the template and without the post-processing
+of the whole output
+"""
+
+import hashlib
+
+from .uci import UciSection
+
+
+class UnsupportedValue(ValueError):
+    """
+    Raised when the output of the template for a value depends on its
+    surroundings (eg: leading spaces, new lines, keys which are not
+    strings); the renderer uses the template in these cases
+    """
+
+    pass
+
+
+class UciWriter(object):
+    """
+    Writes the intermediate data structure of the OpenWrt backend
+    in UCI format, package by package
+
+    :param quote_identifiers: whether types and keys are quoted
+                              (format of OpenWISP Manager)
+    :param cache: optional ``LRUCache`` which holds the output of the
+                  packages by hash of their contents, therefore packages
+                  which didn't change since the last time (eg: of another
+                  device) are not written again
+    """
+
+    def __init__(self, quote_identifiers=False, cache=None):
+        self.quote_identifiers = quote_identifiers
+        self.cache = cache
+        if quote_identifiers:
+            self._config = "\nconfig '{0}' '{1}'\n"
+            self._option = "\toption '{0}' '{1}'\n"
+            self._list = "\tlist '{0}' '{1}'\n"
+        else:
+            self._config = "\nconfig {0} '{1}'\n"
+            self._option = "\toption {0} '{1}'\n"
+            self._list = "\tlist {0} '{1}'\n"
+
+    def write(self, data, stream):
+        """
+        Writes ``data`` to ``stream``
+
+        :param data: intermediate data structure (``OrderedDict``)
+        :param stream: file-like object open in text mode
+        """
+        for chunk in self.iter_packages(data):
+            stream.write(chunk)
+
+    def iter_packages(self, data):
+        """
+        Yields the UCI output of each package of ``data``
+        """
+        separator = ''
+        for package, config_blocks in data.items():
+            yield separator + self.format_package(package, config_blocks)
+            separator = '\n'
+
+    def format_package(self, package, config_blocks):
+        """
+        Returns the UCI output of a single package
+
+        :param package: name of the package
+        :param config_blocks: ``list`` of config blocks of the package
+        :raises UnsupportedValue: see ``UnsupportedValue``
+        """
+        cache = self.cache
+        if cache is None:
+            return self._format_package(package, config_blocks)
+        # unlike JSON, repr differentiates types (eg: 1, 1.0 and True)
+        key = hashlib.sha256(repr((package, config_blocks)).encode()).hexdigest()
+        output = cache.get(key)
+        if output is None:
+            output = self._format_package(package, config_blocks)
+            cache.set(key, output)
+        return output
+
+    def _format_package(self, package, config_blocks):
+        return 'package {0}\n{1}'.format(
+            self._clean(package), ''.join(self._iter_blocks(config_blocks))
+        )
+
+    def _iter_blocks(self, config_blocks):
+        clean = self._clean
+        for config in config_blocks:
+            if type(config) is UciSection:
+                # the options are iterated in order without sorting the section
+                yield self._config.format(
+                    clean('' if config.type is None else config.type),
+                    clean('' if config.name is None else config.name),
+                )
+                yield from self._iter_options(config.iter_options())
+                continue
+            if not isinstance(config, dict):
+                raise UnsupportedValue(config)
+            yield self._config.format(
+                clean(config.get('.type', '')), clean(config.get('.name', ''))
+            )
+            yield from self._iter_options(config.items())
+
+    def _iter_options(self, options):
+        clean = self._clean
+        for key, value in options:
+            if value in ('', None):
+                continue
+            if not isinstance(key, str):
+                raise UnsupportedValue(key)
+            if key.startswith('.'):
+                continue
+            if isinstance(value, str):
+                yield self._option.format(clean(key), clean(value))
+                continue
+            try:
+                items = iter(value)
+            except TypeError:
+                yield self._option.format(clean(key), clean(value))
+                continue
+            key = clean(key)
+            for item in items:
+                yield self._list.format(key, clean(item))
+
+    @staticmethod
+    def _clean(value):
+        """
+        Applies the replacements of ``OpenWrtRenderer.cleanup``
+        to a single value
+        """
+        if type(value) is not str:
+            value = str(value)
+        if '\n' in value or value[:1] == ' ' or value[-1:] == ' ':
+            raise UnsupportedValue(value)
+        if '    ' in value:
+            value = value.replace('    ', '')
+        if 'True' in value:
+            value = value.replace('True', '1')
+        if 'False' in value:
+            value = value.replace('False', '0')
+        return value
@@ -1,11 +1,13 @@
-from ..base.renderer import BaseRenderer
+from ..base.renderer import BaseVpnRenderer
 
 
-class WireguardRenderer(BaseRenderer):
+class WireguardRenderer(BaseVpnRenderer):
     """
     Wireguard Renderer
     """
 
+    vpn_key = 'wireguard'
+
     def cleanup(self, output):
         # remove indentations
         output = output.replace('    ', '')
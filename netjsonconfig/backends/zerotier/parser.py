@@ -1,5 +1,4 @@
 import re
-import tarfile
 from json import loads
 
 from ..base.parser import BaseParser
@@ -14,19 +13,13 @@ class ZeroTierParser(BaseParser):
         return {'zerotier': self._get_vpn_config(config)}
 
     def parse_tar(self, tar):
-        fileobj = tar.buffer if hasattr(tar, 'buffer') else tar
-        tar = tarfile.open(fileobj=fileobj)
-        text = ''
-        for member in tar.getmembers():
-            if not member.name.endswith(config_suffix):
-                continue
-            text += '// zerotier controller config: {name}\n\n{contents}\n'.format(
-                **{
-                    'name': member.name,
-                    'contents': tar.extractfile(member).read().decode(),
-                }
-            )
-        return self.parse_text(text)
+        vpns = []
+        for name, contents in self._iter_tar(tar, self._is_config):
+            vpns.extend(self._get_vpn_config(contents))
+        return {'zerotier': vpns}
+
+    def _is_config(self, name):
+        return name.endswith(config_suffix)
 
     def _get_vpn_config(self, text):
         # Remove comments from the vpn text
@@ -1,11 +1,14 @@
-from ..base.renderer import BaseRenderer
+from ..base.renderer import BaseVpnRenderer
 
 
-class ZeroTierRenderer(BaseRenderer):
+class ZeroTierRenderer(BaseVpnRenderer):
     """
     ZeroTier Renderer
     """
 
+    vpn_key = 'zerotier'
+    name_key = 'nwid'
+
     def cleanup(self, output):
         # remove last newline
         if output.endswith('\n\n'):
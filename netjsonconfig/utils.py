@@ -1,9 +1,11 @@
 import re
-from collections import OrderedDict
-from copy import deepcopy
+import threading
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping
+from copy import copy, deepcopy
 
 
-def merge_config(template, config, list_identifiers=None):
+def merge_config(template, config, list_identifiers=None, in_place=False):
     """
     Merges ``config`` on top of ``template``.
 
@@ -18,18 +20,39 @@ def merge_config(template, config, list_identifiers=None):
     :param template: template ``dict``
     :param config: config ``dict``
     :param list_identifiers: ``list`` or ``None``
+    :param in_place: whether ``template`` is modified in place and the
+                     values of ``config`` are used as they are, instead of
+                     copying them; allowed only if neither of them is shared
+                     (eg: the output of converters)
     :returns: merged ``dict``
     """
-    result = deepcopy(template)
-    for key, value in config.items():
-        if isinstance(value, dict):
-            node = result.get(key, OrderedDict())
-            result[key] = merge_config(node, value)
-        elif isinstance(value, list) and isinstance(result.get(key), list):
-            result[key] = merge_list(result[key], value, list_identifiers)
-        else:
-            result[key] = value
-    return result
+    if in_place:
+        return _merge_config(template, config, list_identifiers, _OwnedAll())
+    owned = {}
+    result = _merge_config(template, config, list_identifiers, owned)
+    return _materialize(result, owned, {})
+
+
+def merge_configs(configs, list_identifiers=None):
+    """
+    Merges each item of ``configs`` on top of the previous ones,
+    gives the same result of calling ``merge_config`` repeatedly
+    (starting from an empty ``dict``), eg: to merge templates.
+
+    The merge is copy-on-write: unchanged branches are shared with
+    the original dicts while merging and are copied only once at
+    the end, therefore the result doesn't share any mutable object
+    with ``configs``.
+
+    :param configs: ``list`` of ``dict``
+    :param list_identifiers: ``list`` or ``None``
+    :returns: merged ``dict``
+    """
+    result = {}
+    owned = {id(result): result}
+    for config in configs:
+        result = _merge_config(result, config, list_identifiers, owned)
+    return _materialize(result, owned, {})
 
 
 def merge_list(list1, list2, identifiers=None):
@@ -47,35 +70,238 @@ def merge_list(list1, list2, identifiers=None):
     :param identifiers: ``list`` or ``None``
     :returns: merged ``list``
     """
+    owned = {}
+    return _materialize(_merge_list(list1, list2, identifiers, owned), owned, {})
+
+
+def _merge_config(template, config, list_identifiers, owned):
+    """
+    copy-on-write implementation of ``merge_config``: ``template``
+    is modified in place only if it has been created while merging
+    (``owned``), otherwise it's copied (shallowly)
+    """
+    if id(template) in owned:
+        result = template
+    elif isinstance(template, dict):
+        result = copy(template)
+        owned[id(result)] = result
+    else:
+        # not a dict (invalid merge), same errors of the original implementation
+        result = deepcopy(template)
+    for key, value in config.items():
+        if isinstance(value, dict):
+            node = result.get(key, OrderedDict())
+            result[key] = _merge_config(node, value, None, owned)
+        elif isinstance(value, Mapping) and isinstance(result.get(key), Mapping):
+            # other mappings (eg: UCI sections) are merged into the existing ones
+            result[key] = _merge_config(result[key], value, None, owned)
+        elif isinstance(value, list) and isinstance(result.get(key), list):
+            result[key] = _merge_list(result[key], value, list_identifiers, owned)
+        else:
+            result[key] = value
+    return result
+
+
+def _merge_list(list1, list2, identifiers, owned):
     identifiers = identifiers or []
     dict_map = {'list1': OrderedDict(), 'list2': OrderedDict()}
     counter = 1
     for list_ in [list1, list2]:
         container = dict_map['list{0}'.format(counter)]
+        if counter == 2:
+            list1_index = list(dict_map['list1'].values())
+            # comparing each element is faster with small lists
+            if len(list1_index) * len(list2) > 1024:
+                list1_index = _ContentIndex(list1_index)
         for el in list_:
-            # merge by internal python id by default
-            key = id(el)
             # Detect identical elements present in both lists
             # avoid adding the duplicate to the result.
             # This is needed because some templates may share
             # one or multiple common files and these do not
             # not have to be duplicated.
-            if counter == 2 and el in dict_map['list1'].values():
+            if counter == 2 and el in list1_index:
                 continue
-            # if el is a dict, merge by keys specified in ``identifiers``
-            if isinstance(el, dict):
-                for id_key in identifiers:
-                    if id_key in el:
-                        key = el[id_key]
-                        break
-            # if key is a list, convert it to tuple which is
-            # hashable and can be used as a dictionary key
-            if isinstance(key, list):
-                key = tuple(key)
-            container[key] = deepcopy(el)
+            container[_merge_key(el, identifiers)] = el
         counter += 1
-    merged = merge_config(dict_map['list1'], dict_map['list2'])
-    return list(merged.values())
+    # elements of the same list which share the same key are
+    # overwritten, hence the merged list is a new list
+    owned[id(dict_map['list1'])] = dict_map['list1']
+    merged = _merge_config(dict_map['list1'], dict_map['list2'], None, owned)
+    result = list(merged.values())
+    owned[id(result)] = result
+    return result
+
+
+def _merge_key(el, identifiers):
+    """
+    returns the key by which ``el`` is merged by ``merge_list``
+    """
+    # if el is a dict (or a mapping), merge by keys specified in ``identifiers``
+    if isinstance(el, Mapping):
+        for id_key in identifiers:
+            if id_key in el:
+                key = el[id_key]
+                # if key is a list, convert it to tuple which is
+                # hashable and can be used as a dictionary key
+                return tuple(key) if isinstance(key, list) else key
+    # merge by internal python id by default
+    return id(el)
+
+
+class IndexedConfig(object):
+    """
+    Container which merges configurations on top of each other in place,
+    gives the same result of calling ``merge_config`` repeatedly with
+    ``in_place=True`` (eg: the intermediate data of the backends).
+
+    The elements of each list are indexed by the key ``merge_list`` would
+    assign them (eg: the ``.name`` of UCI sections), hence the elements of
+    another list are merged in O(elements of that list) instead of indexing
+    the whole list again at each merge.
+
+    The merged configurations must not be shared, see ``merge_config``.
+
+    :param identifiers: ``list`` or ``None``, see ``merge_list``
+    """
+
+    def __init__(self, identifiers=None):
+        self.data = OrderedDict()
+        self.identifiers = identifiers or []
+        self._indexes = {}
+
+    def merge(self, config):
+        """
+        Merges ``config`` on top of ``self.data``
+        """
+        data = self.data
+        for key, value in config.items():
+            if isinstance(value, dict):
+                node = data.get(key, OrderedDict())
+                data[key] = _merge_config(node, value, None, _OwnedAll())
+            elif isinstance(value, list) and isinstance(data.get(key), list):
+                data[key] = self._merge_list(key, value)
+                continue
+            else:
+                data[key] = value
+            self._indexes.pop(key, None)
+
+    def _merge_list(self, key, list2):
+        if key not in self._indexes:
+            self._indexes[key] = self._index(self.data[key])
+        merged, by_id = self._indexes[key]
+        container = OrderedDict()
+        new_by_id = []
+        for el in list2:
+            el_key = _merge_key(el, self.identifiers)
+            # equal elements have the same key unless they're merged by id,
+            # hence only those are compared with the other elements
+            if el_key in merged and merged[el_key] == el:
+                continue
+            if el_key == id(el):
+                if el in by_id:
+                    continue
+                if el_key not in container:
+                    new_by_id.append(el_key)
+            container[el_key] = el
+        _merge_config(merged, container, None, _OwnedAll())
+        by_id.extend(merged[el_key] for el_key in new_by_id)
+        return list(merged.values())
+
+    def _index(self, list1):
+        """
+        returns the elements of ``list1`` by key (without the
+        duplicates, like ``merge_list``) and those merged by id
+        """
+        merged = OrderedDict()
+        by_id = []
+        for el in list1:
+            el_key = _merge_key(el, self.identifiers)
+            if el_key == id(el) and el_key not in merged:
+                by_id.append(el)
+            merged[el_key] = el
+        return merged, by_id
+
+
+class _OwnedAll(dict):
+    """
+    Registry of the objects created while merging (see ``_merge_config``)
+    which contains any object, therefore nothing is copied
+    """
+
+    def __contains__(self, key):
+        return True
+
+
+class _ContentIndex(object):
+    """
+    Set-like collection of elements which looks up elements by a
+    signature of their contents instead of comparing them with each
+    element, equivalent to ``element in list(values)``
+    """
+
+    def __init__(self, values):
+        self.buckets = {}
+        for value in values:
+            self.buckets.setdefault(_signature(value), []).append(value)
+
+    def __contains__(self, element):
+        # equal signatures are confirmed with the same comparison of ``in``
+        for value in self.buckets.get(_signature(element), []):
+            if value is element or value == element:
+                return True
+        return False
+
+
+_SCALARS = (str, int, float, type(None))
+
+
+def _signature(value):
+    """
+    returns a hashable signature of ``value`` which is cheap to compute
+    (nested containers are not inspected): JSON values which are equal
+    (eg: ``dict`` and ``OrderedDict``) have equal signatures
+    """
+    if isinstance(value, dict):
+        return (
+            dict,
+            frozenset(value.keys()),
+            frozenset(item for item in value.items() if isinstance(item[1], _SCALARS)),
+        )
+    if isinstance(value, list):
+        return (list, tuple(v if isinstance(v, _SCALARS) else None for v in value))
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return value
+
+
+def _materialize(data, owned, memo):
+    """
+    copies the branches of ``data`` which are shared with the
+    original dicts (ie: which have not been created while merging)
+    """
+    if id(data) not in owned:
+        return _copy(data, memo)
+    items = data.items() if isinstance(data, dict) else enumerate(data)
+    for key, value in list(items):
+        if not isinstance(value, _SCALARS):
+            data[key] = _materialize(value, owned, memo)
+    return data
+
+
+def _copy(data, memo):
+    """
+    faster ``deepcopy`` for JSON data (``dict``, ``list`` and scalars)
+    """
+    data_type = type(data)
+    if data_type in (str, int, float, bool, type(None)):
+        return data
+    if data_type is list:
+        return [_copy(value, memo) for value in data]
+    if data_type is dict or data_type is OrderedDict:
+        return data_type((key, _copy(value, memo)) for key, value in data.items())
+    return deepcopy(data, memo)
 
 
 def sorted_dict(dict_):
@@ -102,21 +328,64 @@ def evaluate_vars(data, context=None):
             loop_items = enumerate(data)
         for key, value in loop_items:
             data[key] = evaluate_vars(value, context)
-    elif isinstance(data, str):
-        vars_found = var_pattern.findall(data)
-        for var in vars_found:
-            var = var.strip()
-            # if found multiple variables, create a new regexp pattern for each
-            # variable, otherwise different variables would get the same value
-            # (see https://github.com/openwisp/netjsonconfig/issues/55)
-            if len(vars_found) > 1:
-                pattern = r'\{\{(\s*%s\s*)\}\}' % var
-            # in case of single variables, use the precompiled
-            # regexp pattern to save computation
-            else:
-                pattern = var_pattern
-            if var in context:
-                data = re.sub(pattern, str(context[var]), data)
+    # cheap check which skips strings without variables (eg: certificates),
+    # looking for a single character is much faster than looking for "{{"
+    elif isinstance(data, str) and '{' in data and '{{' in data:
+        data = _evaluate_string_vars(data, context)
+    return data
+
+
+def _evaluate_string_vars(data, context):
+    """
+    substitutes all the variables of ``data`` in a single pass
+    """
+
+    def replace(match):
+        var = match.group(1)
+        if var not in context:
+            return match.group(0)
+        value = str(context[var])
+        # values are substituted by ``re.sub``, which processes escapes
+        if '\\' in value:
+            raise _UnsafeValue()
+        return value
+
+    try:
+        result = var_pattern.sub(replace, data)
+    except _UnsafeValue:
+        return _evaluate_vars_sequentially(data, context)
+    # substituted values may form new variables (eg: "{{ {{ a }} }}"),
+    # which may be substituted when variables are substituted one at time
+    if '{{' in result:
+        for match in var_pattern.finditer(result):
+            if match.group(1) in context:
+                return _evaluate_vars_sequentially(data, context)
+    return result
+
+
+class _UnsafeValue(Exception):
+    pass
+
+
+def _evaluate_vars_sequentially(data, context):
+    """
+    substitutes one variable at time, handles the values
+    which can't be substituted by ``_evaluate_string_vars``
+    """
+    vars_found = var_pattern.findall(data)
+    for var in vars_found:
+        var = var.strip()
+        # if found multiple variables, create a new regexp pattern for each
+        # variable, otherwise different variables would get the same value
+        # (see https://github.com/openwisp/netjsonconfig/issues/55)
+        if len(vars_found) > 1:
+            pattern = r'\{\{(\s*%s\s*)\}\}' % var
+        # in case of single variables, use the precompiled
+        # regexp pattern to save computation
+        else:
+            pattern = var_pattern
+        if var in context:
+            data = re.sub(pattern, str(context[var]), data)
     return data
 
 
@@ -127,10 +396,68 @@ def get_copy(dict_, key, default=None):
     """
     value = dict_.get(key, default)
     if value:
-        return deepcopy(value)
+        return _copy(value, {})
     return value
 
 
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LRUCache(object):
+    """
+    Thread safe mapping which holds at most ``maxsize`` items
+    (the least recently used ones are discarded) and counts
+    hits and misses, like ``functools.lru_cache``
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        """
+        returns the value of ``key`` (or ``default``) and updates the counters
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def cache_clear(self):
+        """
+        discards all the items and resets the counters
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
 class _TabsMixin(object):  # pragma: nocover
     """
     mixin that adds _tabs method to test classes
@@ -1143,3 +1143,24 @@ tls-auth-key
             client.render()
         except ValidationError:
             self.fail('ValidationError raised!')
+
+    def test_iter_render(self):
+        conf = copy.deepcopy(self._simple_conf)
+        conf['files'] = [{'path': '/etc/a', 'mode': '0644', 'contents': 'a'}]
+        c = OpenVpn(conf)
+        chunks = list(c.iter_render())
+        # configuration, files delimiter, file
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(''.join(chunks), c.render())
+
+    def test_render_sections(self):
+        conf = copy.deepcopy(self._simple_conf)
+        conf['openvpn'].append(copy.deepcopy(conf['openvpn'][0]))
+        conf['openvpn'][1]['name'] = 'test-2'
+        c = OpenVpn(conf)
+        c.to_intermediate()
+        sections = c.renderer(c).render_sections()
+        self.assertEqual(list(sections), ['test', 'test-2'])
+        self.assertEqual(''.join(sections.values()), c.render())
+        tar = tarfile.open(fileobj=c.generate(), mode='r')
+        self.assertEqual(tar.getnames(), ['test.conf', 'test-2.conf'])
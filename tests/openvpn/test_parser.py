@@ -1,6 +1,8 @@
 import os
+import tarfile
 import unittest
 from copy import deepcopy
+from io import BytesIO
 
 from netjsonconfig import OpenVpn
 from netjsonconfig.exceptions import ParseError, ValidationError
@@ -320,6 +322,32 @@ tls-server
         os.remove('/tmp/test.tar.gz')
         self.assertDictEqual(o.config, self._multiple_vpn)
 
+    def test_parse_tar_stream(self):
+        tar = OpenVpn(self._multiple_vpn).generate()
+        read, write = os.pipe()
+        os.write(write, tar.getvalue())
+        os.close(write)
+        # pipes aren't seekable, the archive is read as a stream
+        with open(read, 'rb') as stream:
+            o = OpenVpn(native=stream)
+        self.assertDictEqual(o.config, self._multiple_vpn)
+
+    def test_parse_tar_binary_member(self):
+        generated = OpenVpn(self._multiple_vpn).generate()
+        tar_bytes = BytesIO()
+        with tarfile.open(fileobj=generated) as source, tarfile.open(
+            fileobj=tar_bytes, mode='w:gz'
+        ) as tar:
+            for member in source:
+                tar.addfile(member, source.extractfile(member))
+            # certificates in DER format aren't text, only .conf is extracted
+            info = tarfile.TarInfo(name='ca.der')
+            info.size = 4
+            tar.addfile(info, BytesIO(b'\x30\x82\xff\xfe'))
+        tar_bytes.seek(0)
+        o = OpenVpn(native=tar_bytes)
+        self.assertDictEqual(o.config, self._multiple_vpn)
+
     def test_file_path_min_length(self):
         conf = deepcopy(self._multiple_vpn)
         conf.update({"files": [{"path": ".", "mode": "0644", "contents": "testing!"}]})
@@ -6,6 +6,7 @@ from time import sleep
 from unittest.mock import patch
 
 from netjsonconfig import OpenWisp
+from netjsonconfig.backends.base.manifest import Manifest
 from netjsonconfig.exceptions import ValidationError
 from netjsonconfig.utils import _TabsMixin
 
@@ -249,6 +250,58 @@ config 'system' 'system'
         checksum2 = md5(o.generate().getvalue()).hexdigest()
         self.assertEqual(checksum1, checksum2)
 
+    def test_manifest(self):
+        o = OpenWisp({"general": {"hostname": "test"}})
+        archive = o.generate(manifest=True)
+        with tarfile.open(fileobj=archive, mode='r') as tar:
+            members = tar.getmembers()
+            # the manifest is next to install.sh, not in uci/ nor in etc/
+            self.assertEqual(members[-1].name, 'netjsonconfig-manifest.json')
+            self.assertIn('install.sh', tar.getnames())
+            contents = tar.extractfile(members[-1]).read().decode()
+        manifest = Manifest.loads(contents)
+        self.assertEqual(list(manifest.files), [m.name for m in members[:-1]])
+        self.assertIn('uci/system.conf', manifest.files)
+        self.assertEqual(manifest.files['install.sh']['mode'], '0755')
+        archive.seek(0)
+        self.assertEqual(
+            Manifest.from_archive(archive, o.manifest_name).files, manifest.files
+        )
+
     def test_default_dsa(self):
         o = OpenWisp({"general": {"hostname": "test"}})
         self.assertEqual(o.dsa, False)
+
+    def test_uci_writer(self):
+        o = OpenWisp(self.config)
+        output = o.render()
+        self.assertIn("config 'interface' 'serv'", output)
+        with patch.object(OpenWisp, 'uci_writer', None):
+            self.assertEqual(OpenWisp(self.config).render(), output)
+
+    def test_generate_package_in_value(self):
+        config = deepcopy(self.config)
+        config['system'] = [{'config_name': 'extra', 'description': 'package x'}]
+        o = OpenWisp(config)
+        tar = tarfile.open(fileobj=o.generate(), mode='r')
+        uci = [n for n in tar.getnames() if n.startswith('uci/')]
+        self.assertEqual(uci, ['uci/{0}.conf'.format(p) for p in o.intermediate_data])
+        contents = tar.extractfile('uci/system.conf').read().decode()
+        self.assertIn("option 'description' 'package x'", contents)
+
+    def test_semantic_checksum(self):
+        o = OpenWisp(self.config)
+        checksum = o.semantic_checksum()
+        # install scripts are added to the files
+        o.generate()
+        self.assertEqual(o.semantic_checksum(), checksum)
+        self.assertEqual(OpenWisp(self.config).semantic_checksum(), checksum)
+
+    def test_semantic_checksum_render(self):
+        o = OpenWisp(self.config)
+        output = o.render()
+        files = deepcopy(o.config['files'])
+        o.semantic_checksum()
+        # the install scripts aren't added to the configuration
+        self.assertEqual(o.config['files'], files)
+        self.assertEqual(o.render(), output)
@@ -1,13 +1,22 @@
+import gzip
 import json
 import os
+import random
 import tarfile
+import tempfile
 import unittest
-from hashlib import md5
+from collections import OrderedDict
+from copy import deepcopy
+from hashlib import md5, sha256
+from io import BytesIO, StringIO
 from time import sleep
+from unittest.mock import patch
 
 from netjsonconfig import OpenWrt
+from netjsonconfig.backends.base.manifest import Manifest
+from netjsonconfig.backends.openwrt.writer import UciWriter, UnsupportedValue
 from netjsonconfig.exceptions import ValidationError
-from netjsonconfig.utils import _TabsMixin
+from netjsonconfig.utils import LRUCache, _TabsMixin
 
 
 class TestBackend(unittest.TestCase, _TabsMixin):
@@ -193,6 +202,30 @@ config wifi-iface 'wifi_wlan0'
         o = OpenWrt(self._config1)
         self.assertEqual(o.render(), o.render())
 
+    def test_validator_cache(self):
+        o1 = OpenWrt({"general": {"hostname": "test1"}})
+        o2 = OpenWrt({"general": {"hostname": "test2"}})
+        self.assertIs(o1._get_validator(), o2._get_validator())
+
+    def test_validator_cache_schema_swap(self):
+        class SwappedSchema(OpenWrt):
+            schema = {'type': 'object', 'required': ['general']}
+
+        o = SwappedSchema({})
+        with self.assertRaises(ValidationError):
+            o.validate()
+        self.assertIsNot(o._get_validator(), OpenWrt({})._get_validator())
+        SwappedSchema.schema = {'type': 'object'}
+        o.validate()
+
+    def test_render_validates_once(self):
+        o = OpenWrt(self._config1)
+        with patch.object(OpenWrt, 'validate', autospec=True) as mocked:
+            o.render()
+            self.assertEqual(mocked.call_count, 1)
+            o.generate()
+            self.assertEqual(mocked.call_count, 2)
+
     def test_write(self):
         o = OpenWrt({"general": {"hostname": "test"}})
         o.write(name='test', path='/tmp')
@@ -201,6 +234,196 @@ config wifi-iface 'wifi_wlan0'
         tar.close()
         os.remove('/tmp/test.tar.gz')
 
+    def test_write_same_checksum(self):
+        o = OpenWrt({"general": {"hostname": "test"}})
+        with tempfile.TemporaryDirectory() as directory:
+            o.write(name='test', path=directory)
+            with open(os.path.join(directory, 'test.tar.gz'), 'rb') as f:
+                self.assertEqual(f.read(), o.generate().getvalue())
+
+    def test_write_invalid(self):
+        o = OpenWrt({"general": {"hostname": "test"}})
+        invalid = OpenWrt({"general": {"hostname": "test"}, "interfaces": 1})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'test.tar.gz')
+            with self.assertRaises(ValidationError):
+                invalid.write(name='test', path=directory)
+            self.assertEqual(os.listdir(directory), [])
+            # the existing archive is left untouched
+            o.write(name='test', path=directory)
+            with open(path, 'rb') as f:
+                contents = f.read()
+            with self.assertRaises(ValidationError):
+                invalid.write(name='test', path=directory)
+            self.assertEqual(os.listdir(directory), ['test.tar.gz'])
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), contents)
+            # the archive has the mode of any other new file
+            reference = os.path.join(directory, 'reference')
+            open(reference, 'w').close()
+            self.assertEqual(os.stat(path).st_mode, os.stat(reference).st_mode)
+
+    def test_generate_checksum(self):
+        rand = random.Random(13)
+        config = deepcopy(self._config1)
+        # larger than the buffers of gzip and tarfile
+        config['files'] = [
+            {
+                'path': '/etc/file{0}'.format(i),
+                'mode': '0644',
+                'contents': '{0:x}'.format(rand.getrandbits(4 * 400000)),
+            }
+            for i in range(3)
+        ]
+        o = OpenWrt(config)
+        # archive built by previous versions, compressed after being written
+        tar_bytes = BytesIO()
+        tar = tarfile.open(fileobj=tar_bytes, mode='w')
+        o._generate_contents(tar)
+        o._process_files(tar)
+        tar.close()
+        expected = BytesIO()
+        gz = gzip.GzipFile(fileobj=expected, mode='wb', mtime=0)
+        gz.write(tar_bytes.getvalue())
+        gz.close()
+        self.assertEqual(o.generate().getvalue(), expected.getvalue())
+
+    def test_generate_fileobj(self):
+        o = OpenWrt({"general": {"hostname": "test"}})
+        with tempfile.TemporaryFile() as f:
+            self.assertIs(o.generate(fileobj=f), f)
+            self.assertFalse(f.closed)
+            f.seek(0)
+            self.assertEqual(f.read(), o.generate().getvalue())
+
+    def test_checksum_method(self):
+        o = OpenWrt(self._config1)
+        checksum = o.checksum()
+        tar = gzip.decompress(o.generate().getvalue())
+        self.assertEqual(checksum, sha256(tar).hexdigest())
+        self.assertEqual(o.checksum('md5'), md5(tar).hexdigest())
+        config = deepcopy(self._config1)
+        config['general'] = {'hostname': 'checksum'}
+        self.assertNotEqual(OpenWrt(config).checksum(), checksum)
+
+    def test_semantic_checksum(self):
+        config = deepcopy(self._config1)
+        config['files'] = [
+            {'path': '/etc/a', 'mode': '0644', 'contents': 'a'},
+            {'path': '/etc/b', 'mode': '0644', 'contents': 'b'},
+        ]
+        checksum = OpenWrt(config).semantic_checksum()
+        # same configuration, files and options in different order
+        config['files'].reverse()
+        interface = config['interfaces'][0]
+        config['interfaces'][0] = OrderedDict(reversed(list(interface.items())))
+        o = OpenWrt(config)
+        self.assertEqual(o.semantic_checksum(), checksum)
+        o.render()
+        self.assertEqual(o.semantic_checksum(), checksum)
+        config['files'][0]['contents'] = 'c'
+        self.assertNotEqual(OpenWrt(config).semantic_checksum(), checksum)
+
+    def test_manifest(self):
+        config = deepcopy(self._config1)
+        config['files'] = [
+            {'path': '/etc/a', 'mode': '0755', 'contents': 'è\n'},
+        ]
+        o = OpenWrt(config)
+        archive = o.generate(manifest=True)
+        tar = tarfile.open(fileobj=archive, mode='r')
+        members = tar.getmembers()
+        self.assertEqual(members[-1].name, 'etc/netjsonconfig/manifest')
+        manifest = Manifest.loads(tar.extractfile(members[-1]).read().decode())
+        self.assertEqual(list(manifest.files), [m.name for m in members[:-1]])
+        for member in members[:-1]:
+            data = tar.extractfile(member).read()
+            entry = manifest.files[member.name]
+            self.assertEqual(entry['size'], len(data))
+            self.assertEqual(entry['sha256'], sha256(data).hexdigest())
+            self.assertEqual(entry['mode'], '{0:04o}'.format(member.mode))
+        self.assertEqual(manifest.files['etc/a']['mode'], '0755')
+        tar.close()
+        # the manifest is optional and not parsed as a file
+        self.assertNotIn(
+            'etc/netjsonconfig/manifest',
+            tarfile.open(fileobj=o.generate(), mode='r').getnames(),
+        )
+        archive.seek(0)
+        parsed = OpenWrt(native=archive)
+        self.assertEqual(parsed.config['interfaces'][0]['name'], 'wlan0')
+
+    def test_manifest_write(self):
+        o = OpenWrt({"general": {"hostname": "test"}})
+        with tempfile.TemporaryDirectory() as directory:
+            o.write('test', path=directory, manifest=True)
+            path = os.path.join(directory, 'test.tar.gz')
+            with tarfile.open(path, mode='r') as tar:
+                names = tar.getnames()
+        self.assertEqual(names, ['etc/config/system', 'etc/netjsonconfig/manifest'])
+
+    def _manifest(self, archive):
+        with tarfile.open(fileobj=archive, mode='r') as tar:
+            names = tar.getnames()
+            member = tar.extractfile('etc/netjsonconfig/manifest')
+            manifest = Manifest.loads(member.read().decode())
+        archive.seek(0)
+        return names, manifest
+
+    def test_delta(self):
+        config = deepcopy(self._config1)
+        config['general'] = {'hostname': 'delta'}
+        config['files'] = [
+            {'path': '/etc/a', 'mode': '0644', 'contents': 'a'},
+            {'path': '/etc/b', 'mode': '0644', 'contents': 'b'},
+        ]
+        full = OpenWrt(config).generate(manifest=True)
+        names, manifest = self._manifest(full)
+        # the radio changes, the interfaces are removed, /etc/b changes mode
+        config['radios'][0]['channel'] = 6
+        del config['interfaces']
+        config['files'][1]['mode'] = '0755'
+        o = OpenWrt(config)
+        for previous in [manifest, manifest.dumps(), full]:
+            with self.subTest(previous=type(previous)):
+                delta_names, delta_manifest = self._manifest(
+                    o.generate(previous=previous)
+                )
+                self.assertEqual(
+                    delta_names,
+                    ['etc/config/wireless', 'etc/b', 'etc/netjsonconfig/manifest'],
+                )
+                self.assertEqual(delta_manifest.removed, ['etc/config/network'])
+                # lists all the files of the configuration
+                self.assertEqual(
+                    list(delta_manifest.files),
+                    ['etc/config/system', 'etc/config/wireless', 'etc/a', 'etc/b'],
+                )
+        # the manifest of a delta archive can be used for the next one
+        full.seek(0)
+        delta = o.generate(previous=full)
+        self.assertEqual(len(self._manifest(delta)[0]), 3)
+        self.assertEqual(
+            self._manifest(o.generate(previous=delta))[0],
+            ['etc/netjsonconfig/manifest'],
+        )
+
+    def test_delta_archive_without_manifest(self):
+        config = {'general': {'hostname': 'delta'}}
+        previous = OpenWrt(config).generate(codec='xz')
+        config['general']['timezone'] = 'Europe/Rome'
+        o = OpenWrt(config)
+        names, manifest = self._manifest(o.generate(previous=previous))
+        self.assertEqual(names, ['etc/config/system', 'etc/netjsonconfig/manifest'])
+        self.assertEqual(manifest.removed, [])
+        names = self._manifest(o.generate(previous=o.generate()))[0]
+        self.assertEqual(names, ['etc/netjsonconfig/manifest'])
+
+    def test_delta_type_error(self):
+        o = OpenWrt({'general': {'hostname': 'delta'}})
+        with self.assertRaises(TypeError):
+            o.generate(previous=[])
+
     def test_templates_type_error(self):
         config = {"general": {"hostname": "test_templates"}}
         with self.assertRaises(TypeError):
@@ -376,6 +599,35 @@ config wifi-iface 'wifi_wlan0'
         o = OpenWrt(config, templates=[template])
         self.assertFalse(o.config['interfaces'][0]['disabled'])
 
+    def test_template_cache(self):
+        base = {"interfaces": [{"name": "lo", "type": "loopback"}]}
+        radio = json.dumps({"radios": [{"name": "radio0", "channel": 1}]})
+        wifi = {"interfaces": [{"name": "wlan0", "type": "wireless"}]}
+        OpenWrt.template_cache.cache_clear()
+        o1 = OpenWrt({"general": {"hostname": "a"}}, templates=[base, radio])
+        # modifying the configuration must not affect the cached templates
+        o1.config['interfaces'][0]['type'] = 'ethernet'
+        o2 = OpenWrt({"general": {"hostname": "b"}}, templates=[base, radio, wifi])
+        self.assertEqual(OpenWrt.template_cache.cache_info().hits, 1)
+        self.assertEqual(OpenWrt.template_cache.cache_info().currsize, 3)
+        self.assertEqual(o2.config['interfaces'][0]['type'], 'loopback')
+        self.assertEqual(len(o2.config['interfaces']), 2)
+        # templates are cached by content
+        base['interfaces'][0]['name'] = 'lo0'
+        o3 = OpenWrt({"general": {"hostname": "c"}}, templates=[base, radio])
+        self.assertEqual(o3.config['interfaces'][0]['name'], 'lo0')
+
+    def test_template_cache_disabled(self):
+        class UncachedOpenWrt(OpenWrt):
+            template_cache = None
+
+        config = {"general": {"hostname": "a"}}
+        templates = [{"interfaces": [{"name": "lo", "type": "loopback"}]}]
+        self.assertEqual(
+            UncachedOpenWrt(config, templates=templates).config,
+            OpenWrt(config, templates=templates).config,
+        )
+
     def test_value_error(self):
         with self.assertRaises(ValueError):
             OpenWrt()
@@ -580,3 +832,246 @@ config wifi-iface 'wifi_wlan0'
                 ),
                 expected,
             )
+
+    def _random_value(self, rand):
+        choice = rand.randrange(6)
+        if choice == 0:
+            return rand.choice(['', None, True, False, 0, 1.5, 80])
+        if choice == 1:
+            return [self._random_value(rand) for _ in range(rand.randrange(3))]
+        parts = ['a', 'True', 'False', 'Tr', 'ue', ' ', '  ', '    ', "'", '\t', 'è']
+        return ''.join(rand.choice(parts) for _ in range(rand.randrange(5)))
+
+    def _random_data(self, rand):
+        data = OrderedDict()
+        for package in range(rand.randrange(4)):
+            blocks = []
+            for _ in range(rand.randrange(4)):
+                block = OrderedDict([('.type', 'interface'), ('.name', 'lan')])
+                for option in range(rand.randrange(5)):
+                    key = rand.choice(['opt{0}'.format(option), '.opt', 'True'])
+                    block[key] = self._random_value(rand)
+                blocks.append(block)
+            data['package{0}'.format(package)] = blocks
+        return data
+
+    def _render(self, backend, writer):
+        renderer = backend.renderer(backend)
+        if writer is None:
+            # whole output of the template
+            return renderer._render_template(backend.intermediate_data)
+        with patch.object(backend, 'uci_writer', writer):
+            return renderer.render()
+
+    def test_uci_writer(self):
+        rand = random.Random(11)
+        o = OpenWrt({})
+        for _ in range(300):
+            o.intermediate_data = self._random_data(rand)
+            with self.subTest(data=o.intermediate_data):
+                self.assertEqual(self._render(o, o.uci_writer), self._render(o, None))
+
+    def test_uci_writer_fallback(self):
+        o = OpenWrt({})
+        writer = UciWriter()
+        for value in [' leading', 'trailing ', 'new\nline\n\n\n', 'a\noption b']:
+            o.intermediate_data = OrderedDict(
+                [('system', [{'.type': 'system', '.name': 'system', 'x': value}])]
+            )
+            with self.subTest(value=value):
+                with self.assertRaises(UnsupportedValue):
+                    list(writer.iter_packages(o.intermediate_data))
+                self.assertEqual(self._render(o, writer), self._render(o, None))
+
+    def test_uci_writer_stream(self):
+        o = OpenWrt({'general': {'hostname': 'test'}, 'interfaces': []})
+        o.to_intermediate()
+        chunks = list(o.uci_writer.iter_packages(o.intermediate_data))
+        self.assertEqual(len(chunks), len(o.intermediate_data))
+        self.assertEqual(''.join(chunks), o.render())
+
+    def test_iter_render(self):
+        config = {
+            'general': {'hostname': 'test'},
+            'interfaces': [{'name': 'eth0', 'type': 'ethernet'}],
+            'files': [
+                {'path': '/etc/a', 'mode': '0644', 'contents': 'a\n\n'},
+                {'path': '/etc/b', 'mode': '0644', 'contents': '\n\nb'},
+            ],
+        }
+        o = OpenWrt(config)
+        chunks = list(o.iter_render())
+        # system, network, files delimiter, 2 files
+        self.assertEqual(len(chunks), 5)
+        self.assertTrue(chunks[-1].startswith('# path: /etc/b'))
+        self.assertEqual(''.join(chunks), o.render())
+        self.assertEqual(''.join(o.iter_render(files=False)), o.render(files=False))
+
+    def test_iter_render_invalid(self):
+        o = OpenWrt({'interfaces': [{'name': 'eth0', 'type': 'wrong'}]})
+        chunks = o.iter_render()
+        with self.assertRaises(ValidationError):
+            next(chunks)
+
+    def test_iter_render_suspended(self):
+        o = OpenWrt({'general': {'hostname': 'test'}})
+        chunks = o.iter_render()
+        next(chunks)
+        # the stream being consumed doesn't skip other validations
+        o.config['general']['hostname'] = 'wrong_hostname!'
+        with self.assertRaises(ValidationError):
+            o.render()
+        with self.assertRaises(ValidationError):
+            o.to_intermediate()
+
+    def test_render_to(self):
+        o = OpenWrt(
+            {
+                'general': {'hostname': 'test'},
+                'files': [{'path': '/etc/a', 'mode': '0644', 'contents': 'a'}],
+            }
+        )
+        stream = StringIO()
+        o.render_to(stream)
+        self.assertEqual(stream.getvalue(), o.render())
+
+    def test_iter_render_fallback(self):
+        rand = random.Random(12)
+        o = OpenWrt({})
+        for _ in range(300):
+            o.intermediate_data = self._random_data(rand)
+            renderer = o.renderer(o)
+            with self.subTest(data=o.intermediate_data):
+                self.assertEqual(''.join(renderer.iter_render()), self._render(o, None))
+
+    _packages_config = {
+        'general': {'hostname': 'test', 'ula_prefix': 'fd8e:f40a:6701::/48'},
+        'ntp': {'enabled': True, 'server': ['0.openwrt.pool.ntp.org']},
+        'interfaces': [
+            {
+                'name': 'br-lan',
+                'type': 'bridge',
+                'bridge_members': ['eth0', 'wlan0'],
+            },
+            {
+                'name': 'wlan0',
+                'type': 'wireless',
+                'wireless': {
+                    'radio': 'radio0',
+                    'mode': 'access_point',
+                    'ssid': 'test',
+                    'network': ['lan'],
+                },
+            },
+        ],
+        'radios': [
+            {
+                'name': 'radio0',
+                'phy': 'phy0',
+                'driver': 'mac80211',
+                'protocol': '802.11n',
+                'channel': 1,
+                'channel_width': 20,
+                'country': 'IT',
+            }
+        ],
+        'dhcp': [{'config_name': 'dnsmasq', 'domainneeded': True}],
+        'files': [{'path': '/etc/a', 'mode': '0644', 'contents': 'a'}],
+    }
+
+    def test_render_packages(self):
+        o = OpenWrt(self._packages_config)
+        o.to_intermediate()
+        for package in o.intermediate_data:
+            with self.subTest(package=package):
+                expected = ''.join(
+                    o.uci_writer.iter_packages({package: o.intermediate_data[package]})
+                )
+                o2 = OpenWrt(self._packages_config)
+                self.assertEqual(o2.render(files=False, packages=[package]), expected)
+                # the partial result is not stored
+                self.assertIsNone(o2.intermediate_data)
+                self.assertEqual(o.render(files=False, packages=[package]), expected)
+        o2 = OpenWrt(self._packages_config)
+        packages = list(o.intermediate_data)
+        self.assertEqual(o2.render(packages=packages), o.render())
+        self.assertEqual(o2.render(packages=[]), o2.render(packages=['unknown']))
+
+    def test_render_packages_converters(self):
+        o = OpenWrt(self._packages_config)
+        mocks = OrderedDict()
+        for converter_class in o.converters:
+            mocks[converter_class.__name__] = patch.object(
+                converter_class,
+                'to_intermediate',
+                autospec=True,
+                side_effect=converter_class.to_intermediate,
+            ).start()
+        self.addCleanup(patch.stopall)
+
+        def converted(packages):
+            for mock in mocks.values():
+                mock.reset_mock()
+            output = o.render(packages=packages)
+            return output, [name for name, mock in mocks.items() if mock.called]
+
+        self.assertEqual(converted(['system'])[1], ['General', 'Ntp'])
+        self.assertEqual(converted(['dhcp'])[1], ['Default'])
+        # wifi interfaces depend on the bridges of the network package
+        output, ran = converted(['wireless'])
+        self.assertIn("option network 'lan'", output)
+        self.assertEqual(ran, ['General', 'Interfaces', 'Radios', 'Wireless'])
+
+    def test_uci_writer_cache(self):
+        o = OpenWrt(self._packages_config)
+        o.to_intermediate()
+        cache = LRUCache(maxsize=2)
+        writer = UciWriter(cache=cache)
+        expected = ''.join(UciWriter().iter_packages(o.intermediate_data))
+        self.assertEqual(''.join(writer.iter_packages(o.intermediate_data)), expected)
+        self.assertEqual(cache.cache_info().currsize, 2)
+        self.assertEqual(cache.cache_info().hits, 0)
+        # the last packages are still cached
+        data = OrderedDict(list(o.intermediate_data.items())[-2:])
+        self.assertEqual(
+            ''.join(writer.iter_packages(data)),
+            ''.join(UciWriter().iter_packages(data)),
+        )
+        self.assertEqual(cache.cache_info().hits, 2)
+        # the output depends on the types of the values
+        data = OrderedDict(system=[{'.type': 'system', '.name': 'system', 'x': 1}])
+        self.assertIn("option x '1'", ''.join(writer.iter_packages(data)))
+        data['system'][0]['x'] = 1.0
+        self.assertIn("option x '1.0'", ''.join(writer.iter_packages(data)))
+
+    def test_render_sections(self):
+        rand = random.Random(13)
+        o = OpenWrt({})
+        for _ in range(300):
+            o.intermediate_data = self._random_data(rand)
+            # values which the writer doesn't support
+            for blocks in o.intermediate_data.values():
+                for block in blocks:
+                    if rand.randrange(3) == 0:
+                        block['x'] = rand.choice([' a', 'a\n\npackage b\n', '\n'])
+            expected = self._render(o, None)
+            for writer in [o.uci_writer, None]:
+                with self.subTest(data=o.intermediate_data, writer=writer):
+                    with patch.object(o, 'uci_writer', writer):
+                        sections = o.renderer(o).render_sections()
+                    self.assertEqual(list(sections), list(o.intermediate_data))
+                    self.assertEqual(''.join(sections.values()), expected)
+
+    def test_generate_package_in_value(self):
+        o = OpenWrt(
+            {
+                'general': {'hostname': 'test'},
+                'dhcp': [{'config_name': 'dnsmasq', 'x': 'a\npackage b\n'}],
+            }
+        )
+        tar = tarfile.open(fileobj=o.generate(), mode='r')
+        self.assertEqual(tar.getnames(), ['etc/config/system', 'etc/config/dhcp'])
+        contents = tar.extractfile('etc/config/dhcp').read().decode()
+        self.assertEqual(
+            contents, "config dnsmasq 'dnsmasq_1'\n\toption x 'a\npackage b\n'\n"
+        )
@@ -251,3 +251,32 @@ config olsrv2 'internet_hna'
 """
         )
         self.assertEqual(o.render(), expected)
+
+    def test_config_not_modified(self):
+        config = {
+            "dhcp": [
+                {
+                    "config_name": "dnsmasq",
+                    "config_value": "dnsmasq",
+                    "domainneeded": True,
+                },
+                {"config_name": "dhcp", "config_value": "lan", "interface": "lan"},
+            ]
+        }
+        o = OpenWrt(config)
+        o.render(packages=['dhcp'])
+        expected = self._tabs(
+            """package dhcp
+
+config dnsmasq 'dnsmasq'
+    option domainneeded '1'
+
+config dhcp 'lan'
+    option interface 'lan'
+"""
+        )
+        self.assertEqual(o.render(), expected)
+        self.assertEqual(
+            o.config['dhcp'][0],
+            {"config_name": "dnsmasq", "config_value": "dnsmasq", "domainneeded": True},
+        )
@@ -1,5 +1,7 @@
 import os
+import tarfile
 import unittest
+from io import BytesIO
 
 from netjsonconfig import OpenWrt
 from netjsonconfig.exceptions import ParseError
@@ -225,6 +227,36 @@ config interface 'lan'
         os.remove('/tmp/test.tar.gz')
         self.assertDictEqual(o.intermediate_data, expected)
 
+    def test_parse_tar_stream(self):
+        conf = {
+            "general": {"hostname": "parse-tar-stream"},
+            "interfaces": [{"name": "eth0", "type": "ethernet"}],
+        }
+        tar = OpenWrt(conf).generate()
+        read, write = os.pipe()
+        os.write(write, tar.getvalue())
+        os.close(write)
+        # pipes aren't seekable, the archive is read as a stream
+        with open(read, 'rb') as stream:
+            o = OpenWrt(native=stream)
+        self.assertEqual(o.config["general"]["hostname"], "parse-tar-stream")
+        self.assertEqual(o.config["interfaces"][0]["name"], "eth0")
+
+    def test_parse_tar_binary_member(self):
+        tar_bytes = BytesIO()
+        with tarfile.open(fileobj=tar_bytes, mode='w:gz') as tar:
+            for name, data in [
+                ('etc/config/system', self._system_uci.split('\n', 1)[1].encode()),
+                # host keys aren't text, only etc/config is extracted
+                ('etc/dropbear/dropbear_rsa_host_key', b'\x00\x80\xff\xfe'),
+            ]:
+                info = tarfile.TarInfo(name=name)
+                info.size = len(data)
+                tar.addfile(info, BytesIO(data))
+        tar_bytes.seek(0)
+        o = OpenWrt(native=tar_bytes)
+        self.assertDictEqual(o.intermediate_data, self._system_intermediate)
+
     def test_parse_exception(self):
         try:
             OpenWrt(native=10)
@@ -281,3 +313,74 @@ config interface "lan"
             ]
         }
         self.assertDictEqual(o.intermediate_data, expected)
+
+    def test_parse_quotes_in_values(self):
+        native = self._tabs(
+            """package system
+
+config system 'system'
+    option custom_setting 'it'\\''s a "test"'
+    option description "double \\"quoted\\" \\\\ value"
+    option notes 'first line
+second line'
+    option url http://example.com/#anchor # comment
+    list ntp 'pool.ntp.org' # comment
+"""
+        )
+        o = OpenWrt(native=native)
+        expected = {
+            "system": [
+                {
+                    ".type": "system",
+                    ".name": "system",
+                    "custom_setting": "it's a \"test\"",
+                    "description": "double \"quoted\" \\ value",
+                    "notes": "first line\nsecond line",
+                    "url": "http://example.com/#anchor",
+                    "ntp": ["pool.ntp.org"],
+                }
+            ]
+        }
+        self.assertDictEqual(o.intermediate_data, expected)
+
+    def test_parse_quoted_names(self):
+        native = self._tabs(
+            """package 'firewall'
+
+config 'rule'
+    option 'name' 'Allow SSH from LAN'
+
+config "zone" 'lan zone'
+    list 'network' 'lan'
+"""
+        )
+        o = OpenWrt(native=native)
+        expected = {
+            "firewall": [
+                {".type": "rule", ".name": "rule_1", "name": "Allow SSH from LAN"},
+                {".type": "zone", ".name": "lan zone", "network": ["lan"]},
+            ]
+        }
+        self.assertDictEqual(o.intermediate_data, expected)
+
+    def test_parse_invalid_syntax_fallback(self):
+        native = self._tabs(
+            """package network
+
+config interface 'lan'
+    option proto 'static'
+    option ifname 'eth0
+"""
+        )
+        o = OpenWrt(native=native)
+        expected = {
+            "network": [
+                {
+                    ".type": "interface",
+                    ".name": "lan",
+                    "proto": "static",
+                    "ifname": "eth0",
+                }
+            ]
+        }
+        self.assertDictEqual(o.intermediate_data, expected)
@@ -0,0 +1,158 @@
+import json
+import unittest
+from collections import OrderedDict
+from copy import copy, deepcopy
+
+from netjsonconfig import OpenWrt
+from netjsonconfig.backends.openwrt.uci import UciSection
+from netjsonconfig.backends.openwrt.writer import UciWriter
+from netjsonconfig.utils import IndexedConfig, _TabsMixin, sorted_dict
+
+
+class TestUciSection(unittest.TestCase, _TabsMixin):
+    maxDiff = None
+
+    _block = {
+        '.type': 'interface',
+        '.name': 'lan',
+        'proto': 'static',
+        'ipaddr': '192.168.1.1',
+        'dns': ['8.8.8.8', '8.8.4.4'],
+    }
+
+    def test_mapping(self):
+        section = UciSection.from_dict(self._block)
+        self.assertEqual(section.type, 'interface')
+        self.assertEqual(section.name, 'lan')
+        self.assertFalse(section.ordered)
+        # the options are not sorted until they're iterated
+        self.assertEqual(list(section.options), ['proto', 'ipaddr', 'dns'])
+        self.assertEqual(section['.type'], 'interface')
+        self.assertEqual(section['proto'], 'static')
+        self.assertIn('.name', section)
+        self.assertNotIn('.index', section)
+        self.assertEqual(len(section), 5)
+        self.assertEqual(section.get('mtu', 1500), 1500)
+        self.assertEqual(list(section.items()), list(sorted_dict(self._block).items()))
+        self.assertTrue(section.ordered)
+        # the block is not modified
+        self.assertIn('.type', self._block)
+        with self.assertRaises(KeyError):
+            section['mtu']
+
+    def test_modify(self):
+        section = UciSection.from_dict(self._block)
+        expected = sorted_dict(self._block)
+        for data in (section, expected):
+            data['mtu'] = 1500
+            data['proto'] = 'dhcp'
+            data['.name'] = 'wan'
+            del data['ipaddr']
+            self.assertEqual(data.pop('dns'), ['8.8.8.8', '8.8.4.4'])
+        # new options are added after the existing ones, like sorted_dict
+        self.assertEqual(list(section.items()), list(expected.items()))
+        del section['.type']
+        self.assertNotIn('.type', section)
+        self.assertIsNone(section.type)
+
+    def test_equality(self):
+        section = UciSection.from_dict(self._block)
+        self.assertEqual(section, self._block)
+        self.assertEqual(self._block, section)
+        self.assertEqual(section, UciSection.from_dict(sorted_dict(self._block)))
+        self.assertNotEqual(section, dict(self._block, proto='dhcp'))
+        self.assertNotEqual(section, UciSection.from_dict(dict(self._block, mtu=1)))
+        self.assertNotEqual(section, 'lan')
+        self.assertIn(self._block, [section])
+
+    def test_copy(self):
+        section = UciSection.from_dict(self._block)
+        for copied in (copy(section), section.copy(), deepcopy(section)):
+            self.assertIsInstance(copied, UciSection)
+            self.assertEqual(copied, section)
+            copied['proto'] = 'dhcp'
+            self.assertEqual(section['proto'], 'static')
+        self.assertIsNot(deepcopy(section)['dns'], section['dns'])
+        self.assertEqual(section.to_dict(), sorted_dict(self._block))
+        self.assertIsInstance(section.to_dict(), OrderedDict)
+
+    def test_repr(self):
+        section = UciSection.from_dict(self._block)
+        self.assertEqual(repr(section), repr(UciSection.from_dict(section)))
+        self.assertEqual(
+            repr(section),
+            "UciSection({'.name': 'lan', '.type': 'interface', "
+            "'dns': ['8.8.8.8', '8.8.4.4'], 'ipaddr': '192.168.1.1', "
+            "'proto': 'static'})",
+        )
+        # options added after sorting have a different order
+        section['a'] = '1'
+        self.assertNotEqual(
+            repr(section), repr(UciSection.from_dict(section.to_dict()))
+        )
+
+    def test_writer(self):
+        section = UciSection.from_dict(self._block)
+        writer = UciWriter()
+        expected = self._tabs(
+            """package network
+
+config interface 'lan'
+    list dns '8.8.8.8'
+    list dns '8.8.4.4'
+    option ipaddr '192.168.1.1'
+    option proto 'static'
+"""
+        )
+        self.assertEqual(
+            writer.format_package('network', [sorted_dict(self._block)]), expected
+        )
+        self.assertEqual(writer.format_package('network', [section]), expected)
+        # the writer doesn't sort the section
+        self.assertFalse(section.ordered)
+
+    def test_merge(self):
+        indexed = IndexedConfig(identifiers=['.name'])
+        indexed.merge({'network': [UciSection.from_dict(self._block)]})
+        section = indexed.data['network'][0]
+        indexed.merge(
+            {
+                'network': [
+                    UciSection.from_dict(
+                        {'.type': 'interface', '.name': 'lan', 'mtu': 1}
+                    ),
+                    UciSection.from_dict({'.type': 'interface', '.name': 'wan'}),
+                ]
+            }
+        )
+        self.assertIs(indexed.data['network'][0], section)
+        self.assertEqual(section['mtu'], 1)
+        self.assertEqual([s.name for s in indexed.data['network']], ['lan', 'wan'])
+
+    def test_backend(self):
+        o = OpenWrt(
+            {
+                "general": {"hostname": "test"},
+                "dhcp": [{"config_name": "dnsmasq", "domainneeded": True}],
+            }
+        )
+        o.to_intermediate()
+        for blocks in o.intermediate_data.values():
+            for block in blocks:
+                self.assertIsInstance(block, UciSection)
+        native = o.render()
+        parsed = OpenWrt(native=native)
+        self.assertIsInstance(parsed.intermediate_data['system'][0], UciSection)
+        # the NetJSON configuration doesn't contain sections
+        json.dumps(parsed.config)
+        self.assertEqual(parsed.config['dhcp'][0]['config_name'], 'dnsmasq')
+        self.assertEqual(parsed.render(), native)
+
+    def test_json(self):
+        o = OpenWrt({"general": {"hostname": "test"}})
+        o.to_intermediate()
+        with self.assertRaises(TypeError):
+            json.dumps(o.intermediate_data)
+        data = json.loads(json.dumps(o.intermediate_data, default=dict))
+        self.assertEqual(data['system'][0], o.intermediate_data['system'][0].to_dict())
+        self.assertEqual(data['system'][0]['hostname'], 'test')
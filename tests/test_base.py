@@ -1,9 +1,16 @@
+import os
+import tempfile
 import unittest
 from io import BytesIO
+from unittest.mock import patch
 
+from jinja2 import FileSystemBytecodeCache
+
+from netjsonconfig import OpenWisp, OpenWrt
 from netjsonconfig.backends.base.backend import BaseBackend
+from netjsonconfig.backends.base.converter import BaseConverter
 from netjsonconfig.backends.base.parser import BaseParser
-from netjsonconfig.backends.base.renderer import BaseRenderer
+from netjsonconfig.backends.base.renderer import BaseRenderer, get_template_env
 
 
 class TestBase(unittest.TestCase):
@@ -32,3 +39,83 @@ class TestBase(unittest.TestCase):
     def test_base_backend_parse_not_implemented(self):
         with self.assertRaises(NotImplementedError):
             BaseBackend(native='')
+
+    def test_template_env_cache(self):
+        o = OpenWrt({'general': {'hostname': 'test'}})
+        r1 = OpenWrt.renderer(o)
+        r2 = OpenWrt.renderer(o)
+        self.assertIs(r1.template_env, r2.template_env)
+        self.assertIs(
+            r1.template_env.get_template('openwrt.jinja2'),
+            r2.template_env.get_template('openwrt.jinja2'),
+        )
+        self.assertIs(
+            get_template_env('netjsonconfig.backends.openwisp.openwisp'),
+            get_template_env('netjsonconfig.backends.openwisp.openwisp'),
+        )
+
+    def test_bytecode_cache(self):
+        config = {'general': {'hostname': 'test'}}
+        with tempfile.TemporaryDirectory() as directory:
+            cache = FileSystemBytecodeCache(directory)
+            with patch.object(OpenWisp.renderer, 'bytecode_cache', cache), patch.object(
+                OpenWisp, 'uci_writer', None
+            ):
+                o = OpenWisp(config)
+                self.assertIs(o.renderer(o).template_env.bytecode_cache, cache)
+                o.generate()
+            # openwrt.jinja2, install.sh, uninstall.sh, tc_script.sh
+            self.assertEqual(len(os.listdir(directory)), 4)
+        self.assertIsNone(OpenWisp(config).renderer.bytecode_cache)
+
+    def test_type_cast(self):
+        schema = {
+            'properties': {
+                'mtu': {'type': 'integer'},
+                'enabled': {'type': 'boolean'},
+                'metric': {'type': ['integer', 'string']},
+                'name': {'type': 'string'},
+                'any': {'type': []},
+                'ref': {'$ref': '#/definitions/ref'},
+            }
+        }
+
+        class Converter(BaseConverter):
+            _schema = schema
+
+        converter = Converter(OpenWrt({}))
+        item = {
+            'mtu': '1500',
+            'enabled': '1',
+            'metric': '10',
+            'name': '1',
+            'any': '1',
+            'ref': '1',
+            'other': '1',
+        }
+        self.assertEqual(
+            converter.type_cast(item),
+            {
+                'mtu': 1500,
+                'enabled': True,
+                'metric': 10,
+                'name': '1',
+                'any': '1',
+                'ref': '1',
+                'other': '1',
+            },
+        )
+        # values of the right type are not cast
+        item = converter.type_cast({'mtu': True, 'enabled': False})
+        self.assertIs(item['mtu'], True)
+        self.assertIs(item['enabled'], False)
+        other_schema = {'properties': {'name': {'type': 'integer'}}}
+        self.assertEqual(converter.type_cast({'name': '1'}, other_schema), {'name': 1})
+        with self.assertRaises(ValueError):
+            converter.type_cast({'mtu': 'auto'})
+        # plans are built once per schema fragment and cached on the class
+        self.assertEqual(len(Converter._casting_plans), 2)
+        self.assertNotIn('_casting_plans', BaseConverter.__dict__)
+        plan = Converter._casting_plan(schema)
+        self.assertIs(Converter._casting_plan(schema), plan)
+        self.assertEqual(set(plan), {'mtu', 'enabled', 'metric'})
@@ -2,6 +2,7 @@ import json
 import os
 import subprocess
 import tarfile
+import tempfile
 import unittest
 
 from netjsonconfig import OpenWrt
@@ -160,6 +161,40 @@ class TestBin(unittest.TestCase, _TabsMixin):
         self.assertEqual(len(tar.getmembers()), 1)
         tar.close()
 
+    def test_compression_arguments(self):
+        config = """'{"general": { "hostname": "example" }}'"""
+        command = (
+            "netjsonconfig -c %s -b openwrt -m generate "
+            "-a codec=bz2 compression_level=5 > test.tar.gz" % config
+        )
+        subprocess.check_output(command, shell=True)
+        tar = tarfile.open(self._test_file, 'r:bz2')
+        self.assertEqual(len(tar.getmembers()), 1)
+        tar.close()
+
+    def test_invalid_compression_level(self):
+        config = """'{"general": { "hostname": "example" }}'"""
+        command = "netjsonconfig -c %s -b openwrt -m generate -a compression_level=12"
+        try:
+            subprocess.check_output(command % config, shell=True)
+        except subprocess.CalledProcessError as e:
+            self.assertIn('invalid compression level', e.output.decode())
+        else:
+            self.fail('subprocess.CalledProcessError not raised')
+
+    def test_numeric_write_arguments(self):
+        config = """'{"general": { "hostname": "example" }}'"""
+        with tempfile.TemporaryDirectory() as directory:
+            os.mkdir(os.path.join(directory, '2024'))
+            command = (
+                "cd %s && netjsonconfig -c %s -b openwrt -m write "
+                "-a name=0042 path=2024 compression_level=1"
+            )
+            subprocess.check_output(command % (directory, config), shell=True)
+            path = os.path.join(directory, '2024', '0042.tar.gz')
+            with tarfile.open(path, 'r') as tar:
+                self.assertEqual(len(tar.getmembers()), 1)
+
     def test_context(self):
         config = json.dumps({'general': {'description': '{{ DESC }}'}})
         command = "export DESC=testdesc; netjsonconfig --config '{0}' -b openwrt -m render".format(
@@ -0,0 +1,152 @@
+import gzip
+import os
+import tarfile
+import tempfile
+import unittest
+import zlib
+from io import BytesIO
+from unittest.mock import patch
+
+from netjsonconfig import OpenWisp, OpenWrt
+from netjsonconfig.backends.base.compression import Codec, codecs
+
+
+class TestCompression(unittest.TestCase):
+    """
+    tests for netjsonconfig.backends.base.compression
+    """
+
+    _config = {
+        "general": {"hostname": "compression-test"},
+        "files": [
+            {
+                "path": "/etc/test.txt",
+                "mode": "0644",
+                "contents": "compression test\n" * 1000,
+            }
+        ],
+    }
+
+    def _members(self, archive):
+        with tarfile.open(fileobj=archive, mode='r:*') as tar:
+            return {
+                member.name: tar.extractfile(member).read()
+                for member in tar.getmembers()
+            }
+
+    def test_codecs(self):
+        expected = self._members(OpenWrt(self._config).generate())
+        for name in codecs:
+            o = OpenWrt(self._config)
+            with self.subTest(codec=name):
+                archive = o.generate(codec=name)
+                self.assertEqual(self._members(archive), expected)
+                # archives with the same contents have the same checksum
+                self.assertEqual(
+                    archive.getvalue(),
+                    OpenWrt(self._config).generate(codec=name).getvalue(),
+                )
+
+    def test_compression_level(self):
+        o = OpenWrt(self._config)
+        default = o.generate().getvalue()
+        self.assertEqual(default, o.generate(compression_level=9).getvalue())
+        fast = o.generate(compression_level=1).getvalue()
+        self.assertGreater(len(fast), len(default))
+        self.assertEqual(gzip.decompress(fast), gzip.decompress(default))
+        stored = o.generate(compression_level=0).getvalue()
+        self.assertGreater(len(stored), len(fast))
+        self.assertEqual(
+            len(o.generate(codec='xz', compression_level=0).getvalue()),
+            len(o.generate(codec='xz', compression_level=0).getvalue()),
+        )
+
+    def test_invalid(self):
+        o = OpenWrt(self._config)
+        with self.assertRaises(ValueError):
+            o.generate(compression_level=10)
+        with self.assertRaises(ValueError):
+            o.generate(codec='bz2', compression_level=0)
+        for level in (True, 1.0, '1'):
+            with self.assertRaises(ValueError):
+                o.generate(compression_level=level)
+        with self.assertRaises(ValueError):
+            o.generate(codec='zip')
+
+    def test_codec_attribute(self):
+        o = OpenWisp({"general": {"hostname": "compression-test"}})
+        with patch.object(OpenWisp, 'codec', 'xz'):
+            archive = o.generate()
+            with tarfile.open(fileobj=archive, mode='r:xz') as tar:
+                self.assertIn('install.sh', tar.getnames())
+            # the codec argument has precedence over the attribute
+            archive = o.generate(codec='gzip')
+            with tarfile.open(fileobj=archive, mode='r:gz') as tar:
+                self.assertIn('install.sh', tar.getnames())
+
+    def test_custom_codec(self):
+        class ZlibCodec(Codec):
+            name = 'zlib'
+            extension = 'tar.z'
+            levels = range(0, 10)
+            default_level = 6
+
+            def _open(self, fileobj, level):
+                return _ZlibStream(fileobj, level)
+
+        o = OpenWrt(self._config)
+        archive = o.generate(codec=ZlibCodec())
+        tar = BytesIO(zlib.decompress(archive.getvalue()))
+        self.assertEqual(self._members(tar), self._members(o.generate()))
+
+    def test_write(self):
+        o = OpenWrt(self._config)
+        with tempfile.TemporaryDirectory() as directory:
+            o.write('test', path=directory, codec='bz2', compression_level=1)
+            path = os.path.join(directory, 'test.tar.bz2')
+            with open(path, 'rb') as f:
+                self.assertEqual(
+                    f.read(),
+                    o.generate(codec='bz2', compression_level=1).getvalue(),
+                )
+            o.write('test', path=directory, codec='none')
+            self.assertTrue(tarfile.is_tarfile(os.path.join(directory, 'test.tar')))
+
+    def test_unseekable_fileobj(self):
+        o = OpenWrt(self._config)
+        for name in codecs:
+            fileobj = _Unseekable()
+            with self.subTest(codec=name):
+                self.assertIs(o.generate(fileobj=fileobj, codec=name), fileobj)
+                self.assertEqual(
+                    fileobj.buffer.getvalue(), o.generate(codec=name).getvalue()
+                )
+
+
+class _Unseekable(object):
+    """
+    write only file object (eg: a pipe)
+    """
+
+    def __init__(self):
+        self.buffer = BytesIO()
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+class _ZlibStream(object):
+    def __init__(self, fileobj, level):
+        self.fileobj = fileobj
+        self.compressor = zlib.compressobj(level)
+
+    def write(self, data):
+        self.fileobj.write(self.compressor.compress(data))
+        return len(data)
+
+    def tell(self):
+        # initial position of the tar archive
+        return 0
+
+    def close(self):
+        self.fileobj.write(self.compressor.flush())
@@ -0,0 +1,204 @@
+import unittest
+from copy import deepcopy
+from unittest.mock import patch
+
+from netjsonconfig import OpenWisp, OpenWrt
+from netjsonconfig.backends.base.prepared import PreparedConfig
+from netjsonconfig.exceptions import ValidationError
+
+
+class TestPreparedConfig(unittest.TestCase):
+    """
+    tests for netjsonconfig.backends.base.prepared
+    """
+
+    _templates = [
+        {
+            "general": {"description": "{{ description }}"},
+            "radios": [
+                {
+                    "name": "radio0",
+                    "phy": "phy0",
+                    "driver": "mac80211",
+                    "protocol": "802.11n",
+                    "channel": 11,
+                    "channel_width": 20,
+                    "tx_power": 10,
+                    "country": "IT",
+                }
+            ],
+            "interfaces": [
+                {
+                    "name": "eth0",
+                    "type": "ethernet",
+                    "addresses": [
+                        {
+                            "proto": "static",
+                            "family": "ipv4",
+                            "address": "{{ ip }}",
+                            "mask": 24,
+                        }
+                    ],
+                }
+            ],
+        }
+    ]
+    _config = {
+        "general": {"hostname": "{{ name }}"},
+        "files": [
+            {
+                "path": "/etc/device",
+                "mode": "0644",
+                "contents": "name={{ name }}\nsecret={{ secret }}",
+            }
+        ],
+    }
+    _context = {
+        "name": "router1",
+        "ip": "10.0.0.1",
+        "description": "first",
+        "secret": "s3cr3t",
+    }
+
+    def test_prepare(self):
+        prepared = OpenWrt.prepare(self._config, templates=self._templates)
+        self.assertIsInstance(prepared, PreparedConfig)
+        self.assertEqual(len(prepared.slots), 4)
+        self.assertIn(('general', 'description'), prepared.slots)
+        self.assertNotIn(('general', 'description'), prepared.dependent_slots)
+        self.assertIn(('general', 'hostname'), prepared.dependent_slots)
+        # the address is not a valid ipv4 until it's evaluated
+        self.assertFalse(prepared.valid)
+
+    def test_instantiate(self):
+        prepared = OpenWrt.prepare(self._config, templates=self._templates)
+        for name in ['router1', 'router2']:
+            context = dict(self._context, name=name)
+            o = prepared.instantiate(context)
+            expected = OpenWrt(self._config, templates=self._templates, context=context)
+            self.assertIsInstance(o, OpenWrt)
+            self.assertEqual(o.config, expected.config)
+            self.assertEqual(o.render(), expected.render())
+        # instances don't modify the prepared configuration
+        self.assertEqual(prepared.config['general']['hostname'], '{{ name }}')
+        self.assertEqual(prepared.instantiate().config, prepared.config)
+
+    def test_instantiate_invalid(self):
+        prepared = OpenWrt.prepare(self._config, templates=self._templates)
+        o = prepared.instantiate(dict(self._context, ip='WRONG'))
+        with self.assertRaises(ValidationError):
+            o.render()
+
+    def test_skip_validation(self):
+        config = {"general": {"hostname": "router", "description": "{{ d }}"}}
+        prepared = OpenWrt.prepare(config)
+        self.assertTrue(prepared.valid)
+        self.assertEqual(prepared.dependent_slots, set())
+        o = prepared.instantiate({'d': 'test'})
+        with patch.object(OpenWrt, '_get_validator') as get_validator:
+            self.assertIn("option description 'test'", o.render())
+            get_validator.assert_not_called()
+        # variables which may affect the validity are validated
+        config = {
+            "radios": self._templates[0]["radios"],
+            "interfaces": [
+                {
+                    "name": "wlan0",
+                    "type": "wireless",
+                    "wireless": {
+                        "radio": "radio0",
+                        "mode": "access_point",
+                        "ssid": "{{ ssid }}",
+                    },
+                }
+            ],
+        }
+        prepared = OpenWrt.prepare(config)
+        self.assertTrue(prepared.valid)
+        self.assertEqual(len(prepared.dependent_slots), 1)
+        prepared.instantiate({'ssid': 'valid'}).render()
+        with self.assertRaises(ValidationError):
+            prepared.instantiate({'ssid': 'too long' * 10}).render()
+
+    def test_validation_after_modification(self):
+        config = {"general": {"hostname": "router", "description": "{{ d }}"}}
+        o = OpenWrt.prepare(config).instantiate({'d': 'test'})
+        with patch.object(OpenWrt, '_get_validator') as get_validator:
+            o.render()
+            get_validator.assert_not_called()
+        # only the first validation is skipped
+        o.config['general']['hostname'] = 'invalid hostname!'
+        with self.assertRaises(ValidationError):
+            o.validate()
+        with self.assertRaises(ValidationError):
+            o.render()
+
+    def test_instantiate_copies(self):
+        config = dict(
+            deepcopy(self._templates[0]),
+            general={"hostname": "{{ name }}"},
+            dns_servers=["10.0.0.2"],
+        )
+        prepared = OpenWrt.prepare(config)
+        with patch(
+            'netjsonconfig.backends.base.backend.deepcopy', wraps=deepcopy
+        ) as mocked:
+            o = prepared.instantiate(self._context)
+        # the configuration is not copied by the backend
+        for args, kwargs in mocked.call_args_list:
+            self.assertEqual(args[0], {})
+        self.assertEqual(o.config, OpenWrt(config, context=self._context).config)
+        # the sections and the containers of the variables are copied
+        interface = o.config['interfaces'][0]
+        prepared_interface = prepared.config['interfaces'][0]
+        self.assertIsNot(interface, prepared_interface)
+        self.assertIsNot(interface['addresses'][0], prepared_interface['addresses'][0])
+        self.assertIsNot(o.config['radios'][0], prepared.config['radios'][0])
+        self.assertIsNot(o.config['dns_servers'], prepared.config['dns_servers'])
+        # the containers without variables (nested in sections) are shared
+        config['interfaces'][0]['addresses'][0]['address'] = '10.0.0.1'
+        prepared = OpenWrt.prepare(config)
+        o = prepared.instantiate(self._context)
+        self.assertIs(
+            o.config['interfaces'][0]['addresses'],
+            prepared.config['interfaces'][0]['addresses'],
+        )
+        # the backends don't modify the prepared configuration
+        # (eg: OpenWisp adds keys to radios and its scripts to files)
+        prepared = OpenWisp.prepare(config)
+        for context in (self._context, dict(self._context, name='router2')):
+            o = prepared.instantiate(context)
+            expected = OpenWisp(config, context=context)
+            self.assertEqual(o.generate().getvalue(), expected.generate().getvalue())
+        self.assertNotIn('disabled', prepared.config['radios'][0])
+        self.assertNotIn('files', prepared.config)
+
+    def test_unique_items(self):
+        files = [
+            {"path": "/etc/{0}".format(i), "mode": "0644", "contents": "{{ a }}"}
+            for i in range(2)
+        ]
+        prepared = OpenWrt.prepare({"files": files})
+        self.assertEqual(prepared.dependent_slots, set())
+        self.assertEqual(prepared.unique_arrays[('files', 0, 'contents')], {('files',)})
+        o = prepared.instantiate({'a': 'x'})
+        self.assertTrue(o._schema_valid)
+        o.render()
+        # the substitution makes two files equal
+        files[1]['path'] = '/etc/0'
+        files[1]['contents'] = 'x'
+        prepared = OpenWrt.prepare({"files": files})
+        o = prepared.instantiate({'a': 'x'})
+        self.assertFalse(o._schema_valid)
+        with self.assertRaises(ValidationError):
+            o.validate()
+
+    def test_backend_arguments(self):
+        prepared = OpenWisp.prepare(self._config, templates=self._templates, dsa=True)
+        o = prepared.instantiate(self._context)
+        expected = OpenWisp(
+            self._config, templates=self._templates, context=self._context, dsa=True
+        )
+        self.assertIsInstance(o, OpenWisp)
+        self.assertTrue(o.dsa)
+        self.assertEqual(o.render(), expected.render())
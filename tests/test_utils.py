@@ -1,6 +1,128 @@
+import random
+import re
 import unittest
+from collections import OrderedDict
+from copy import deepcopy
 
-from netjsonconfig.utils import evaluate_vars, get_copy, merge_config, merge_list
+from netjsonconfig.utils import (
+    IndexedConfig,
+    LRUCache,
+    _ContentIndex,
+    evaluate_vars,
+    get_copy,
+    merge_config,
+    merge_configs,
+    merge_list,
+)
+
+
+def _reference_merge_config(template, config, list_identifiers=None):
+    """
+    original implementation of merge_config, which copies
+    the whole template at each level of recursion
+    """
+    result = deepcopy(template)
+    for key, value in config.items():
+        if isinstance(value, dict):
+            node = result.get(key, OrderedDict())
+            result[key] = _reference_merge_config(node, value)
+        elif isinstance(value, list) and isinstance(result.get(key), list):
+            result[key] = _reference_merge_list(result[key], value, list_identifiers)
+        else:
+            result[key] = value
+    return result
+
+
+def _reference_merge_list(list1, list2, identifiers=None):
+    identifiers = identifiers or []
+    dict_map = {'list1': OrderedDict(), 'list2': OrderedDict()}
+    counter = 1
+    for list_ in [list1, list2]:
+        container = dict_map['list{0}'.format(counter)]
+        for el in list_:
+            key = id(el)
+            if counter == 2 and el in dict_map['list1'].values():
+                continue
+            if isinstance(el, dict):
+                for id_key in identifiers:
+                    if id_key in el:
+                        key = el[id_key]
+                        break
+            if isinstance(key, list):
+                key = tuple(key)
+            container[key] = deepcopy(el)
+        counter += 1
+    merged = _reference_merge_config(dict_map['list1'], dict_map['list2'])
+    return list(merged.values())
+
+
+def _reference_evaluate_vars(data, context):
+    """
+    original implementation of evaluate_vars (strings only),
+    which substitutes one variable at time
+    """
+    vars_found = re.findall(r'\{\{\s*(\w*)\s*\}\}', data)
+    for var in vars_found:
+        var = var.strip()
+        if len(vars_found) > 1:
+            pattern = r'\{\{(\s*%s\s*)\}\}' % var
+        else:
+            pattern = r'\{\{\s*(\w*)\s*\}\}'
+        if var in context:
+            data = re.sub(pattern, str(context[var]), data)
+    return data
+
+
+def _random_config(rnd, depth=3):
+    config = {}
+    for key in rnd.sample(['a', 'b', 'c', 'd', 'files'], rnd.randint(1, 4)):
+        kind = rnd.random()
+        if depth and kind < 0.3:
+            config[key] = _random_config(rnd, depth - 1)
+        elif kind < 0.7:
+            config[key] = [
+                _random_element(rnd, depth) for _ in range(rnd.randint(0, 4))
+            ]
+        else:
+            config[key] = rnd.choice(['x', 'y', 1, 2, True, None])
+    return config
+
+
+def _random_element(rnd, depth):
+    kind = rnd.random()
+    if kind < 0.5:
+        element = {'name': rnd.choice(['eth0', 'eth1', 'wlan0'])}
+        if depth and rnd.random() < 0.5:
+            element.update(_random_config(rnd, depth - 1))
+        return element
+    elif kind < 0.7:
+        return {'contents': rnd.choice(['x', 'y'])}
+    elif kind < 0.8:
+        return [rnd.choice(['x', 'y'])]
+    return rnd.choice(['x', 'y', 1])
+
+
+def _outcome(function, template, config):
+    try:
+        return function(template, config, ['name'])
+    except (AttributeError, TypeError) as e:
+        return type(e)
+
+
+def _types(data):
+    if isinstance(data, dict):
+        return (type(data), [(k, _types(v)) for k, v in data.items()])
+    if isinstance(data, list):
+        return (type(data), [_types(v) for v in data])
+    return type(data)
+
+
+def _containers(data):
+    yield data
+    values = data.values() if isinstance(data, dict) else data
+    for value in values:
+        if isinstance(value, (dict, list)):
+            yield from _containers(value)
 
 
 class TestUtils(unittest.TestCase):
@@ -116,6 +238,35 @@ class TestUtils(unittest.TestCase):
     def test_evaluate_vars_one_char(self):
         self.assertEqual(evaluate_vars('{{ a }}', {'a': 'letter-A'}), 'letter-A')
 
+    def test_evaluate_vars_reference(self):
+        """
+        compares evaluate_vars with the original implementation
+        """
+        rnd = random.Random('vars')
+        tokens = ['{{', '}}', '{', '}', ' ', 'a', 'b', 'c', 'x', '\\']
+        values = ['', 'A', 'b', 'c', 1, '{{ b }}', '{{', '{', '}}', '\\1', 'x\\y']
+        for _ in range(2000):
+            data = ''.join(rnd.choice(tokens) for _ in range(rnd.randint(1, 12)))
+            context = {var: rnd.choice(values) for var in rnd.sample(['a', 'b', ''], 2)}
+            try:
+                expected = _reference_evaluate_vars(data, context)
+            except re.error:
+                expected = re.error
+            with self.subTest(data=data, context=context):
+                if expected is re.error:
+                    with self.assertRaises(re.error):
+                        evaluate_vars(data, context)
+                else:
+                    self.assertEqual(evaluate_vars(data, context), expected)
+
+    def test_evaluate_vars_substituted_variable(self):
+        context = {'a': 'b', 'b': 'B'}
+        self.assertEqual(evaluate_vars('{{ {{ a }} }}', context), '{{ b }}')
+        self.assertEqual(evaluate_vars('{{ {{ a }} }} {{ b }}', context), 'B B')
+        # values are processed by re.sub like in previous versions
+        output = evaluate_vars('{{ a }}{{ b }}', {'a': '\\g<1>'})
+        self.assertEqual(output, ' a {{ b }}')
+
     def test_merge_list_override(self):
         template = [{"name": "test1", "tx": 1}]
         config = [{"name": "test1", "tx": 2}]
@@ -153,3 +304,154 @@ class TestUtils(unittest.TestCase):
         conf2 = [{"name": ["walledgarden"], "contents": "test"}]
         result = merge_list(conf1, conf2, identifiers=['name'])
         self.assertEqual(result, conf2)
+
+    def test_merge_configs_reference(self):
+        """
+        compares merge_config and merge_configs with the original
+        implementation on random stacks of templates
+        """
+        rnd = random.Random('merge')
+        for _ in range(300):
+            configs = [_random_config(rnd) for _ in range(rnd.randint(1, 5))]
+            # templates may share some blocks
+            if len(configs) > 1 and 'files' in configs[0]:
+                configs[-1]['files'] = deepcopy(configs[0]['files'])
+            original = deepcopy(configs)
+            expected = {}
+            try:
+                for config in configs:
+                    expected = _reference_merge_config(expected, config, ['name'])
+            except (AttributeError, TypeError) as e:
+                # eg: dict merged on top of a list
+                expected = type(e)
+            with self.subTest(configs=original):
+                if expected in (AttributeError, TypeError):
+                    with self.assertRaises(expected):
+                        merge_configs(configs, ['name'])
+                    continue
+                result = merge_configs(configs, ['name'])
+                self.assertEqual(result, expected)
+                self.assertEqual(_types(result), _types(expected))
+                self.assertEqual(configs, original)
+                self.assertEqual(
+                    _outcome(merge_config, expected, configs[-1]),
+                    _outcome(_reference_merge_config, expected, configs[-1]),
+                )
+
+    def test_merge_configs_copy(self):
+        template = {'interfaces': [{'name': 'eth0', 'addresses': []}]}
+        config = {'interfaces': [{'name': 'eth1'}], 'general': {'hostname': 'a'}}
+        result = merge_configs([template, config], ['name'])
+        inputs = {id(c) for c in _containers(template)}
+        inputs.update(id(c) for c in _containers(config))
+        for container in _containers(result):
+            self.assertNotIn(id(container), inputs)
+
+    def test_merge_config_in_place(self):
+        rnd = random.Random('in_place')
+        for _ in range(300):
+            template, config = _random_config(rnd), _random_config(rnd)
+            expected = _outcome(_reference_merge_config, template, config)
+            with self.subTest(template=template, config=config):
+                template_copy, config_copy = deepcopy(template), deepcopy(config)
+                try:
+                    result = merge_config(
+                        template_copy, config_copy, ['name'], in_place=True
+                    )
+                except (AttributeError, TypeError) as e:
+                    self.assertEqual(type(e), expected)
+                    continue
+                self.assertIs(result, template_copy)
+                self.assertEqual(result, expected)
+                self.assertEqual(_types(result), _types(expected))
+        # nothing is copied
+        eth0 = {'name': 'eth0'}
+        eth1 = {'name': 'eth1', 'addresses': [{'proto': 'dhcp'}]}
+        result = merge_config(
+            {'interfaces': [eth0]},
+            {'interfaces': [{'name': 'eth0', 'mtu': 1500}, eth1]},
+            ['name'],
+            in_place=True,
+        )
+        self.assertIs(result['interfaces'][0], eth0)
+        self.assertEqual(eth0, {'name': 'eth0', 'mtu': 1500})
+        self.assertIs(result['interfaces'][1]['addresses'], eth1['addresses'])
+
+    def test_indexed_config(self):
+        rnd = random.Random('indexed')
+        for _ in range(300):
+            configs = [_random_config(rnd) for _ in range(rnd.randint(1, 5))]
+            with self.subTest(configs=configs):
+                expected = OrderedDict()
+                try:
+                    for config in deepcopy(configs):
+                        expected = merge_config(
+                            expected, config, ['name'], in_place=True
+                        )
+                except (AttributeError, TypeError):
+                    continue
+                indexed = IndexedConfig(identifiers=['name'])
+                for config in deepcopy(configs):
+                    indexed.merge(config)
+                self.assertEqual(indexed.data, expected)
+                self.assertEqual(_types(indexed.data), _types(expected))
+        # sections are merged in place
+        lan = {'.name': 'lan', 'proto': 'dhcp'}
+        indexed = IndexedConfig(identifiers=['.name'])
+        indexed.merge({'network': [lan]})
+        indexed.merge({'network': [{'.name': 'lan', 'mtu': 1500}, {'.name': 'wan'}]})
+        self.assertIs(indexed.data['network'][0], lan)
+        self.assertEqual(lan, {'.name': 'lan', 'proto': 'dhcp', 'mtu': 1500})
+        self.assertEqual([s['.name'] for s in indexed.data['network']], ['lan', 'wan'])
+
+    def test_merge_list_duplicates_index(self):
+        list1 = [
+            OrderedDict([('path', '/a'), ('mode', '0644')]),
+            {'path': '/b', 'mode': '0644', 'tags': [1, 2]},
+            {'path': '/c', 'unhashable': {1, 2}},
+            1,
+        ]
+        list2 = [
+            # equal to the first element, despite the different order
+            {'mode': '0644', 'path': '/a'},
+            # 1 == 1.0
+            {'path': '/b', 'mode': '0644', 'tags': [1.0, 2]},
+            {'path': '/c', 'unhashable': {1, 2}},
+            {'path': '/d', 'unhashable': {1, 2}},
+            {'path': '/b', 'mode': '0644', 'tags': (1, 2)},
+            True,
+            [1],
+        ]
+        result = merge_list(list1, list2)
+        self.assertEqual(result, _reference_merge_list(list1, list2))
+        self.assertEqual(len(result), 7)
+        index = _ContentIndex(list1)
+        for element in list1 + list2 + [{}, [], {'path': '/a'}, None]:
+            with self.subTest(element=element):
+                self.assertEqual(element in index, element in list1)
+
+    def test_merge_list_large(self):
+        files = [
+            {'path': '/etc/{0}'.format(i), 'contents': str(i)} for i in range(2000)
+        ]
+        result = merge_list(files, files[::-1] + [{'path': '/new'}])
+        self.assertEqual(result, files + [OrderedDict(path='/new')])
+
+    def test_merge_config_invalid(self):
+        with self.assertRaises(TypeError):
+            merge_config({'a': 'string'}, {'a': {'b': 'c'}})
+        self.assertEqual(merge_config({'a': 'string'}, {'a': {}}), {'a': 'string'})
+
+    def test_lru_cache(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertNotIn('b', cache)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('b', 'default'), 'default')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.cache_info(), (1, 2, 2, 2))
+        cache.cache_clear()
+        self.assertEqual(cache.cache_info(), (0, 0, 2, 0))
@@ -0,0 +1,405 @@
+import random
+import unittest
+from copy import deepcopy
+
+from jsonschema import Draft4Validator, draft4_format_checker
+from jsonschema.exceptions import FormatError
+
+from netjsonconfig import OpenVpn, OpenWisp, OpenWrt, Wireguard, ZeroTier
+from netjsonconfig.backends.base.validator import (
+    CachedFormatChecker,
+    CompiledValidator,
+    DispatchValidator,
+    string_affects_validity,
+)
+from netjsonconfig.exceptions import ValidationError
+
+_config = {
+    "general": {"hostname": "fuzz", "timezone": "Europe/Rome"},
+    "radios": [
+        {
+            "name": "radio0",
+            "phy": "phy0",
+            "driver": "mac80211",
+            "protocol": "802.11n",
+            "channel": 11,
+            "channel_width": 20,
+            "tx_power": 10,
+            "country": "IT",
+        }
+    ],
+    "interfaces": [
+        {
+            "name": "eth0",
+            "type": "ethernet",
+            "mac": "00:11:22:33:44:55",
+            "addresses": [
+                {"proto": "dhcp", "family": "ipv4"},
+                {
+                    "proto": "static",
+                    "family": "ipv4",
+                    "address": "192.168.1.1",
+                    "mask": 24,
+                },
+                {"proto": "static", "family": "ipv6", "address": "fd87::1", "mask": 64},
+            ],
+        },
+        {
+            "name": "wlan0",
+            "type": "wireless",
+            "wireless": {
+                "radio": "radio0",
+                "mode": "access_point",
+                "ssid": "fuzz",
+                "encryption": {
+                    "protocol": "wpa2_personal",
+                    "key": "fuzz-key-12345",
+                    "cipher": "auto",
+                },
+            },
+        },
+        {
+            "name": "br-lan",
+            "type": "bridge",
+            "stp": True,
+            "bridge_members": ["eth0", "wlan0"],
+        },
+    ],
+    "dns_servers": ["10.0.0.1"],
+    "routes": [
+        {
+            "device": "eth0",
+            "destination": "10.0.0.0/8",
+            "next": "192.168.1.2",
+            "cost": 0,
+        }
+    ],
+    "ip_rules": [{"in": "eth0", "src": "192.168.1.0/24", "action": "blackhole"}],
+    "files": [{"path": "/etc/fuzz", "mode": "0644", "contents": "fuzz"}],
+}
+_values = [
+    '',
+    'x',
+    'eth0',
+    '192.168.1.1',
+    '300.1.1.1',
+    'fd87::1',
+    '10.0.0.0/8',
+    'not-a-cidr',
+    '00:11:22:33:44:55',
+    'a' * 70,
+    -1,
+    0,
+    1,
+    2**40,
+    1.5,
+    True,
+    False,
+    None,
+    [],
+    {},
+    ['eth0'],
+    {'name': 'x'},
+]
+
+
+def _collect_enums(schema, enums):
+    if isinstance(schema, dict):
+        enums.extend(schema.get('enum', []))
+        for value in schema.values():
+            _collect_enums(value, enums)
+    elif isinstance(schema, list):
+        for value in schema:
+            _collect_enums(value, enums)
+    return enums
+
+
+def _containers(data, path=()):
+    yield path, data
+    items = data.items() if isinstance(data, dict) else enumerate(data)
+    for key, value in items:
+        if isinstance(value, (dict, list)):
+            yield from _containers(value, path + (key,))
+
+
+def _mutate(config, values, rnd):
+    containers = list(_containers(config))
+    _, container = rnd.choice(containers)
+    value = deepcopy(rnd.choice(values))
+    if isinstance(container, dict):
+        keys = list(container.keys())
+        operation = rnd.random()
+        if keys and operation < 0.15:
+            del container[rnd.choice(keys)]
+        elif keys and operation < 0.9:
+            container[rnd.choice(keys)] = value
+        else:
+            container[rnd.choice(['extra', 'type', 'proto', 'mode'])] = value
+    else:
+        operation = rnd.random()
+        if container and operation < 0.2:
+            container.pop(rnd.randrange(len(container)))
+        elif container and operation < 0.4:
+            container.append(deepcopy(rnd.choice(container)))
+        elif container and operation < 0.9:
+            container[rnd.randrange(len(container))] = value
+        else:
+            container.append(value)
+
+
+class TestCompiledValidator(unittest.TestCase):
+    """
+    tests for netjsonconfig.backends.base.validator
+    """
+
+    def _validators(self, schema):
+        return (
+            Draft4Validator(schema, format_checker=draft4_format_checker),
+            CompiledValidator(schema, format_checker=draft4_format_checker),
+        )
+
+    def _errors(self, validator, instance):
+        return [
+            (error.message, list(error.path), list(error.schema_path))
+            for error in validator.iter_errors(instance)
+        ]
+
+    def test_differential_fuzz(self):
+        """
+        compares the verdicts of the compiled, dispatching and
+        interpreting validators on randomly mutated configurations
+        """
+        for backend in [OpenWrt, OpenWisp]:
+            draft4, compiled = self._validators(backend.schema)
+            dispatch = DispatchValidator(
+                backend.schema, format_checker=draft4_format_checker
+            )
+            values = _values + _collect_enums(backend.schema, [])
+            rnd = random.Random(backend.__name__)
+            invalid = 0
+            for _ in range(300):
+                config = deepcopy(_config)
+                for _ in range(rnd.randint(1, 3)):
+                    _mutate(config, values, rnd)
+                expected = draft4.is_valid(config)
+                invalid += not expected
+                with self.subTest(backend=backend.__name__, config=config):
+                    self.assertEqual(compiled.is_valid(config), expected)
+                    self.assertEqual(dispatch.is_valid(config), expected)
+            # ensures both verdicts have been exercised
+            self.assertTrue(0 < invalid < 300)
+
+    def test_vpn_schemas(self):
+        for backend in [OpenVpn, Wireguard, ZeroTier]:
+            draft4, compiled = self._validators(backend.schema)
+            for config in [{}, {'files': []}, {'files': 'WRONG'}, []]:
+                self.assertEqual(compiled.is_valid(config), draft4.is_valid(config))
+
+    def test_keywords(self):
+        schema = {
+            'definitions': {'positive': {'type': 'integer', 'minimum': 0}},
+            'type': 'object',
+            'properties': {
+                'count': {'$ref': '#/definitions/positive'},
+                'ratio': {'type': 'number', 'maximum': 1, 'exclusiveMaximum': True},
+                'step': {'multipleOf': 0.5},
+                'tags': {'type': 'array', 'uniqueItems': True, 'maxItems': 3},
+                'pair': {'items': [{'type': 'string'}], 'additionalItems': False},
+                'choice': {'anyOf': [{'type': 'null'}, {'enum': [1, 'one']}]},
+                'other': {'not': {'type': 'string'}},
+            },
+            'patternProperties': {'^x-': {'type': 'string'}},
+            'additionalProperties': False,
+            'dependencies': {'count': ['ratio']},
+            'minProperties': 1,
+        }
+        draft4, compiled = self._validators(schema)
+        instances = [
+            {},
+            {'count': 1, 'ratio': 0.5},
+            {'count': -1, 'ratio': 0.5},
+            {'count': True, 'ratio': 0.5},
+            {'count': 1},
+            {'ratio': 1},
+            {'step': 1.5},
+            {'step': 1.2},
+            {'tags': [1, True]},
+            {'tags': [1, 1.0]},
+            {'tags': [{'a': 1}, {'a': True}]},
+            {'tags': [{'a': 1}, {'a': 1}]},
+            {'tags': [1, 2, 3, 4]},
+            {'pair': ['a']},
+            {'pair': ['a', 'b']},
+            {'pair': [1]},
+            {'choice': None},
+            {'choice': True},
+            {'choice': 'one'},
+            {'other': 1},
+            {'other': 'string'},
+            {'x-custom': 'a'},
+            {'x-custom': 1},
+            {'unknown': 1},
+        ]
+        for instance in instances:
+            with self.subTest(instance=instance):
+                self.assertEqual(compiled.is_valid(instance), draft4.is_valid(instance))
+
+    def test_same_error(self):
+        draft4, compiled = self._validators(OpenWrt.schema)
+        config = {'interfaces': [{'name': 'eth0', 'type': 'WRONG'}]}
+        with self.assertRaises(Exception) as expected:
+            draft4.validate(config)
+        with self.assertRaises(Exception) as error:
+            compiled.validate(config)
+        self.assertEqual(error.exception.message, expected.exception.message)
+        self.assertEqual(error.exception.path, expected.exception.path)
+
+    def test_dispatch_constraints(self):
+        schema = {
+            'definitions': {
+                'base': {'properties': {'type': {'type': 'string'}}},
+                'a': {
+                    'allOf': [
+                        {'$ref': '#/definitions/base'},
+                        {'properties': {'type': {'enum': ['a', 'b']}}},
+                    ]
+                },
+                'b': {
+                    'properties': {'type': {'enum': ['b', 'c']}},
+                    'allOf': [{'properties': {'type': {'enum': ['c']}}}],
+                },
+                'alias': {'$ref': '#/definitions/b'},
+            },
+            'oneOf': [
+                {'$ref': '#/definitions/a'},
+                {'$ref': '#/definitions/b'},
+                {'$ref': '#/definitions/alias'},
+                {'properties': {'type': {'enum': [1, 'a']}}},
+            ],
+        }
+        validator = DispatchValidator(schema)
+        draft4 = Draft4Validator(schema)
+        for instance in [{'type': 'a'}, {'type': 'c'}, {'type': 'd'}, {}, []]:
+            with self.subTest(instance=instance):
+                self.assertEqual(
+                    self._errors(validator, instance), self._errors(draft4, instance)
+                )
+
+    def test_dispatch_same_errors(self):
+        draft4 = Draft4Validator(OpenWrt.schema, format_checker=draft4_format_checker)
+        dispatch = DispatchValidator(
+            OpenWrt.schema, format_checker=draft4_format_checker
+        )
+        for interface in [
+            {'name': 'eth0', 'type': 'WRONG'},
+            {'name': 'eth0', 'type': 'ethernet', 'mtu': 'WRONG'},
+            {'name': 'wlan0', 'type': 'wireless'},
+            {'name': 'br-lan', 'type': 'bridge', 'bridge_members': 'WRONG'},
+            {'name': 'eth0', 'type': 1},
+            {'name': 'eth0'},
+        ]:
+            config = {'interfaces': [interface]}
+            with self.subTest(interface=interface):
+                self.assertEqual(
+                    self._errors(dispatch, config), self._errors(draft4, config)
+                )
+
+    def test_backend_validator_class(self):
+        class CompiledOpenWrt(OpenWrt):
+            validator_class = CompiledValidator
+
+        o = CompiledOpenWrt(_config)
+        self.assertIsInstance(o._get_validator(), CompiledValidator)
+        o.validate()
+        o.config['interfaces'] = 'WRONG'
+        with self.assertRaises(ValidationError) as error:
+            o.validate()
+        self.assertIn("'WRONG' is not of type 'array'", str(error.exception))
+
+    def test_remote_reference(self):
+        with self.assertRaises(NotImplementedError):
+            CompiledValidator({'$ref': 'http://example.com/schema.json'})
+
+    def test_cached_format_checker(self):
+        checker = CachedFormatChecker(draft4_format_checker, maxsize=2)
+        for value in ['10.0.0.0/8', '10.0.0.0/8', 'WRONG', 'WRONG']:
+            self.assertEqual(
+                checker.conforms(value, 'cidr'),
+                draft4_format_checker.conforms(value, 'cidr'),
+            )
+        self.assertEqual(checker.cache_info(), (2, 2, 2, 2))
+        with self.assertRaises(FormatError) as error:
+            checker.check('WRONG', 'cidr')
+        self.assertEqual(str(error.exception), "'WRONG' is not a 'cidr'")
+        self.assertIsInstance(error.exception.cause, AssertionError)
+        # the least recently used result is discarded
+        checker.check('10.0.0.1', 'ipv4')
+        checker.check('192.168.0.0/16', 'cidr')
+        self.assertEqual(checker.cache_info().currsize, 2)
+        self.assertNotIn(('cidr', str, '10.0.0.0/8'), checker.cache)
+        # unhashable values and unknown formats are not cached
+        self.assertTrue(checker.conforms(['x'], 'hostname'))
+        self.assertTrue(checker.conforms('x', 'unknown'))
+        checker.cache_clear()
+        self.assertEqual(checker.cache_info(), (0, 0, 2, 0))
+
+    def test_backend_format_checker(self):
+        OpenWrt.format_checker.cache_clear()
+        for _ in range(2):
+            OpenWrt({'general': {'hostname': 'cached'}}).validate()
+        self.assertGreater(OpenWrt.format_checker.cache_info().hits, 0)
+        o = OpenWrt({'general': {'hostname': '$$$'}})
+        for _ in range(2):
+            with self.assertRaises(ValidationError) as error:
+                o.validate()
+            self.assertIn("'$$$' is not a 'hostname'", str(error.exception))
+
+    def test_string_affects_validity(self):
+        schema = {
+            'definitions': {'name': {'type': 'string', 'maxLength': 8}},
+            'type': 'object',
+            'properties': {
+                'description': {'type': 'string'},
+                'name': {'$ref': '#/definitions/name'},
+                'notes': {'type': 'string', 'format': 'textarea'},
+                'tags': {'type': 'array', 'uniqueItems': True},
+                'items': {'type': 'array', 'items': [{'type': 'string'}]},
+                'choice': {
+                    'oneOf': [
+                        {'properties': {'value': {'type': 'string'}}},
+                        {'properties': {'value': {'enum': ['a']}}},
+                    ]
+                },
+                'missing': {'$ref': '#/definitions/missing'},
+            },
+            'patternProperties': {'^x-': {'pattern': '^[a-z]*$'}},
+        }
+        for path, expected in [
+            (['description'], False),
+            (['name'], True),
+            (['notes'], True),
+            (['tags', 0], True),
+            (['items', 0], False),
+            (['items', 1], False),
+            (['choice', 'value'], True),
+            (['missing'], True),
+            (['x-custom'], True),
+            (['unknown'], False),
+        ]:
+            with self.subTest(path=path):
+                self.assertEqual(string_affects_validity(schema, path), expected)
+        unique_arrays = set()
+        self.assertFalse(
+            string_affects_validity(schema, ['tags', 0], None, unique_arrays)
+        )
+        self.assertEqual(unique_arrays, {('tags',)})
+        # formats which are not checked don't constrain strings
+        self.assertFalse(
+            string_affects_validity(schema, ['notes'], draft4_format_checker)
+        )
+        self.assertFalse(
+            string_affects_validity(OpenWrt.schema, ['general', 'description'])
+        )
+        self.assertTrue(
+            string_affects_validity(OpenWrt.schema, ['general', 'hostname'])
+        )
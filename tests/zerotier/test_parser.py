@@ -521,6 +521,16 @@ class TestParser(unittest.TestCase):
         os.remove('/tmp/test.tar.gz')
         self.assertDictEqual(o.config, self._TEST_MULTIPLE_CONFIG)
 
+    def test_parse_tar_stream(self):
+        tar = ZeroTier(self._TEST_MULTIPLE_CONFIG).generate()
+        read, write = os.pipe()
+        os.write(write, tar.getvalue())
+        os.close(write)
+        # pipes aren't seekable, the archive is read as a stream
+        with open(read, 'rb') as stream:
+            o = ZeroTier(native=stream)
+        self.assertDictEqual(o.config, self._TEST_MULTIPLE_CONFIG)
+
     def test_file_path_min_length(self):
         conf = deepcopy(self._TEST_MULTIPLE_CONFIG)
         conf.update({"files": [{"path": ".", "mode": "0644", "contents": "testing!"}]})